@@ -27,6 +27,12 @@ mechanism:
       side of the comm.
     - If the `_wait_reply` is implemented, remote_call can be called with
       `blocking=True`, which will wait for a reply sent by the other side.
+    - The `async_remote_call` method returns a similar object whose calls
+      return awaitables that give the reply of the other side.
+    - Handlers can return a generator. If the call was made with
+      `stream=True`, its chunks are sent one by one, and they are returned
+      in a list by blocking calls, passed to the callback of other calls or
+      yielded by the async iterator returned by awaitable calls.
 
 The messages exchanged are:
     - Function call (spyder_msg_type = 'remote_call'):
@@ -37,9 +43,12 @@ The messages exchanged are:
             'call_args': The function args,
             'call_kwargs': The function kwargs,
             'buffered_args': The args index that are in the buffers,
-            'buffered_kwargs': the kwargs keys that are in the buffers
+            'buffered_kwargs': the kwargs keys that are in the buffers,
+            'buffered_values': [index or key, number of buffers] of the
+                               BufferedValue args and kwargs
           }
-        - The buffer contains any bytes in the arguments
+        - The buffer contains any bytes in the arguments, followed by the
+          buffers of BufferedValue arguments
     - If the 'settings' has `'blocking' =  True`, a reply is sent.
       (spyder_msg_type = 'remote_call_reply'):
         - The 'content' is a dict with: {
@@ -47,12 +56,40 @@ The messages exchanged are:
                         exception to be raised.
             'call_id': The uuid from above,
             'call_name': The function name (mostly for debugging),
-            'call_return_value': The return value of the function
+            'call_return_value': The return value of the function,
+            'buffered_return': Whether the return value is a BufferedValue
+           }
+        - The buffer contains the return value if it is bytes, or the
+          buffers of a BufferedValue
+        - The replies of streamed calls also have 'stream_end': True and
+          'stream_chunks': the number of chunks that were sent.
+    - If the 'settings' has `'stream' = True` and the handler returns a
+      generator, its chunks are sent before the reply
+      (spyder_msg_type = 'remote_call_chunk'):
+        - The 'content' is a dict with: {
+            'call_id': The uuid from above,
+            'call_name': The function name,
+            'seq': The position of the chunk,
+            'chunk': The chunk,
+            'buffered_return': Whether the chunk is a BufferedValue
+           }
+        - The buffer is like the one of replies.
+        - Only 'stream_window' chunks (`STREAM_WINDOW` by default) are sent
+          before being acknowledged (spyder_msg_type = 'remote_call_ack'),
+          with a 'content' dict: {
+            'call_id': The uuid from above,
+            'count': The number of chunks that were consumed,
+            'cancel': Whether to stop sending chunks
            }
-        - The buffer contains the return value if it is bytes
 """
+import asyncio
+from collections import deque
+from concurrent.futures import Future, InvalidStateError
+import contextlib
+import inspect
 import logging
 import sys
+import threading
 import uuid
 import traceback
 import builtins
@@ -63,11 +100,159 @@ logger = logging.getLogger(__name__)
 # Max timeout (in secs) for blocking calls
 TIMEOUT = 3
 
+# Max number of chunks of streamed replies that are sent before the other
+# side acknowledges them
+STREAM_WINDOW = 4
+
 
 class CommError(RuntimeError):
     pass
 
 
+class BufferedValue:
+    """
+    JSON-able value sent together with a list of binary buffers.
+
+    The buffers (e.g. bytes or memoryviews) are passed to the comm as they
+    are, so big values can be sent without copying them. BufferedValues can
+    be used as arguments and return values of remote calls.
+    """
+
+    def __init__(self, value, buffers):
+        self.value = value
+        self.buffers = list(buffers)
+
+
+class PendingCall(Future):
+    """
+    Future of the reply to a call sent to the other side.
+
+    Its result is the content of the reply. It also keeps the comm the call
+    was sent to (None if it was sent to all of them), so replies from other
+    comms are not taken for it.
+    """
+
+    def __init__(self, call_name, comm_id, blocking, callback,
+                 awaitable=False, stream=False):
+        super().__init__()
+        self.call_name = call_name
+        self.comm_id = comm_id
+        self.blocking = blocking
+        self.callback = callback
+        self.awaitable = awaitable
+        self.stream = stream
+
+        # Chunks of the streamed reply of a blocking call, and number of
+        # chunks received so far
+        self.chunks = []
+        self.received = 0
+
+        # ReplyStream of an awaitable call with a streamed reply
+        self.reply_stream = None
+
+    def set_reply(self, content):
+        """Set the content of the reply, unless the call was cancelled."""
+        try:
+            self.set_result(content)
+        except InvalidStateError:
+            pass
+
+
+class ReplyStream:
+    """
+    Asynchronous iterator over the chunks of a streamed reply (see
+    `CommBase.async_remote_call`).
+
+    Each chunk is acknowledged when it's consumed, so the other side stops
+    sending them when the consumer falls behind. A TimeoutError is raised
+    if a chunk doesn't arrive in `timeout` seconds.
+    """
+
+    def __init__(self, comms_wrapper, call_id, timeout):
+        self._comms_wrapper = comms_wrapper
+        self._call_id = call_id
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self._items = deque()
+        self._waiter = None
+        self._closed = False
+
+    def put(self, kind, value, comm_id=None):
+        """
+        Add a 'chunk' or the 'end' reply. This can be called from any
+        thread.
+        """
+        with self._lock:
+            self._items.append((kind, value, comm_id))
+            waiter, self._waiter = self._waiter, None
+        if waiter is not None:
+            waiter.get_loop().call_soon_threadsafe(self._wake, waiter)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                if self._items:
+                    kind, value, comm_id = self._items.popleft()
+                    break
+                if self._closed:
+                    raise StopAsyncIteration
+                waiter = self._waiter = loop.create_future()
+            try:
+                await asyncio.wait_for(waiter, self._timeout)
+            except BaseException:
+                # E.g. a timeout or a cancellation
+                await self.aclose()
+                raise
+
+        if kind == 'end':
+            self._closed = True
+            # Raise the error, if any
+            self._comms_wrapper._get_reply_value(value)
+            raise StopAsyncIteration
+
+        if comm_id is not None:
+            self._comms_wrapper._ack_chunks(self._call_id, comm_id)
+        return value
+
+    async def aclose(self):
+        """Stop receiving chunks and tell the other side to stop sending."""
+        if self._closed:
+            return
+        self._closed = True
+        self._comms_wrapper._cancel_stream(self._call_id)
+
+    @staticmethod
+    def _wake(waiter):
+        """Wake up the consumer that waits for an item."""
+        if not waiter.done():
+            waiter.set_result(None)
+
+
+class StreamedReply:
+    """
+    Generator returned by a remote call handler, whose chunks are sent to
+    the other side while it has room for them.
+    """
+
+    def __init__(self, call_dict, generator, comm_id, window):
+        self.call_dict = call_dict
+        self.generator = generator
+        self.comm_id = comm_id
+        self.credits = window
+        self.seq = 0
+        self.finished = False
+
+        # Acknowledgments can be handled while getting a chunk (e.g. if the
+        # generator waits for a reply), so the lock is reentrant and the
+        # generator is only run by the outermost call.
+        self.lock = threading.RLock()
+        self.sending = False
+
+
 def stacksummary_to_json(stack):
     """StackSummary to json."""
     return [
@@ -189,19 +374,51 @@ class CommBase:
 
     def __init__(self):
         super(CommBase, self).__init__()
-        self.calling_comm_id = None
+        # Comm of the last message received, and comms of the messages
+        # being handled by each thread (see `calling_comm_id`)
+        self._last_calling_comm_id = None
+        self._handling = threading.local()
         self._comms = {}
         # Handlers
         self._message_handlers = {}
         self._remote_call_handlers = {}
-        # Lists of reply numbers
+        # PendingCalls waiting for a reply and replies of blocking calls,
+        # by call id. They can be accessed from several threads.
+        self._calls_lock = threading.Lock()
         self._reply_inbox = {}
         self._reply_waitlist = {}
+        # StreamedReplies being sent, by call id
+        self._streams = {}
 
         self._register_message_handler(
             'remote_call', self._handle_remote_call)
         self._register_message_handler(
             'remote_call_reply', self._handle_remote_call_reply)
+        self._register_message_handler(
+            'remote_call_chunk', self._handle_remote_call_chunk)
+        self._register_message_handler(
+            'remote_call_ack', self._handle_remote_call_ack)
+
+    @property
+    def calling_comm_id(self):
+        """
+        Id of the comm that sent the message being handled.
+
+        Each thread has its own while it handles a message, so replies are
+        sent to the right comm even if several threads handle messages at
+        the same time. Other threads get the comm of the last message.
+        """
+        comm_ids = getattr(self._handling, 'comm_ids', None)
+        if comm_ids:
+            return comm_ids[-1]
+        return self._last_calling_comm_id
+
+    @calling_comm_id.setter
+    def calling_comm_id(self, comm_id):
+        self._last_calling_comm_id = comm_id
+        comm_ids = getattr(self._handling, 'comm_ids', None)
+        if comm_ids:
+            comm_ids[-1] = comm_id
 
     def get_comm_id_list(self, comm_id=None):
         """Get a list of comms id."""
@@ -222,6 +439,12 @@ class CommBase:
             except KeyError:
                 pass
 
+        # Stop streaming replies to closed comms
+        with self._calls_lock:
+            for call_id, stream in list(self._streams.items()):
+                if stream.comm_id in id_list:
+                    del self._streams[call_id]
+
     def is_open(self, comm_id=None):
         """Check to see if the comm is open."""
         if comm_id is None:
@@ -256,6 +479,18 @@ class CommBase:
         """Get a handler for remote calls."""
         return RemoteCallFactory(self, comm_id, callback, **settings)
 
+    def async_remote_call(self, comm_id=None, timeout=None, **settings):
+        """
+        Get a handler for remote calls that return an awaitable.
+
+        Awaiting it gives the return value of the call, without blocking the
+        event loop, or raises its error. A TimeoutError is raised if there's
+        no reply after `timeout` seconds (`TIMEOUT` by default). Cancelling
+        the awaitable stops waiting for the reply.
+        """
+        return RemoteCallFactory(
+            self, comm_id, None, awaitable=True, timeout=timeout, **settings)
+
     # ---- Private -----
     def _send_message(
         self, spyder_msg_type, content=None, comm_id=None, buffers=None
@@ -331,17 +566,24 @@ class CommBase:
         """
         Handle internal spyder messages.
         """
-        self.calling_comm_id = msg['content']['comm_id']
-
-        # Get message dict
-        msg_dict = msg['content']['data']
-        spyder_msg_type = msg_dict['spyder_msg_type']
-        buffers = msg['buffers']
+        # Messages can be handled while handling others (e.g. while waiting
+        # for a reply), so the comms of each thread are kept in a stack.
+        comm_ids = self._handling.__dict__.setdefault('comm_ids', [])
+        comm_ids.append(msg['content']['comm_id'])
+        self._last_calling_comm_id = comm_ids[-1]
+        try:
+            # Get message dict
+            msg_dict = msg['content']['data']
+            spyder_msg_type = msg_dict['spyder_msg_type']
+            buffers = msg['buffers']
 
-        if spyder_msg_type in self._message_handlers:
-            self._message_handlers[spyder_msg_type](msg_dict, buffers)
-        else:
-            logger.debug("No such spyder message type: %s" % spyder_msg_type)
+            if spyder_msg_type in self._message_handlers:
+                self._message_handlers[spyder_msg_type](msg_dict, buffers)
+            else:
+                logger.debug(
+                    "No such spyder message type: %s" % spyder_msg_type)
+        finally:
+            comm_ids.pop()
 
     def _handle_remote_call(self, msg, buffers):
         """Handle a remote call."""
@@ -352,18 +594,34 @@ class CommBase:
             args = msg_dict['call_args']
             kwargs = msg_dict['call_kwargs']
 
+            buffers = list(buffers) if buffers else []
             if buffers:
                 for idx in msg_dict['buffered_args']:
                     args[idx] = buffers.pop(0)
                 for name in msg_dict['buffered_kwargs']:
                     kwargs[name] = buffers.pop(0)
-                assert len(buffers) == 0
+            for key, nbuffers in msg_dict.get('buffered_values', []):
+                container = args if isinstance(key, int) else kwargs
+                container[key] = BufferedValue(
+                    container[key], buffers[:nbuffers])
+                del buffers[:nbuffers]
+            assert not buffers
 
             return_value = self._remote_callback(
                 msg_dict['call_name'],
                 args,
                 kwargs
             )
+            if inspect.isgenerator(return_value):
+                settings = msg_dict['settings']
+                stream = 'stream' in settings and settings['stream']
+                send_reply = (
+                    'send_reply' in settings and settings['send_reply'])
+                if stream and send_reply:
+                    self._start_stream(msg_dict, return_value)
+                    return
+                with self._call_context(msg_dict['call_name']):
+                    return_value = list(return_value)
             self._set_call_return_value(msg_dict, return_value)
         except Exception:
             exc_infos = CommsErrorWrapper(
@@ -378,11 +636,143 @@ class CommBase:
 
         raise CommError("No such spyder call type: %s" % call_name)
 
-    def _set_call_return_value(self, call_dict, return_value, is_error=False):
+    def _call_context(self, call_name):
+        """Context in which the generators returned by handlers are run."""
+        return contextlib.nullcontext()
+
+    def _encode_return_value(self, return_value):
+        """
+        Split a return value or chunk in its JSON-able value and buffers.
+
+        Return them and whether it's a BufferedValue.
+        """
+        if isinstance(return_value, bytes):
+            return None, [return_value], False
+        elif isinstance(return_value, BufferedValue):
+            return return_value.value, return_value.buffers, True
+        return return_value, None, False
+
+    def _decode_return_value(self, return_value, buffers, buffered_return):
+        """Rebuild a value split with `_encode_return_value`."""
+        if buffered_return:
+            return BufferedValue(return_value, buffers)
+        elif buffers:
+            assert len(buffers) == 1
+            return buffers[0]
+        return return_value
+
+    def _start_stream(self, call_dict, generator):
+        """Start sending the chunks of a generator returned by a handler."""
+        settings = call_dict['settings']
+        window = settings.get('stream_window') or STREAM_WINDOW
+        stream = StreamedReply(
+            call_dict, generator, self.calling_comm_id, window)
+        with self._calls_lock:
+            self._streams[call_dict['call_id']] = stream
+        self._send_chunks(stream)
+
+    def _send_chunks(self, stream):
+        """
+        Send the chunks of a StreamedReply while the other side has room for
+        them, and the reply after the last one.
+        """
+        call_dict = stream.call_dict
+        with stream.lock:
+            if stream.sending:
+                return
+            stream.sending = True
+            try:
+                while stream.credits > 0 and not stream.finished:
+                    try:
+                        with self._call_context(call_dict['call_name']):
+                            chunk = next(stream.generator)
+                    except StopIteration:
+                        self._end_stream(stream, None)
+                        break
+                    except Exception:
+                        self._fail_stream(stream)
+                        break
+                    if stream.finished:
+                        # Cancelled while getting the chunk
+                        break
+
+                    try:
+                        value, buffers, buffered_return = (
+                            self._encode_return_value(chunk))
+                        content = {
+                            'call_id': call_dict['call_id'],
+                            'call_name': call_dict['call_name'],
+                            'seq': stream.seq,
+                            'chunk': value,
+                            'buffered_return': buffered_return
+                        }
+                        self._send_message(
+                            'remote_call_chunk',
+                            content=content,
+                            comm_id=stream.comm_id,
+                            buffers=buffers
+                        )
+                    except Exception:
+                        self._fail_stream(stream)
+                        break
+                    stream.seq += 1
+                    stream.credits -= 1
+            finally:
+                stream.sending = False
+
+            if stream.finished:
+                stream.generator.close()
+
+    def _fail_stream(self, stream):
+        """End a StreamedReply with the exception being handled."""
+        call_dict = stream.call_dict
+        exc_infos = CommsErrorWrapper(
+            call_dict['call_name'], call_dict['call_id'])
+        try:
+            self._end_stream(stream, exc_infos, is_error=True)
+        except Exception:
+            # The comm is gone, so nobody can get the error
+            logger.debug(
+                'Could not send the error of {}, id:{}'.format(
+                    call_dict['call_name'], call_dict['call_id']),
+                exc_info=True
+            )
+
+    def _end_stream(self, stream, return_value, is_error=False):
+        """Send the reply of a StreamedReply after its last chunk."""
+        stream.finished = True
+        with self._calls_lock:
+            self._streams.pop(stream.call_dict['call_id'], None)
+        self._set_call_return_value(
+            stream.call_dict, return_value, is_error=is_error, stream=stream)
+
+    def _handle_remote_call_ack(self, msg_dict, buffers):
+        """The other side consumed chunks of a streamed reply."""
+        content = msg_dict['content']
+        call_id = content['call_id']
+        with self._calls_lock:
+            stream = self._streams.get(call_id)
+            if stream is None or stream.comm_id != self.calling_comm_id:
+                return
+            if content.get('cancel'):
+                del self._streams[call_id]
+
+        with stream.lock:
+            if content.get('cancel'):
+                stream.finished = True
+                if not stream.sending:
+                    stream.generator.close()
+                return
+            stream.credits += content['count']
+        self._send_chunks(stream)
+
+    def _set_call_return_value(self, call_dict, return_value, is_error=False,
+                               stream=None):
         """
         A remote call has just been processed.
 
-        This will reply if settings['blocking'] == True
+        This will reply if settings['blocking'] == True. If *stream* is a
+        StreamedReply, the reply marks the end of its chunks.
         """
         settings = call_dict['settings']
 
@@ -398,34 +788,56 @@ class CommBase:
             # Nothing to send back
             return
 
-        buffers = None
-        if isinstance(return_value, bytes):
-            buffers = [return_value]
-            return_value = None
+        return_value, buffers, buffered_return = self._encode_return_value(
+            return_value)
 
         content = {
             'is_error': is_error,
             'call_id': call_dict['call_id'],
             'call_name': call_dict['call_name'],
-            'call_return_value': return_value
+            'call_return_value': return_value,
+            'buffered_return': buffered_return
         }
 
+        comm_id = self.calling_comm_id
+        if stream is not None:
+            content['stream_end'] = True
+            content['stream_chunks'] = stream.seq
+            comm_id = stream.comm_id
+
         self._send_message(
             'remote_call_reply',
             content=content,
-            comm_id=self.calling_comm_id,
+            comm_id=comm_id,
             buffers=buffers
         )
 
-    def _register_call(self, call_dict, callback=None):
+    def _register_call(self, call_dict, callback=None, comm_id=None):
         """
         Register the call so the reply can be properly treated.
+
+        Return its PendingCall, or None if no reply is expected.
         """
         settings = call_dict['settings']
         blocking = 'blocking' in settings and settings['blocking']
+        awaitable = 'awaitable' in settings and settings['awaitable']
+        stream = 'stream' in settings and settings['stream']
         call_id = call_dict['call_id']
-        if blocking or callback is not None:
-            self._reply_waitlist[call_id] = blocking, callback
+        if not blocking and not awaitable and callback is None:
+            return None
+
+        pending_call = PendingCall(
+            call_dict['call_name'], comm_id, blocking, callback,
+            awaitable=awaitable, stream=stream)
+        if awaitable and stream:
+            if 'timeout' in settings and settings['timeout'] is not None:
+                timeout = settings['timeout']
+            else:
+                timeout = TIMEOUT
+            pending_call.reply_stream = ReplyStream(self, call_id, timeout)
+        with self._calls_lock:
+            self._reply_waitlist[call_id] = pending_call
+        return pending_call
 
     def on_outgoing_call(self, call_dict):
         """A message is about to be sent"""
@@ -464,9 +876,40 @@ class CommBase:
         else:
             timeout = TIMEOUT
 
-        self._wait_reply(comm_id, call_id, call_name, timeout)
+        try:
+            self._wait_reply(comm_id, call_id, call_name, timeout)
+        except BaseException:
+            # Don't keep waiting for the reply
+            with self._calls_lock:
+                pending_call = self._reply_waitlist.pop(call_id, None)
+            if pending_call is not None:
+                pending_call.cancel()
+            raise
+
+        with self._calls_lock:
+            content = self._reply_inbox.pop(call_id)
+        return self._get_reply_value(content)
+
+    async def _await_reply(self, pending_call, call_dict):
+        """Wait for the reply of an awaitable call and return its value."""
+        settings = call_dict['settings']
+        if 'timeout' in settings and settings['timeout'] is not None:
+            timeout = settings['timeout']
+        else:
+            timeout = TIMEOUT
 
-        content = self._reply_inbox.pop(call_id)
+        try:
+            content = await asyncio.wait_for(
+                asyncio.wrap_future(pending_call), timeout)
+        except BaseException:
+            # E.g. a timeout or a cancellation
+            with self._calls_lock:
+                self._reply_waitlist.pop(call_dict['call_id'], None)
+            raise
+        return self._get_reply_value(content)
+
+    def _get_reply_value(self, content):
+        """Return the value of a reply, or raise its error."""
         return_value = content['call_return_value']
 
         if content['is_error']:
@@ -489,16 +932,28 @@ class CommBase:
         is_error = content['is_error']
         return_value = content['call_return_value']
 
+        stream_end = content.get('stream_end', False)
+
         # Prepare return value
         if is_error:
             return_value = CommsErrorWrapper.from_json(return_value)
-        elif buffers:
-            assert len(buffers) == 1
-            return_value = buffers[0]
+        else:
+            return_value = self._decode_return_value(
+                return_value, buffers, content.get('buffered_return'))
         content['call_return_value'] = return_value
 
+        # Replies are only taken from the comm the call was sent to
+        with self._calls_lock:
+            pending_call = self._reply_waitlist.get(call_id)
+            if pending_call is not None and pending_call.comm_id in (
+                None, self.calling_comm_id
+            ):
+                del self._reply_waitlist[call_id]
+            else:
+                pending_call = None
+
         # Unexpected reply
-        if call_id not in self._reply_waitlist:
+        if pending_call is None:
             if is_error:
                 return self._async_error(return_value)
             else:
@@ -506,19 +961,152 @@ class CommBase:
                     call_name, call_id))
             return
 
-        blocking, callback = self._reply_waitlist.pop(call_id)
+        # Chunks were lost
+        if (
+            stream_end
+            and not is_error
+            and content['stream_chunks'] != pending_call.received
+        ):
+            content = self._make_error_reply(
+                call_name, call_id,
+                "Got {} of the {} chunks of the reply".format(
+                    pending_call.received, content['stream_chunks'])
+            )
+
+        self._deliver_reply(pending_call, content)
+
+    def _deliver_reply(self, pending_call, content):
+        """Pass the reply *content* of a call to whoever waits for it."""
+        call_id = content['call_id']
+        is_error = content['is_error']
+        return_value = content['call_return_value']
+        stream_end = content.get('stream_end', False)
+
+        # Async iterator. Its error is raised when it gets to the end.
+        if pending_call.reply_stream is not None:
+            if not stream_end and not is_error:
+                # The handler didn't return a generator
+                pending_call.reply_stream.put('chunk', return_value)
+            pending_call.reply_stream.put('end', content)
+            pending_call.set_reply(content)
+            return
 
         # Async error
-        if is_error and not blocking:
+        if is_error and not (pending_call.blocking or pending_call.awaitable):
+            pending_call.set_reply(content)
             return self._async_error(return_value)
 
-        # Callback
-        if callback is not None and not is_error:
-            callback(return_value)
+        # Callback. The chunks of streams were already passed to it.
+        if (
+            pending_call.callback is not None
+            and not is_error
+            and not stream_end
+        ):
+            pending_call.callback(return_value)
 
         # Blocking inbox
-        if blocking:
-            self._reply_inbox[call_id] = content
+        if stream_end and not is_error:
+            content['call_return_value'] = pending_call.chunks
+        if pending_call.blocking:
+            with self._calls_lock:
+                self._reply_inbox[call_id] = content
+        pending_call.set_reply(content)
+
+    def _handle_remote_call_chunk(self, msg_dict, buffers):
+        """
+        A call with a streamed reply received a chunk.
+        """
+        content = msg_dict['content']
+        call_id = content['call_id']
+        comm_id = self.calling_comm_id
+        chunk = self._decode_return_value(
+            content['chunk'], buffers, content['buffered_return'])
+
+        # Calls sent to all comms only take the chunks of the first one
+        in_order = True
+        with self._calls_lock:
+            pending_call = self._reply_waitlist.get(call_id)
+            if pending_call is not None and pending_call.comm_id in (
+                None, comm_id
+            ):
+                pending_call.comm_id = comm_id
+                in_order = content['seq'] == pending_call.received
+                pending_call.received += 1
+                if not in_order:
+                    del self._reply_waitlist[call_id]
+            else:
+                pending_call = None
+
+        # Nobody waits for this stream anymore
+        if pending_call is None:
+            logger.debug('Got an unexpected chunk {}, id:{}'.format(
+                content['call_name'], call_id))
+            self._ack_chunks(call_id, comm_id, count=0, cancel=True)
+            return
+
+        # Chunks were lost or reordered, so the reply would be wrong
+        if not in_order:
+            self._ack_chunks(call_id, comm_id, count=0, cancel=True)
+            self._deliver_reply(pending_call, self._make_error_reply(
+                content['call_name'], call_id,
+                "Got chunk {} of the reply instead of chunk {}".format(
+                    content['seq'], pending_call.received - 1)
+            ))
+            return
+
+        # The async iterator acknowledges chunks when they are consumed
+        if pending_call.reply_stream is not None:
+            pending_call.reply_stream.put('chunk', chunk, comm_id)
+            return
+
+        try:
+            if pending_call.blocking:
+                pending_call.chunks.append(chunk)
+            if pending_call.callback is not None:
+                pending_call.callback(chunk)
+        finally:
+            self._ack_chunks(call_id, comm_id)
+
+    def _make_error_reply(self, call_name, call_id, message):
+        """Make the content of a reply that raises a CommError here."""
+        try:
+            raise CommError(message)
+        except CommError:
+            error_wrapper = CommsErrorWrapper(call_name, call_id)
+        return {
+            'is_error': True,
+            'call_id': call_id,
+            'call_name': call_name,
+            'call_return_value': error_wrapper,
+            'buffered_return': False
+        }
+
+    def _ack_chunks(self, call_id, comm_id, count=1, cancel=False):
+        """
+        Tell the other side that chunks of a streamed reply were consumed,
+        or that it should stop sending them.
+        """
+        content = {
+            'call_id': call_id,
+            'count': count,
+            'cancel': cancel
+        }
+        try:
+            self._send_message(
+                'remote_call_ack', content=content, comm_id=comm_id)
+        except CommError:
+            # The other side is gone, so it doesn't send chunks anymore
+            pass
+
+    def _cancel_stream(self, call_id):
+        """Stop waiting for a streamed reply and the chunks of it."""
+        with self._calls_lock:
+            pending_call = self._reply_waitlist.pop(call_id, None)
+        if pending_call is None:
+            return
+        pending_call.cancel()
+        self._ack_chunks(
+            call_id, pending_call.comm_id, count=0, cancel=True)
 
     def _async_error(self, error_wrapper):
         """
@@ -568,10 +1156,16 @@ class RemoteCall():
         """
         Transmit the call to the other side of the tunnel.
 
-        The args and kwargs have to be JSON-serializable or bytes.
+        The args and kwargs have to be JSON-serializable, bytes or
+        BufferedValues. Awaitable calls (see `async_remote_call`) return a
+        coroutine that waits for the reply, or an async iterator over its
+        chunks if they are streamed (see `ReplyStream`).
         """
         blocking = 'blocking' in self._settings and self._settings['blocking']
-        self._settings['send_reply'] = blocking or self._callback is not None
+        awaitable = (
+            'awaitable' in self._settings and self._settings['awaitable'])
+        self._settings['send_reply'] = (
+            blocking or awaitable or self._callback is not None)
 
         # The call will be serialized with json. The bytes are sent separately.
         buffers = []
@@ -592,6 +1186,17 @@ class RemoteCall():
                 buffered_kwargs.append(name)
                 kwargs[name] = None
 
+        # Their buffers go after the bytes, in the same order
+        buffered_values = []
+        for key, arg in list(enumerate(args)) + list(kwargs.items()):
+            if isinstance(arg, BufferedValue):
+                buffers.extend(arg.buffers)
+                buffered_values.append([key, len(arg.buffers)])
+                if isinstance(key, int):
+                    args[key] = arg.value
+                else:
+                    kwargs[key] = arg.value
+
         call_id = uuid.uuid4().hex
         call_dict = {
             'call_name': self._name,
@@ -600,16 +1205,22 @@ class RemoteCall():
             'call_args': args,
             'call_kwargs': kwargs,
             'buffered_args': buffered_args,
-            'buffered_kwargs': buffered_kwargs
+            'buffered_kwargs': buffered_kwargs,
+            'buffered_values': buffered_values
         }
 
         if not self._comms_wrapper.is_open(self._comm_id):
-            # Only an error if the call is blocking.
-            if blocking:
+            # Only an error if the call waits for its reply.
+            if blocking or awaitable:
                 raise CommError("The comm is not connected.")
             logger.debug("Call to unconnected comm: %s" % self._name)
             return
-        self._comms_wrapper._register_call(call_dict, self._callback)
+        pending_call = self._comms_wrapper._register_call(
+            call_dict, self._callback, comm_id=self._comm_id)
         self._comms_wrapper._send_call(call_dict, self._comm_id, buffers)
+        if awaitable and pending_call.reply_stream is not None:
+            return pending_call.reply_stream
+        if awaitable:
+            return self._comms_wrapper._await_reply(pending_call, call_dict)
         return self._comms_wrapper._get_call_return_value(
             call_dict, self._comm_id)
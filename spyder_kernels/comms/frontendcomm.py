@@ -36,6 +36,21 @@ def frontend_request(blocking, timeout=None):
         timeout=timeout)
 
 
+def async_frontend_request(timeout=None):
+    """
+    Send a request to the frontend that returns an awaitable.
+
+    Awaiting it gives the return value, without blocking the event loop.
+    """
+    if not get_ipython().kernel.frontend_comm.is_open():
+        raise CommError("Can't make a request to a closed comm")
+    # Get a reply from the last frontend to have sent a message
+    frontend_comm = get_ipython().kernel.frontend_comm
+    return frontend_comm.async_remote_call(
+        comm_id=frontend_comm.calling_comm_id,
+        timeout=timeout)
+
+
 class FrontendComm(CommBase):
     """Mixin to implement the spyder_shell_api."""
 
@@ -47,13 +62,23 @@ class FrontendComm(CommBase):
         self.kernel.comm_manager.register_target(
             self._comm_name, self._comm_open)
         self.comm_lock = threading.Lock()
+        # Notified after each message is handled, to wake up threads that
+        # wait for a condition (see `wait_until`).
+        self._message_condition = threading.Condition()
         self._cached_messages = {}
         self._pending_comms = {}
 
+        # Event loop that runs the handlers of the messages received by
+        # `poll_one`. It's reused because creating a loop for each message
+        # is slow.
+        self._poll_loop = None
+
     def close(self, comm_id=None):
         """Close the comm and notify the other side."""
         with self.comm_lock:
-            return super(FrontendComm, self).close(comm_id)
+            super(FrontendComm, self).close(comm_id)
+        if not self.is_open():
+            self._close_poll_loop()
 
     def _send_message(self, *args, **kwargs):
         """Publish custom messages to the other side."""
@@ -82,7 +107,7 @@ class FrontendComm(CommBase):
             self.kernel.log.warning("Unknown message type: %r", msg_type)
             return
         try:
-            asyncio.run(handler(out_stream, ident, msg))
+            self._run_handler(handler(out_stream, ident, msg))
         except Exception:
             self.kernel.log.error(
                 "Exception in message handler:", exc_info=True)
@@ -107,16 +132,29 @@ class FrontendComm(CommBase):
         """Wait until condition is met. Returns False if timeout."""
         if condition():
             return True
+        if threading.current_thread() is not self.kernel.parent.control_thread:
+            # Messages are handled by the control thread, which wakes us up
+            # after each one (see `_comm_message`). Waits without a timeout
+            # can't be interrupted on Windows, so wait in short slices.
+            t_start = time.time()
+            with self._message_condition:
+                while True:
+                    if timeout is None:
+                        wait_time = 0.1
+                    else:
+                        remaining = t_start + timeout - time.time()
+                        if remaining <= 0:
+                            return bool(condition())
+                        wait_time = min(remaining, 0.1)
+                    if self._message_condition.wait_for(condition, wait_time):
+                        return True
+
         t_start = time.time()
         while not condition():
             if timeout is not None and time.time() > t_start + timeout:
                 return False
-            if threading.current_thread() is self.kernel.parent.control_thread:
-                # Wait for a reply on the comm channel.
-                self.poll_one()
-            else:
-                # Wait 10ms for a reply
-                time.sleep(0.01)
+            # Wait for a reply on the comm channel.
+            self.poll_one()
         return True
 
     def cache_message(self, comm_id, msg):
@@ -126,6 +164,21 @@ class FrontendComm(CommBase):
         self._cached_messages[comm_id].append(msg)
 
     # --- Private --------
+    def _run_handler(self, coroutine):
+        """Run the coroutine of a message handler until it's complete."""
+        if self._poll_loop is None or self._poll_loop.is_closed():
+            self._poll_loop = asyncio.new_event_loop()
+        return self._poll_loop.run_until_complete(coroutine)
+
+    def _close_poll_loop(self):
+        """Close the event loop of the message handlers if it's idle."""
+        loop = self._poll_loop
+        if loop is None or loop.is_closed() or loop.is_running():
+            return
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+        self._poll_loop = None
+
     def _check_comm_reply(self):
         """
         Send comm message to frontend to check if the iopub channel is ready
@@ -170,6 +223,14 @@ class FrontendComm(CommBase):
                 "Timeout while waiting for '{}' reply.".format(
                     call_name))
 
+    def _comm_message(self, msg):
+        """Handle a message and wake up the threads waiting for it."""
+        try:
+            super()._comm_message(msg)
+        finally:
+            with self._message_condition:
+                self._message_condition.notify_all()
+
     def _comm_open(self, comm, msg):
         """
         A new comm is open!
@@ -213,3 +274,6 @@ class FrontendComm(CommBase):
             return super(FrontendComm, self)._remote_callback(
                 call_name, call_args, call_kwargs)
 
+    def _call_context(self, call_name):
+        """Warn about prints of the generators returned by handlers too."""
+        return WriteContext(call_name)
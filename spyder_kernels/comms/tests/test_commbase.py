@@ -10,8 +10,20 @@
 Tests for commbase.py
 """
 
+# Standard library imports
+import asyncio
+import json
+import threading
+import time
+
+# Third party imports
+import pytest
+
 # Local imports
 from spyder_kernels.comms.commbase import (
+    BufferedValue,
+    CommBase,
+    CommError,
     stacksummary_from_json,
     stacksummary_to_json,
 )
@@ -27,3 +39,349 @@ def test_stacksummary_roundtrip():
     ]
     stacksummary = stacksummary_from_json(json)
     assert stacksummary_to_json(stacksummary) == json
+
+
+class LoopbackComm(CommBase):
+    """Comm that delivers messages to another one synchronously."""
+
+    def _wait_reply(self, comm_id, call_id, call_name, timeout):
+        # Replies are received before the call returns
+        pass
+
+
+class FakeComm:
+    """Comm that forwards messages to a callback."""
+
+    def __init__(self, comm_id, receive):
+        self.comm_id = comm_id
+        self._receive = receive
+
+    def on_msg(self, callback):
+        pass
+
+    def on_close(self, callback):
+        pass
+
+    def send(self, msg_dict, buffers=None):
+        # Like real comms, only send what can be serialized
+        msg_dict = json.loads(json.dumps(msg_dict))
+        self._receive({
+            'content': {'comm_id': self.comm_id, 'data': msg_dict},
+            'buffers': list(buffers or []),
+        })
+
+
+def test_buffered_values():
+    """Test that BufferedValues are sent as args and return values."""
+    caller = LoopbackComm()
+    callee = LoopbackComm()
+    caller._register_comm(FakeComm('comm', callee._comm_message))
+    callee._register_comm(FakeComm('comm', caller._comm_message))
+
+    def join(prefix, value, suffix):
+        assert isinstance(value, BufferedValue)
+        assert isinstance(suffix, BufferedValue)
+        return BufferedValue(
+            {'header': value.value, 'suffix': suffix.value},
+            [prefix] + value.buffers
+        )
+
+    callee.register_call_handler('join', join)
+    result = caller.remote_call(blocking=True).join(
+        b'a', BufferedValue('header', [b'b', memoryview(b'c')]),
+        suffix=BufferedValue(None, [])
+    )
+    assert isinstance(result, BufferedValue)
+    assert result.value == {'header': 'header', 'suffix': None}
+    assert [bytes(buf) for buf in result.buffers] == [b'a', b'b', b'c']
+
+
+class ThreadedComm(CommBase):
+    """Comm that waits for replies handled by other threads."""
+
+    def _wait_reply(self, comm_id, call_id, call_name, timeout):
+        deadline = time.monotonic() + timeout
+        while call_id not in self._reply_inbox:
+            if time.monotonic() > deadline:
+                raise TimeoutError(call_name)
+            time.sleep(0.001)
+
+
+def handle_in_thread(receive):
+    """Return a function that handles each message in a new thread."""
+    def handle(msg):
+        threading.Thread(target=receive, args=(msg,)).start()
+    return handle
+
+
+def test_concurrent_calls():
+    """
+    Test that blocking calls made by several threads at the same time get
+    their own replies, and that replies are sent to the calling comms.
+    """
+    callee = ThreadedComm()
+    callers = {}
+    for comm_id in ['a', 'b']:
+        caller = ThreadedComm()
+        caller._register_comm(
+            FakeComm(comm_id, handle_in_thread(callee._comm_message)))
+        callee._register_comm(FakeComm(comm_id, caller._comm_message))
+        callers[comm_id] = caller
+
+    def whoami(delay):
+        # Replies are sent in the reverse order of the calls
+        time.sleep(delay)
+        return callee.calling_comm_id
+
+    callee.register_call_handler('whoami', whoami)
+
+    results = {}
+
+    def call(comm_id, index):
+        results[comm_id, index] = callers[comm_id].remote_call(
+            blocking=True, timeout=10).whoami(0.05 * (5 - index))
+
+    threads = [
+        threading.Thread(target=call, args=(comm_id, index))
+        for comm_id in callers for index in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {
+        (comm_id, index): comm_id for comm_id in callers for index in range(5)
+    }
+    for caller in callers.values():
+        assert caller._reply_waitlist == {}
+        assert caller._reply_inbox == {}
+
+
+def test_pending_call():
+    """Test that calls get a future that is done when they get a reply."""
+    caller = LoopbackComm()
+    callee = LoopbackComm()
+    caller._register_comm(FakeComm('comm', callee._comm_message))
+    callee._register_comm(FakeComm('comm', caller._comm_message))
+    callee.register_call_handler('add', lambda a, b: a + b)
+
+    call_dict = {
+        'call_name': 'add', 'call_id': 'id', 'settings': {'blocking': True},
+        'call_args': [1, 2], 'call_kwargs': {}, 'buffered_args': [],
+        'buffered_kwargs': [], 'buffered_values': []
+    }
+    pending_call = caller._register_call(call_dict, comm_id='comm')
+    assert not pending_call.done()
+    call_dict['settings']['send_reply'] = True
+    caller._send_call(call_dict, 'comm')
+    assert pending_call.result(0)['call_return_value'] == 3
+
+
+def test_async_remote_call():
+    """Test awaiting several calls at once, timeouts and cancellations."""
+    caller = ThreadedComm()
+    callee = ThreadedComm()
+    caller._register_comm(
+        FakeComm('comm', handle_in_thread(callee._comm_message)))
+    callee._register_comm(FakeComm('comm', caller._comm_message))
+
+    def wait(delay):
+        if delay < 0:
+            raise ValueError("Negative delay")
+        time.sleep(delay)
+        return delay
+
+    callee.register_call_handler('wait', wait)
+
+    async def main():
+        # All calls are made before waiting for their replies
+        start = time.monotonic()
+        results = await asyncio.gather(*[
+            caller.async_remote_call(timeout=10).wait(0.2)
+            for __ in range(5)
+        ])
+        assert results == [0.2] * 5
+        assert time.monotonic() - start < 0.8
+
+        with pytest.raises(ValueError):
+            await caller.async_remote_call().wait(-1)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await caller.async_remote_call(timeout=0.01).wait(0.2)
+
+        task = asyncio.ensure_future(caller.async_remote_call().wait(0.2))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert caller._reply_waitlist == {}
+
+    asyncio.run(main())
+    time.sleep(0.3)
+    assert caller._reply_waitlist == {}
+    assert caller._reply_inbox == {}
+
+
+def make_loopback_comms():
+    """Make a caller and a callee connected synchronously."""
+    caller = LoopbackComm()
+    callee = LoopbackComm()
+    caller._register_comm(FakeComm('comm', callee._comm_message))
+    callee._register_comm(FakeComm('comm', caller._comm_message))
+    return caller, callee
+
+
+def test_streamed_reply():
+    """Test that the chunks of generators are sent one by one."""
+    caller, callee = make_loopback_comms()
+
+    def count(n):
+        for i in range(n):
+            yield i
+        if n > 5:
+            raise ValueError("Too many")
+
+    callee.register_call_handler('count', count)
+
+    # Blocking calls get a list, whether the chunks are streamed or not
+    assert caller.remote_call(blocking=True, stream=True).count(5) == (
+        [0, 1, 2, 3, 4])
+    assert caller.remote_call(blocking=True).count(3) == [0, 1, 2]
+
+    # Callbacks get each chunk
+    chunks = []
+    caller.remote_call(callback=chunks.append, stream=True).count(5)
+    assert chunks == [0, 1, 2, 3, 4]
+
+    # Errors are raised after the chunks that were sent
+    chunks = []
+    with pytest.raises(ValueError):
+        caller.remote_call(
+            blocking=True, callback=chunks.append, stream=True).count(6)
+    assert chunks == [0, 1, 2, 3, 4, 5]
+
+    assert caller._reply_waitlist == {}
+    assert caller._reply_inbox == {}
+    assert callee._streams == {}
+
+
+def test_broken_streamed_reply():
+    """Test that chunks that can't be sent or were lost end the stream."""
+    caller, callee = make_loopback_comms()
+    closed = []
+
+    def produce(n, bad=None):
+        try:
+            for i in range(n):
+                yield object() if i == bad else i
+        finally:
+            closed.append(n)
+
+    callee.register_call_handler('produce', produce)
+
+    # Chunks that can't be encoded raise on the other side
+    chunks = []
+    with pytest.raises(TypeError):
+        caller.remote_call(
+            blocking=True, callback=chunks.append, stream=True,
+            stream_window=1, timeout=1
+        ).produce(4, bad=2)
+    assert chunks == [0, 1]
+    assert closed == [4]
+    assert callee._streams == {}
+
+    # Chunks that are lost or reordered raise too
+    for dropped in [0, 1, 2]:
+        def send_to_caller(msg, dropped=dropped):
+            msg_dict = msg['content']['data']
+            if msg_dict['spyder_msg_type'] != 'remote_call_chunk' or (
+                msg_dict['content']['seq'] != dropped
+            ):
+                caller._comm_message(msg)
+
+        callee._comms['comm']['comm'] = FakeComm('comm', send_to_caller)
+        with pytest.raises(CommError):
+            caller.remote_call(
+                blocking=True, stream=True, timeout=1).produce(3)
+        assert callee._streams == {}
+
+    assert caller._reply_waitlist == {}
+    assert caller._reply_inbox == {}
+
+
+def test_async_streamed_reply():
+    """Test flow control and cancellation of async iterators over chunks."""
+    caller, callee = make_loopback_comms()
+    produced = []
+    closed = []
+
+    def produce(n):
+        try:
+            for i in range(n):
+                produced.append(i)
+                yield BufferedValue(i, [bytes([i])])
+        finally:
+            closed.append(n)
+
+    callee.register_call_handler('produce', produce)
+    callee.register_call_handler('add', lambda a, b: a + b)
+
+    async def main():
+        # Only a window of chunks is produced before they are consumed
+        chunks = caller.async_remote_call(
+            stream=True, stream_window=2).produce(5)
+        assert produced == [0, 1]
+        values = []
+        async for chunk in chunks:
+            values.append((chunk.value, bytes(chunk.buffers[0])))
+            assert len(produced) <= len(values) + 2
+        assert values == [(i, bytes([i])) for i in range(5)]
+        assert closed == [5]
+
+        # Closing the iterator closes the generator
+        produced.clear()
+        chunks = caller.async_remote_call(stream=True).produce(100)
+        assert (await chunks.__anext__()).value == 0
+        await chunks.aclose()
+        assert closed == [5, 100]
+        assert len(produced) <= 5
+        assert callee._streams == {}
+
+        # Other return values are a single chunk
+        assert [
+            value async for value in
+            caller.async_remote_call(stream=True).add(1, 2)
+        ] == [3]
+
+    asyncio.run(main())
+    assert caller._reply_waitlist == {}
+    assert caller._reply_inbox == {}
+
+
+def test_threaded_streamed_reply():
+    """Test streamed replies whose chunks are handled by other threads."""
+    caller = ThreadedComm()
+    callee = ThreadedComm()
+    caller._register_comm(
+        FakeComm('comm', handle_in_thread(callee._comm_message)))
+    callee._register_comm(FakeComm('comm', caller._comm_message))
+
+    def count(n):
+        for i in range(n):
+            time.sleep(0.001)
+            yield i
+
+    callee.register_call_handler('count', count)
+    assert caller.remote_call(
+        blocking=True, stream=True, timeout=10).count(20) == list(range(20))
+
+    async def main():
+        return [
+            chunk async for chunk in
+            caller.async_remote_call(stream=True, timeout=10).count(20)
+        ]
+
+    assert asyncio.run(main()) == list(range(20))
+    assert caller._reply_waitlist == {}
+    assert caller._reply_inbox == {}
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright (c) 2025- Spyder Kernels Contributors
+#
+# Licensed under the terms of the MIT License
+# (see spyder_kernels/__init__.py for details)
+# -----------------------------------------------------------------------------
+
+"""
+Tests for frontendcomm.py
+"""
+
+# Standard library imports
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+# Local imports
+from spyder_kernels.comms.frontendcomm import FrontendComm
+
+
+def make_frontend_comm():
+    """Make a FrontendComm with a fake kernel."""
+    kernel = SimpleNamespace(
+        comm_manager=SimpleNamespace(register_target=lambda *args: None),
+        parent=SimpleNamespace(control_thread=None)
+    )
+    return FrontendComm(kernel)
+
+
+def test_wait_until():
+    """Test that threads waiting for a message are woken up by it."""
+    comm = make_frontend_comm()
+    received = []
+    msg = {
+        'content': {'comm_id': None, 'data': {'spyder_msg_type': 'noop'}},
+        'buffers': []
+    }
+
+    def control():
+        time.sleep(0.1)
+        received.append(True)
+        comm._comm_message(msg)
+
+    thread = threading.Thread(target=control)
+    comm.kernel.parent.control_thread = thread
+    thread.start()
+    assert comm.wait_until(lambda: received, timeout=10)
+    thread.join()
+
+    assert not comm.wait_until(lambda: False, timeout=0.01)
+
+    # Waits without a timeout wake up regularly to check the condition
+    timer = threading.Timer(0.05, received.clear)
+    timer.start()
+    assert comm.wait_until(lambda: not received)
+    timer.join()
+
+
+def test_poll_one():
+    """Test that messages are handled in the same event loop."""
+    loops = []
+
+    async def handler(stream, ident, msg):
+        loops.append(asyncio.get_running_loop())
+
+    comm = make_frontend_comm()
+    msg = {'header': {'msg_type': 'comm_msg'}}
+    comm.kernel.session = SimpleNamespace(
+        recv=lambda socket, mode: (None, msg))
+    comm.kernel.parent.control_socket = None
+    comm.kernel.shell_streams = []
+    comm.kernel.control_handlers = {'comm_msg': handler}
+
+    comm.poll_one()
+    comm.poll_one()
+    assert len(loops) == 2
+    assert loops[0] is loops[1]
+    assert not loops[0].is_running()
+
+    # The loop is closed with the comm, and a new one is made if needed
+    comm.close()
+    assert loops[0].is_closed()
+    comm.poll_one()
+    assert not loops[2].is_closed()
+    comm.close()
+    assert loops[2].is_closed()
@@ -11,6 +11,7 @@ Spyder kernel for Jupyter.
 """
 
 # Standard library imports
+import asyncio
 import faulthandler
 import json
 import logging
@@ -33,7 +34,8 @@ from zmq.utils.garbage import gc
 
 # Local imports
 import spyder_kernels
-from spyder_kernels.comms.commbase import stacksummary_to_json
+from spyder_kernels.comms.commbase import (
+    BufferedValue, stacksummary_to_json)
 from spyder_kernels.comms.frontendcomm import FrontendComm
 from spyder_kernels.comms.decorators import (
     register_comm_handlers, comm_handler)
@@ -45,11 +47,26 @@ from spyder_kernels.utils.pythonenv import (
     PythonEnvInfo,
     PythonEnvType,
 )
+from spyder_kernels.utils.arraystats import array_stats
+from spyder_kernels.utils.datawindow import (
+    RowOrderCache, encode_window, get_window)
 from spyder_kernels.utils.iofuncs import iofunctions
 from spyder_kernels.utils.mpl import automatic_backend, MPL_BACKENDS_TO_SPYDER
 from spyder_kernels.utils.nsview import (
-    get_remote_data, make_remote_view, get_size)
+    VAR_TIME_BUDGET,
+    VIEW_TIME_BUDGET,
+    DisplayCache,
+    ViewBudget,
+    get_remote_data,
+    get_remote_view_diff,
+    make_attr_entry,
+    make_attrs_page,
+    make_remote_snapshot,
+    make_remote_view_page,
+    set_item_at_path,
+)
 from spyder_kernels.utils.style import create_pygments_dict
+from spyder_kernels.utils.transfer import decode_value, encode_value
 from spyder_kernels.console.shell import SpyderShell
 from spyder_kernels.comms.utils import WriteContext
 
@@ -61,6 +78,12 @@ logger = logging.getLogger(__name__)
 # shown at all there)
 EXCLUDED_NAMES = ['In', 'Out', 'exit', 'get_ipython', 'quit']
 
+# State keys that are sent as diffs to the comms that support them
+DIFF_STATE_KEYS = ['namespace_view', 'var_properties']
+
+# Time (in seconds) during which requests to publish the state are merged
+PUBLISH_STATE_DELAY = 0.05
+
 
 class SpyderKernel(IPythonKernel):
     """Spyder kernel for Jupyter."""
@@ -79,6 +102,34 @@ class SpyderKernel(IPythonKernel):
 
         self.namespace_view_settings = {}
         self.faulthandler_handle = None
+
+        # Last state published to the comms that receive state diffs, and
+        # sequence number of the last published state.
+        self._published_states = {}
+        self._state_seq = 0
+
+        # Whether a debounced publication of the state is pending, and
+        # number of requests to publish it that were merged with others.
+        self._publish_lock = threading.Lock()
+        self._publish_pending = False
+        self.merged_state_publishes = 0
+
+        # To reuse the namespace view of variables that didn't change
+        self._display_cache = DisplayCache()
+
+        # To limit the time spent on displaying the namespace view
+        self._view_budget = ViewBudget()
+
+        # To limit the time spent on evaluating object attributes
+        self._attr_budget = ViewBudget()
+
+        # To scroll through sorted or filtered data without sorting or
+        # filtering it again
+        self._row_orders = RowOrderCache()
+
+        # To update the state when the min and max of big arrays are ready
+        array_stats.on_update = self._on_array_stats_update
+
         self._cwd_initialised = False
 
         # Add handlers to control to process messages while debugging
@@ -135,20 +186,112 @@ class SpyderKernel(IPythonKernel):
         with WriteContext("get_state"):
             if self._cwd_initialised:
                 state["cwd"] = self.get_cwd()
-            state["namespace_view"] = self.get_namespace_view()
-            state["var_properties"] = self.get_var_properties()
+            (
+                state["namespace_view"], state["var_properties"]
+            ) = self._get_namespace_snapshot()
         return state
 
     def publish_state(self):
-        """Publish the current kernel state"""
+        """
+        Request to publish the current kernel state.
+
+        Requests are merged with the ones made in the next
+        `PUBLISH_STATE_DELAY` seconds, so the state is computed and sent
+        once from the IO loop. Use `flush_state` to publish it right away.
+        """
+        io_loop = getattr(self, 'io_loop', None)
+        if io_loop is None:
+            self._publish_state()
+            return
+
+        if self.shell.is_debugging() and not self._on_io_loop(io_loop):
+            # The IO loop is blocked while the debugger waits for input
+            with self._publish_lock:
+                self._publish_pending = False
+            self._publish_state()
+            return
+
+        with self._publish_lock:
+            if self._publish_pending:
+                self.merged_state_publishes += 1
+                return
+            self._publish_pending = True
+
+        # This can be called from other threads, and add_callback is the
+        # only thread-safe method of the IO loop.
+        io_loop.add_callback(
+            io_loop.call_later, PUBLISH_STATE_DELAY, self.flush_state)
+
+    def _on_io_loop(self, io_loop):
+        """Check if this is called from the IO loop."""
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        return running_loop is getattr(io_loop, 'asyncio_loop', None)
+
+    def flush_state(self):
+        """
+        Publish the state now if it was requested and not published yet.
+
+        Return True if it was published.
+        """
+        with self._publish_lock:
+            if not self._publish_pending:
+                return False
+            self._publish_pending = False
+        self._publish_state()
+        return True
+
+    def _publish_state(self):
+        """
+        Publish the current kernel state.
+
+        Comms that enabled state diffs (see `set_configuration`) only receive
+        the namespace entries that changed since the last state they got.
+        """
         if not self.frontend_comm.is_open():
             # No one to send to
             return
         try:
-            self.frontend_call(blocking=False).update_state(self.get_state())
+            state = self.get_state()
+            self._state_seq += 1
+
+            comm_ids = self.frontend_comm.get_comm_id_list()
+            for comm_id in list(self._published_states):
+                if comm_id not in comm_ids:
+                    # The comm was closed
+                    self._published_states.pop(comm_id)
+
+            for comm_id in comm_ids:
+                self.frontend_comm.remote_call(
+                    comm_id=comm_id
+                ).update_state(self._get_comm_state(comm_id, state))
         except Exception:
             pass
 
+        self._complete_deferred_state()
+
+    @comm_handler
+    def resync_state(self):
+        """
+        Get the full kernel state.
+
+        This is used by comms that receive state diffs to start over when
+        they miss one of them (i.e. when its `base_seq` is not the `seq` of
+        the last state they got).
+        """
+        state = self.get_state()
+        self._state_seq += 1
+        state["state_seq"] = self._state_seq
+
+        comm_id = self.frontend_comm.calling_comm_id
+        if comm_id in self._published_states:
+            self._published_states[comm_id] = (self._state_seq, state)
+
+        self._complete_deferred_state()
+        return state
+
     def enable_faulthandler(self):
         """
         Open a file to save the faulthandling and identifiers for
@@ -304,7 +447,7 @@ class SpyderKernel(IPythonKernel):
 
     # --- For the Variable Explorer
     @comm_handler
-    def get_namespace_view(self, frame=None):
+    def get_namespace_view(self, frame=None, query=None):
         """
         Return the namespace view
 
@@ -329,13 +472,65 @@ class SpyderKernel(IPythonKernel):
           `get_type_string`.
         * 'numpy_type' is its Numpy type (if any) computed with
           `get_numpy_type_string`.
+
+        If the `show_memory` setting is True, entries also have the bytes
+        of memory used by each variable under 'memory'. Buffers shared by
+        several variables are only counted once.
+
+        Variables that take too long to display (see the `var_time_budget`
+        and `view_time_budget` settings) get a placeholder entry with
+        'deferred' or 'skipped' set to True instead. Deferred entries are
+        sent in a follow-up state update.
+
+        If `query` is given, only the variables that match it are displayed
+        and returned. It's a dictionary with a name regex or glob, a list of
+        types and bounds of the size and memory of variables (see
+        `make_query_filter`).
+        """
+
+        view = self._get_namespace_snapshot(frame=frame, query=query)[0]
+        self._complete_deferred_state()
+        return view
+
+    @comm_handler
+    def get_namespace_view_page(self, offset=0, limit=None, sort_key='name',
+                                reverse=False, name_filter=None,
+                                type_filter=None, frame=None, query=None):
         """
+        Return a window of the namespace view
+
+        Variables are filtered with the namespace view settings and, if
+        given, by `name_filter` and `type_filter`, which are matched as
+        case-insensitive substrings of their names and types, and by
+        `query` (see `get_namespace_view`). Then they are sorted by
+        `sort_key`, which can be 'name', 'type', 'size' or 'memory'.
+
+        The returned dictionary has the following structure
+
+        {
+            'total': 1200,
+            'offset': 100,
+            'view': {'a': {...}, ...}
+        }
 
+        Here:
+        * 'total' is the number of variables that passed the filters.
+        * 'offset' is the position of the first variable in the window.
+        * 'view' has the entries of `get_namespace_view` for at most `limit`
+          variables, in sorted order. Only these variables are displayed.
+        """
         settings = self.namespace_view_settings
         if settings:
             ns = self.shell._get_current_namespace(frame=frame)
-            view = make_remote_view(ns, settings, EXCLUDED_NAMES)
-            return view
+            budget = self._get_view_budget(settings)
+            with budget.complete_pass():
+                return make_remote_view_page(
+                    ns, settings, offset=offset, limit=limit,
+                    sort_key=sort_key, reverse=reverse,
+                    name_filter=name_filter, type_filter=type_filter,
+                    more_excluded_names=EXCLUDED_NAMES,
+                    cache=self._display_cache, budget=budget, query=query
+                )
         else:
             return None
 
@@ -345,53 +540,125 @@ class SpyderKernel(IPythonKernel):
         Get some properties of the variables in the current
         namespace
         """
-        settings = self.namespace_view_settings
-        if settings:
-            ns = self.shell._get_current_namespace()
-            data = get_remote_data(ns, settings, mode='editable',
-                                   more_excluded_names=EXCLUDED_NAMES)
-
-            properties = {}
-            for name, value in list(data.items()):
-                properties[name] = {
-                    'is_list':  self._is_list(value),
-                    'is_dict':  self._is_dict(value),
-                    'is_set': self._is_set(value),
-                    'len': self._get_len(value),
-                    'is_array': self._is_array(value),
-                    'is_image': self._is_image(value),
-                    'is_data_frame': self._is_data_frame(value),
-                    'is_series': self._is_series(value),
-                    'array_shape': self._get_array_shape(value),
-                    'array_ndim': self._get_array_ndim(value)
-                }
-
-            return properties
-        else:
-            return None
+        return self._get_namespace_snapshot()[1]
 
     @comm_handler
-    def get_value(self, name, encoded=False):
-        """Get the value of a variable"""
+    def get_object_attrs_page(self, name, attr_path=None, offset=0,
+                              limit=None):
+        """
+        Return a window of the attributes of a variable
+
+        `attr_path` is a list of attribute names to inspect the attributes
+        of an attribute (e.g. ['a', 'b'] for `name.a.b`).
+
+        Only plain attributes and methods are displayed. Properties, other
+        descriptors and dynamic attributes only have their 'kind' and are
+        evaluated on demand with `get_object_attr`. The returned dictionary
+        is described in `make_attrs_page`.
+        """
+        obj = self._get_object_at_attr_path(name, attr_path or [])
+        return make_attrs_page(obj, offset=offset, limit=limit,
+                               budget=self._get_attr_budget())
+
+    @comm_handler
+    def get_object_attr(self, name, attr_path):
+        """
+        Evaluate an attribute of a variable of any kind and return its row
+
+        `attr_path` is a list of attribute names that ends with the one to
+        evaluate. Attributes that took too long to evaluate several times
+        are skipped (see the `var_time_budget` setting).
+        """
+        obj = self._get_object_at_attr_path(name, attr_path[:-1])
+        return make_attr_entry(obj, attr_path[-1],
+                               budget=self._get_attr_budget())
+
+    @comm_handler
+    def get_value(self, name, encoded=False, buffered=False):
+        """
+        Get the value of a variable
+
+        If `encoded` is True, the value is pickled with cloudpickle. If
+        `buffered` is True too, it's encoded as a BufferedValue with
+        `encode_value` instead, which sends Numpy arrays without copying
+        them and dataframes in the Arrow format.
+        """
         ns = self.shell._get_current_namespace()
         value = ns[name]
 
-        if str(type(value)) in [
+        if not (encoded and buffered) and str(type(value)) in [
             "<class 'polars.dataframe.frame.DataFrame'>",
             "<class 'polars.series.series.Series'>"
         ]:
-            # Convert polars dataframes and series to pandas
+            # Convert polars dataframes and series to pandas. Buffered values
+            # send them in the Arrow format instead.
             value = value.to_pandas()
 
-        if encoded:
+        if encoded and buffered:
+            value = encode_value(value)
+        elif encoded:
             # Encode with cloudpickle
             value = cloudpickle.dumps(value)
         return value
 
+    @comm_handler
+    def get_value_window(self, name, rows=None, columns=None, sort_key=None,
+                         ascending=True, filter_expr=None):
+        """
+        Get a window of an array or dataframe variable
+
+        Only the [start, stop) ranges of `rows` and `columns` (all of them
+        if None) are sent, after filtering the rows with the boolean
+        expression `filter_expr` and sorting them by the `sort_key` column.
+        Row orders are cached until code is executed, so scrolling doesn't
+        compute them again.
+
+        The window is returned as a BufferedValue, to be decoded with
+        `decode_window`. Its value has the total shape, number of filtered
+        rows and column dtypes (see `get_window`).
+        """
+        ns = self.shell._get_current_namespace()
+        window, info = get_window(
+            ns[name], rows=rows, columns=columns, sort_key=sort_key,
+            ascending=ascending, filter_expr=filter_expr,
+            cache=self._row_orders, generation=array_stats.generation
+        )
+        return encode_window(window, info)
+
+    @comm_handler
+    def get_value_stats(self, name, column=None, bins=10, nan_policy='omit'):
+        """
+        Get summary statistics and a histogram of a variable
+
+        The variable must be an array or a Pandas or Polars series or
+        index of real numbers, or a dataframe with a `column` of them.
+        `nan_policy` can be 'omit', 'propagate' or 'raise' (see
+        `chunked_stats`). Results are cached until code is executed.
+
+        The returned dictionary has the count, mean, std, min, quartiles
+        and max of the values, the number of NaNs and infinities (which are
+        left out of them) under 'nans' and 'infs', whether the quartiles
+        are exact under 'exact', and the 'counts' and 'edges' of the
+        histogram under 'histogram'. Statistics that can't be computed (e.g.
+        if there are NaNs and `nan_policy` is 'propagate') are None.
+        """
+        ns = self.shell._get_current_namespace()
+        value = ns[name]
+        if column is not None:
+            value = value[column]
+        return array_stats.get_stats(value, bins=bins, nan_policy=nan_policy)
+
     @comm_handler
     def set_value(self, name, value, encoded=False):
-        """Set the value of a variable"""
-        if encoded:
+        """
+        Set the value of a variable
+
+        The value can be encoded with cloudpickle if `encoded` is True, or
+        be a BufferedValue encoded with `encode_value`.
+        """
+        if isinstance(value, BufferedValue):
+            value = decode_value(value)
+        elif encoded:
             # Decode_value
             value = cloudpickle.loads(value)
 
@@ -399,6 +666,36 @@ class SpyderKernel(IPythonKernel):
         ns[name] = value
         self.log.debug(ns)
 
+    @comm_handler
+    def set_value_slice(self, name, path, value, encoded=False,
+                        positional=False):
+        """
+        Set an element of a variable in place
+
+        `path` is a list of keys to reach the element, e.g. the keys of
+        nested dicts and lists, where the last one can be a [row, column]
+        pair of an array or dataframe (see `set_item_at_path`). Pandas
+        objects are indexed by label, or by position if `positional` is
+        True. The value is encoded as in `set_value`.
+
+        Unlike `set_value`, big containers are neither sent nor copied, and
+        other references and views of them see the change.
+        """
+        if isinstance(value, BufferedValue):
+            value = decode_value(value)
+        elif encoded:
+            value = cloudpickle.loads(value)
+
+        ns = self.shell._get_reference_namespace(name)
+        containers = set_item_at_path(
+            ns[name], path, value, positional=positional)
+
+        # Cached statistics, row orders and rows of the namespace view of
+        # the modified objects are no longer valid
+        array_stats.new_generation()
+        for container in containers:
+            self._display_cache.discard(container)
+
     @comm_handler
     def remove_value(self, name):
         """Remove a variable"""
@@ -655,6 +952,8 @@ class SpyderKernel(IPythonKernel):
             elif key == "namespace_view_settings":
                 self.namespace_view_settings = value
                 self.publish_state()
+            elif key == "state_diffs":
+                self._set_state_diffs(value)
             elif key == "pdb":
                 self.shell.set_pdb_configuration(value)
             elif key == "faulthandler":
@@ -872,88 +1171,136 @@ class SpyderKernel(IPythonKernel):
 
     # -- Private API ---------------------------------------------------
     # --- For the Variable Explorer
-    def _get_len(self, var):
-        """Return sequence length"""
-        try:
-            return get_size(var)
-        except:
-            return None
+    def _get_namespace_snapshot(self, frame=None, query=None):
+        """
+        Get the namespace view and the properties of its variables.
 
-    def _is_array(self, var):
-        """Return True if variable is a NumPy array"""
-        try:
-            import numpy
-            return isinstance(var, numpy.ndarray)
-        except:
-            return False
+        Both are computed from a single copy of the namespace and a single
+        pass over the variables that match `query`.
+        """
+        settings = self.namespace_view_settings
+        if not settings:
+            return None, None
 
-    def _is_image(self, var):
-        """Return True if variable is a PIL.Image image"""
-        try:
-            from PIL import Image
-            return isinstance(var, Image.Image)
-        except:
-            return False
+        ns = self.shell._get_current_namespace(frame=frame)
+        return make_remote_snapshot(
+            ns, settings, EXCLUDED_NAMES, cache=self._display_cache,
+            budget=self._get_view_budget(settings), query=query
+        )
 
-    def _is_data_frame(self, var):
-        """Return True if variable is a DataFrame"""
-        try:
-            from pandas import DataFrame
-            return isinstance(var, DataFrame)
-        except:
-            return False
+    def _get_view_budget(self, settings):
+        """Get the time budget of the namespace view."""
+        self._view_budget.set_limits(
+            settings.get('var_time_budget', VAR_TIME_BUDGET),
+            settings.get('view_time_budget', VIEW_TIME_BUDGET)
+        )
+        return self._view_budget
 
-    def _is_series(self, var):
-        """Return True if variable is a Series"""
-        try:
-            from pandas import Series
-            return isinstance(var, Series)
-        except:
-            return False
+    def _get_attr_budget(self):
+        """Get the time budget to evaluate object attributes."""
+        settings = self.namespace_view_settings
+        self._attr_budget.set_limits(
+            settings.get('var_time_budget', VAR_TIME_BUDGET),
+            settings.get('view_time_budget', VIEW_TIME_BUDGET)
+        )
+        return self._attr_budget
 
-    def _is_list(self, var):
-        """Return True if variable is a list or tuple."""
-        # The try/except is necessary to fix spyder-ide/spyder#19516.
-        try:
-            return isinstance(var, (tuple, list))
-        except Exception:
-            return False
+    def _get_object_at_attr_path(self, name, attr_path):
+        """Get the object at the end of an attribute path of a variable."""
+        obj = self.shell._get_current_namespace()[name]
+        for attr in attr_path:
+            obj = getattr(obj, attr)
+        return obj
 
-    def _is_dict(self, var):
-        """Return True if variable is a dictionary."""
-        # The try/except is necessary to fix spyder-ide/spyder#19516.
-        try:
-            return isinstance(var, dict)
-        except Exception:
-            return False
+    def _on_array_stats_update(self):
+        """
+        Publish the state when exact array statistics are ready.
 
-    def _is_set(self, var):
-        """Return True if variable is a set."""
-        # The try/except is necessary to fix spyder-ide/spyder#19516.
-        try:
-            return isinstance(var, set)
-        except Exception:
-            return False
+        This is called from a background thread.
+        """
+        if getattr(self, 'io_loop', None) is not None:
+            self.publish_state()
 
-    def _get_array_shape(self, var):
-        """Return array's shape"""
-        try:
-            if self._is_array(var):
-                return var.shape
-            else:
-                return None
-        except:
-            return None
+    def _complete_deferred_state(self):
+        """
+        Publish the state again, without deferring any variable, if some of
+        them were deferred in the last one.
+        """
+        if not self._view_budget.deferred or self._view_budget.complete:
+            return
 
-    def _get_array_ndim(self, var):
-        """Return array's ndim"""
-        try:
-            if self._is_array(var):
-                return var.ndim
+        io_loop = getattr(self, 'io_loop', None)
+        if io_loop is None:
+            self._publish_complete_state()
+        else:
+            io_loop.add_callback(self._publish_complete_state)
+
+    def _publish_complete_state(self):
+        """Publish the state without deferring any variable."""
+        if not self._view_budget.deferred:
+            # Already done
+            return
+
+        self._view_budget.deferred = False
+        with self._view_budget.complete_pass():
+            self._publish_state()
+
+    def _set_state_diffs(self, enable):
+        """Enable/Disable state diffs for the calling comm."""
+        comm_id = self.frontend_comm.calling_comm_id
+        if enable:
+            # The first state published to the comm will be a full one
+            self._published_states[comm_id] = None
+        else:
+            self._published_states.pop(comm_id, None)
+
+    def _get_comm_state(self, comm_id, state):
+        """
+        Get the state to publish to a comm.
+
+        If the comm receives state diffs, the `DIFF_STATE_KEYS` entries of
+        `state` are replaced by a `state_diff` dictionary with the following
+        structure
+
+        {
+            'seq': 12,
+            'base_seq': 11,
+            'namespace_view': {'changed': {'a': {...}}, 'removed': ['b']},
+            'var_properties': {'changed': {'a': {...}}, 'removed': ['b']}
+        }
+
+        where `seq` is the sequence number of this state and `base_seq` the
+        one of the state the diffs were computed against. Full states sent
+        to those comms include their sequence number as `state_seq`.
+        """
+        if comm_id not in self._published_states:
+            return state
+
+        previous = self._published_states[comm_id]
+        self._published_states[comm_id] = (self._state_seq, state)
+
+        if previous is None:
+            full_state = state.copy()
+            full_state["state_seq"] = self._state_seq
+            return full_state
+
+        base_seq, base_state = previous
+        comm_state = {
+            key: value for key, value in state.items()
+            if key not in DIFF_STATE_KEYS
+        }
+        state_diff = {"seq": self._state_seq, "base_seq": base_seq}
+        for key in DIFF_STATE_KEYS:
+            old_view = base_state.get(key)
+            new_view = state.get(key)
+            if isinstance(old_view, dict) and isinstance(new_view, dict):
+                state_diff[key] = get_remote_view_diff(old_view, new_view)
             else:
-                return None
-        except:
-            return None
+                # There's nothing to compute a diff against
+                comm_state[key] = new_view
+        comm_state["state_diff"] = state_diff
+
+        return comm_state
 
     # --- For the Help plugin
     def _eval(self, text):
@@ -31,6 +31,7 @@ from spyder_kernels.customize.spyderpdb import SpyderPdb
 from spyder_kernels.customize.code_runner import SpyderCodeRunner
 from spyder_kernels.comms.commbase import stacksummary_to_json
 from spyder_kernels.comms.decorators import comm_handler
+from spyder_kernels.utils.arraystats import array_stats
 from spyder_kernels.utils.mpl import automatic_backend
 
 
@@ -475,6 +476,9 @@ class SpyderShell(ZMQInteractiveShell):
         # Flush C standard streams.
         sys.__stderr__.flush()
         sys.__stdout__.flush()
+
+        # Arrays could have been modified
+        array_stats.new_generation()
         self.kernel.publish_state()
 
     def _do_input_cleanup(self, lines: List[str]):
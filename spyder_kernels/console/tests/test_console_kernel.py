@@ -15,6 +15,7 @@ import asyncio
 from collections import namedtuple
 from contextlib import contextmanager
 import inspect
+import json
 import os
 import os.path as osp
 import random
@@ -194,6 +195,40 @@ class Comm():
             return self._close_callback(msg)
 
 
+class FakeFrontendComm():
+    """Kernel side of a comm that records the messages sent through it."""
+
+    def __init__(self):
+        self.comm_id = uuid.uuid4().hex
+        self.sent = []
+
+    def send(self, msg_dict, buffers=None):
+        self.sent.append((msg_dict, buffers))
+
+    def close(self):
+        pass
+
+    def get_calls(self, call_name):
+        """Get the args of the remote calls to `call_name` sent so far."""
+        return [
+            msg_dict['content']['call_args']
+            for msg_dict, __ in self.sent
+            if msg_dict['spyder_msg_type'] == 'remote_call'
+            and msg_dict['content']['call_name'] == call_name
+        ]
+
+
+def open_fake_comm(kernel):
+    """Open a fake comm in the kernel and make it the calling one."""
+    comm = FakeFrontendComm()
+    kernel.frontend_comm._comms[comm.comm_id] = {
+        'comm': comm,
+        'status': 'ready',
+    }
+    kernel.frontend_comm.calling_comm_id = comm.comm_id
+    return comm
+
+
 # =============================================================================
 # Fixtures
 # =============================================================================
@@ -317,6 +352,45 @@ def test_get_namespace_view_filter_on(kernel, filter_on):
     settings['exclude_capitalized'] = False
 
 
+def test_get_namespace_view_page(kernel):
+    """
+    Test getting a sorted window of the namespace view.
+    """
+    asyncio.run(kernel.do_execute(
+        'page_c = [1, 2, 3]; page_a = "ab"; page_b = 1.5', True))
+
+    page = kernel.get_namespace_view_page(limit=2, name_filter='page_')
+    assert page['total'] == 3
+    assert page['offset'] == 0
+    assert list(page['view']) == ['page_a', 'page_b']
+    assert page['view']['page_a']['view'] == 'ab'
+
+    page = kernel.get_namespace_view_page(
+        offset=1, sort_key='size', reverse=True, name_filter='page_')
+    assert list(page['view']) == ['page_a', 'page_b']
+
+    page = kernel.get_namespace_view_page(
+        name_filter='page_', type_filter='list')
+    assert page['total'] == 1
+    assert list(page['view']) == ['page_c']
+
+
+def test_get_namespace_view_query(kernel):
+    """Test filtering the namespace view in the kernel."""
+    asyncio.run(kernel.do_execute(
+        'query_a = [1, 2, 3]; query_b = "ab"; other = [4]', True))
+
+    view = kernel.get_namespace_view(query={'name_glob': 'query_*'})
+    assert sorted(view) == ['query_a', 'query_b']
+
+    view = kernel.get_namespace_view(
+        query={'types': ['list'], 'min_size': 2})
+    assert list(view) == ['query_a']
+
+    page = kernel.get_namespace_view_page(query={'name_regex': 'b$'})
+    assert list(page['view']) == ['query_b']
+
+
 def test_get_var_properties(kernel):
     """
     Test the properties fo the variables in the namespace.
@@ -336,6 +410,264 @@ def test_get_var_properties(kernel):
     assert "'array_ndim': None" in var_properties
 
 
+def test_get_state_single_pass(kernel, monkeypatch):
+    """
+    Test that the namespace is copied and displayed once to get the state.
+    """
+    calls = []
+    get_current_namespace = kernel.shell._get_current_namespace
+
+    def _get_current_namespace(*args, **kwargs):
+        calls.append(args)
+        return get_current_namespace(*args, **kwargs)
+
+    monkeypatch.setattr(
+        kernel.shell, '_get_current_namespace', _get_current_namespace)
+
+    class Displayed:
+        lens = 0
+
+        def __len__(self):
+            self.lens += 1
+            return 2
+
+    ns = kernel.shell.user_ns
+    ns['displayed'] = displayed = Displayed()
+    try:
+        state = kernel.get_state()
+    finally:
+        ns.pop('displayed')
+
+    assert len(calls) == 1
+    assert displayed.lens == 1
+    assert state['namespace_view']['displayed']['size'] == 2
+    assert state['var_properties']['displayed']['len'] == 2
+
+
+def test_publish_state_diffs(kernel):
+    """Test that comms can receive namespace state diffs."""
+    full_comm = open_fake_comm(kernel)
+    diff_comm = open_fake_comm(kernel)
+    kernel.set_configuration({'state_diffs': True})
+
+    # Change the namespace directly so only our calls publish the state
+    ns = kernel.shell.user_ns
+    ns.update(a=1, b=2)
+    kernel.publish_state()
+    ns.update(a=3, c=4)
+    del ns['b']
+    kernel.publish_state()
+
+    # Comms that don't enable diffs always get the full state
+    states = [args[0] for args in full_comm.get_calls('update_state')]
+    assert len(states) == 2
+    assert set(states[-1]['namespace_view']) == {'a', 'c'}
+    assert 'state_diff' not in states[-1]
+
+    # The first state is a full one and the next ones are diffs against it
+    first, second = [args[0] for args in diff_comm.get_calls('update_state')]
+    assert set(first['namespace_view']) == {'a', 'b'}
+
+    assert 'namespace_view' not in second
+    state_diff = second['state_diff']
+    assert state_diff['base_seq'] == first['state_seq']
+    assert state_diff['seq'] == first['state_seq'] + 1
+    view_diff = state_diff['namespace_view']
+    assert set(view_diff['changed']) == {'a', 'c'}
+    assert view_diff['changed']['a']['view'] == '3'
+    assert view_diff['removed'] == ['b']
+    assert state_diff['var_properties']['removed'] == ['b']
+
+    # Nothing is sent for variables that didn't change
+    ns['d'] = 5
+    kernel.publish_state()
+    state = diff_comm.get_calls('update_state')[-1][0]
+    view_diff = state['state_diff']['namespace_view']
+    assert set(view_diff['changed']) == {'d'}
+    assert view_diff['removed'] == []
+
+    # A resync returns the full state and diffs continue from it
+    resync = kernel.resync_state()
+    assert set(resync['namespace_view']) == {'a', 'c', 'd'}
+    ns['e'] = 6
+    kernel.publish_state()
+    state = diff_comm.get_calls('update_state')[-1][0]
+    assert state['state_diff']['base_seq'] == resync['state_seq']
+    assert set(state['state_diff']['namespace_view']['changed']) == {'e'}
+
+
+def test_publish_state_deferred(kernel):
+    """Test that slow variables are sent in a follow-up state update."""
+    comm = open_fake_comm(kernel)
+    settings = kernel.namespace_view_settings
+    settings['var_time_budget'] = 0.01
+
+    class Slow:
+        def __len__(self):
+            time.sleep(0.02)
+            return 1
+
+    ns = kernel.shell.user_ns
+    ns['slow'] = Slow()
+    ns['fast'] = 1
+    try:
+        # The first time the variable is displayed as usual
+        kernel.publish_state()
+        state = comm.get_calls('update_state')[-1][0]
+        assert 'deferred' not in state['namespace_view']['slow']
+
+        # Then it's deferred and sent in a follow-up update
+        kernel.publish_state()
+        deferred, complete = [
+            args[0] for args in comm.get_calls('update_state')[-2:]
+        ]
+        assert deferred['namespace_view']['slow']['deferred']
+        assert deferred['var_properties']['slow']['deferred']
+        assert deferred['namespace_view']['fast']['view'] == '1'
+        assert 'deferred' not in complete['namespace_view']['slow']
+        assert complete['var_properties']['slow']['len'] == 1
+
+        # It's skipped after exceeding its budget too many times
+        kernel.publish_state()
+        kernel.publish_state()
+        state = comm.get_calls('update_state')[-1][0]
+        assert state['namespace_view']['slow']['skipped']
+        assert state['var_properties']['slow']['skipped']
+    finally:
+        settings.pop('var_time_budget')
+        ns.pop('slow')
+        ns.pop('fast')
+
+
+def test_get_namespace_view_deferred(kernel):
+    """Test that slow variables deferred in requested views are sent."""
+    comm = open_fake_comm(kernel)
+    settings = kernel.namespace_view_settings
+    settings['var_time_budget'] = 0.01
+
+    class Slow:
+        def __len__(self):
+            time.sleep(0.02)
+            return 1
+
+    ns = kernel.shell.user_ns
+    ns['slow'] = Slow()
+    try:
+        assert 'deferred' not in kernel.get_namespace_view()['slow']
+        assert kernel.get_namespace_view()['slow']['deferred']
+        state = comm.get_calls('update_state')[-1][0]
+        assert 'deferred' not in state['namespace_view']['slow']
+    finally:
+        settings.pop('var_time_budget')
+        ns.pop('slow')
+
+
+def test_pdb_state_deferred(kernel, monkeypatch):
+    """Test that slow variables deferred in the debugger state are sent."""
+    comm = open_fake_comm(kernel)
+    settings = kernel.namespace_view_settings
+    settings['var_time_budget'] = 0.01
+
+    class Slow:
+        def __len__(self):
+            time.sleep(0.02)
+            return 1
+
+    ns = kernel.shell.user_ns
+    ns['slow'] = Slow()
+    pdb_obj = SpyderPdb()
+    pdb_obj.shell = kernel.shell
+
+    def wait_until(condition):
+        pdb_obj._cmd_input_line = 'c'
+
+    # The shell is shared by the kernels of all tests
+    monkeypatch.setattr(kernel.shell, 'kernel', kernel)
+    monkeypatch.setattr(kernel.frontend_comm, 'wait_until', wait_until)
+    try:
+        for __ in range(3):
+            assert pdb_obj.cmd_input() == 'c'
+            # The debugger state defers it after the first prompt, and
+            # it's sent in a state update before getting input
+            state = [
+                msg_dict['content']['call_kwargs']['state']
+                for msg_dict, __ in comm.sent
+                if msg_dict['content']['call_name'] == 'pdb_input'
+            ][-1]
+            updates = comm.get_calls('update_state')
+            if updates:
+                assert state['namespace_view']['slow']['deferred']
+                view = updates[-1][0]['namespace_view']
+                assert 'deferred' not in view['slow']
+                assert view['slow']['size'] == 1
+            else:
+                assert 'deferred' not in state['namespace_view']['slow']
+        assert len(comm.get_calls('update_state')) == 2
+    finally:
+        settings.pop('var_time_budget')
+        ns.pop('slow')
+
+
+def test_publish_state_debounced(kernel, monkeypatch):
+    """Test that requests to publish the state are merged."""
+    class FakeLoop:
+        def __init__(self):
+            self.callbacks = []
+
+        def add_callback(self, callback, *args):
+            self.callbacks.append((callback, args))
+
+        def call_later(self, delay, callback):
+            self.callbacks.append((callback, ()))
+
+        def run(self):
+            while self.callbacks:
+                callback, args = self.callbacks.pop(0)
+                callback(*args)
+
+    loop = FakeLoop()
+    monkeypatch.setattr(kernel, 'io_loop', loop, raising=False)
+    comm = open_fake_comm(kernel)
+    merged = kernel.merged_state_publishes
+
+    kernel.set_configuration({'cwd': os.getcwd(),
+                              'namespace_view_settings':
+                                  kernel.namespace_view_settings})
+    kernel.publish_state()
+    assert comm.get_calls('update_state') == []
+    assert kernel.merged_state_publishes == merged + 2
+    loop.run()
+    assert len(comm.get_calls('update_state')) == 1
+
+    # Pending states can be published right away
+    kernel.publish_state()
+    assert kernel.flush_state()
+    assert len(comm.get_calls('update_state')) == 2
+    loop.run()
+    assert not kernel.flush_state()
+    assert len(comm.get_calls('update_state')) == 2
+
+    # The debugger publishes pending states while waiting for input
+    pdb_obj = SpyderPdb()
+    pdb_obj.shell = kernel.shell
+
+    def wait_until(condition):
+        pdb_obj._cmd_input_line = 'c'
+
+    monkeypatch.setattr(kernel.shell, 'kernel', kernel)
+    monkeypatch.setattr(kernel.frontend_comm, 'wait_until', wait_until)
+    kernel.publish_state()
+    assert pdb_obj.cmd_input() == 'c'
+    assert len(comm.get_calls('update_state')) == 3
+
+    # Other threads can't wait for the IO loop while debugging
+    monkeypatch.setattr(kernel.shell, 'is_debugging', lambda: True)
+    kernel.publish_state()
+    assert len(comm.get_calls('update_state')) == 4
+    loop.run()
+    assert len(comm.get_calls('update_state')) == 4
+
+
 def test_get_value(kernel):
     """Test getting the value of a variable."""
     name = 'a'
@@ -360,6 +692,62 @@ def test_get_value_with_polars(kernel):
     pandas_s = pandas.Series([1, 2, 3], name="a")
     assert_series_equal(kernel.get_value('polars_s'), pandas_s)
 
+    # Buffered values are sent without converting them to pandas
+    value = kernel.get_value('polars_s', encoded=True, buffered=True)
+    assert value.value == {'format': 'arrow', 'kind': 'polars.Series'}
+
+
+def test_get_set_value_buffered(kernel):
+    """Test getting and setting arrays without pickling them."""
+    import numpy as np
+
+    asyncio.run(kernel.do_execute("import numpy as np", True))
+    asyncio.run(kernel.do_execute("a = np.arange(12.).reshape(3, 4)", True))
+    value = kernel.get_value('a', encoded=True, buffered=True)
+    assert value.value['format'] == 'ndarray'
+    assert np.shares_memory(
+        np.frombuffer(value.buffers[0], dtype=np.uint8),
+        kernel.shell.user_ns['a']
+    )
+
+    kernel.set_value('b', value)
+    np.testing.assert_array_equal(
+        kernel.shell.user_ns['b'], kernel.shell.user_ns['a'])
+
+
+def test_get_value_window(kernel):
+    """Test getting a sorted window of a dataframe."""
+    from spyder_kernels.utils.datawindow import decode_window
+
+    asyncio.run(kernel.do_execute(
+        "import pandas as pd; df = pd.DataFrame({'a': range(100)})", True))
+    value = kernel.get_value_window(
+        'df', rows=[10, 15], sort_key='a', ascending=False,
+        filter_expr='a % 2 == 0')
+    window, info = decode_window(value)
+    assert list(window['a']) == [78, 76, 74, 72, 70]
+    assert info['shape'] == [100, 1]
+    assert info['rows'] == 50
+
+
+def test_get_value_stats(kernel):
+    """Test getting the statistics of a dataframe column."""
+    asyncio.run(kernel.do_execute(
+        "import pandas as pd; df = pd.DataFrame({'a': range(101)})", True))
+    stats = kernel.get_value_stats('df', column='a', bins=4)
+    assert stats['count'] == 101
+    assert stats['50%'] == 50
+    assert stats['histogram']['counts'] == [25, 25, 25, 26]
+    assert kernel.get_value_stats('df', column='a', bins=4) is stats
+
+    # Missing statistics are None, so they can be sent as JSON
+    asyncio.run(kernel.do_execute("df.loc[0, 'a'] = None", True))
+    stats = kernel.get_value_stats('df', column='a', nan_policy='propagate')
+    assert stats['nans'] == 1
+    assert stats['mean'] is None
+    assert stats['histogram'] is None
+    assert json.loads(json.dumps(stats, allow_nan=False)) == stats
+
 
 def test_set_value(kernel):
     """Test setting the value of a variable."""
@@ -375,6 +763,66 @@ def test_set_value(kernel):
     assert "'a': 10" in log_text
 
 
+def test_set_value_slice(kernel):
+    """Test setting elements of variables in place."""
+    from spyder_kernels.utils.arraystats import array_stats
+    from spyder_kernels.utils.transfer import encode_value
+
+    asyncio.run(kernel.do_execute(
+        "import numpy as np; import pandas as pd\n"
+        "arr = np.zeros((3, 4)); view = arr[1:]; arr_id = id(arr)\n"
+        "d = {'a': [1, {'b': 2}]}\n"
+        "df = pd.DataFrame({'x': [1., 2.]}, index=['r', 's'])",
+        True
+    ))
+    ns = kernel.shell.user_ns
+    generation = array_stats.generation
+
+    kernel.set_value_slice('arr', [[1, 2]], 5)
+    assert id(ns['arr']) == ns['arr_id']
+    assert ns['view'][0, 2] == 5
+    assert array_stats.generation > generation
+
+    kernel.set_value_slice('d', ['a', 1, 'b'], 3)
+    assert ns['d'] == {'a': [1, {'b': 3}]}
+
+    kernel.set_value_slice('df', [['s', 'x']], 7.)
+    kernel.set_value_slice('df', [[0, 0]], 6., positional=True)
+    assert ns['df']['x'].tolist() == [6., 7.]
+
+    kernel.set_value_slice('arr', [0], encode_value(np.ones(4)))
+    assert ns['arr'][0].tolist() == [1.] * 4
+
+
+def test_get_object_attrs(kernel):
+    """Test listing the attributes of a variable in pages."""
+    asyncio.run(kernel.do_execute(dedent("""
+        class A:
+            def __init__(self):
+                self.x = 1
+                self.evaluated = False
+
+            @property
+            def slow(self):
+                self.evaluated = True
+                return self
+
+        a = A()
+        """), True))
+    page = kernel.get_object_attrs_page('a', limit=2)
+    assert page['total'] == 3
+    assert list(page['attrs']) == ['evaluated', 'slow']
+    assert page['attrs']['slow'] == {'kind': 'property'}
+    assert not kernel.shell.user_ns['a'].evaluated
+
+    row = kernel.get_object_attr('a', ['slow', 'x'])
+    assert row['view'] == '1'
+    assert kernel.shell.user_ns['a'].evaluated
+
+    page = kernel.get_object_attrs_page('a', attr_path=['slow'], offset=2)
+    assert page['attrs']['x']['kind'] == 'attribute'
+
+
 def test_remove_value(kernel):
     """Test the removal of a variable."""
     name = 'a'
@@ -34,6 +34,7 @@ from spyder_kernels.customize.utils import (
     capture_last_Expr,
     exec_encapsulate_locals,
 )
+from spyder_kernels.utils.arraystats import array_stats
 
 
 if typing.TYPE_CHECKING:
@@ -742,6 +743,12 @@ class SpyderPdb(ipyPdb):
         kernel.frontend_call(display_error=True).pdb_input(
             prompt, state=self.get_pdb_state())
 
+        # The IO loop doesn't run while debugging, so pending states and
+        # variables that were deferred in them are sent now, while waiting
+        # for input.
+        kernel.flush_state()
+        kernel._publish_complete_state()
+
         # Allow GUI event loop to update
         is_main_thread = (
             threading.current_thread() is threading.main_thread())
@@ -822,6 +829,8 @@ class SpyderPdb(ipyPdb):
 
         The state is only sent if it has changed since the last update.
         """
+        # Arrays could have been modified since the last prompt
+        array_stats.new_generation()
         state = self.shell.kernel.get_state()
 
         frame = self.curframe
@@ -0,0 +1,391 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright (c) 2009- Spyder Kernels Contributors
+#
+# Licensed under the terms of the MIT License
+# (see spyder_kernels/__init__.py for details)
+# -----------------------------------------------------------------------------
+
+"""
+Statistics of Numpy arrays shown in the namespace view.
+"""
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+import threading
+
+from spyder_kernels.utils.lazymodules import numpy as np, pandas as pd
+
+
+# Number of array elements that are reduced at once
+CHUNK_SIZE = 2 ** 18
+
+# Arrays with more elements get a sampled estimate of their min and max
+# first, and their exact values are computed in the background.
+EXACT_MINMAX_THRESHOLD = 10_000_000
+
+# Number of elements of sampled estimates
+SAMPLE_SIZE = 100_000
+
+# Kinds of dtypes (bool, int, uint, float and complex) that are supported
+NUMERIC_KINDS = 'biufc'
+
+# Kinds of dtypes that statistics can be computed for
+REAL_KINDS = 'biuf'
+
+# Max number of histogram bins
+MAX_BINS = 1000
+
+# Policies to handle NaNs in statistics
+NAN_POLICIES = ('omit', 'propagate', 'raise')
+
+
+def iter_chunks(value, chunk_size=CHUNK_SIZE):
+    """
+    Iterate over chunks of at most *chunk_size* elements of an array without
+    copying it.
+    """
+    if value.ndim == 0:
+        yield value.reshape(1)
+    elif value.flags.c_contiguous or value.flags.f_contiguous:
+        # Raveling in memory order returns a view
+        flat = value.ravel(order='K')
+        for start in range(0, flat.size, chunk_size):
+            yield flat[start:start + chunk_size]
+    else:
+        row_size = value.size // value.shape[0] if value.shape[0] else 0
+        if value.ndim == 1 or row_size <= chunk_size:
+            rows = max(1, chunk_size // max(row_size, 1))
+            for start in range(0, value.shape[0], rows):
+                yield value[start:start + rows]
+        else:
+            for row in value:
+                yield from iter_chunks(row, chunk_size)
+
+
+def reduce_minmax(value):
+    """Return the min and max of an array, ignoring NaNs."""
+    if value.dtype.kind in 'fc':
+        return (np.fmin.reduce(value, axis=None),
+                np.fmax.reduce(value, axis=None))
+    return value.min(), value.max()
+
+
+def chunked_minmax(value, chunk_size=CHUNK_SIZE):
+    """
+    Return the min and max of a numeric array in a single chunked pass.
+
+    NaNs are ignored, unless all elements are NaN.
+    """
+    if value.size == 0:
+        raise ValueError("Zero-size array has no min or max")
+
+    minimums = []
+    maximums = []
+    for chunk in iter_chunks(value, chunk_size):
+        chunk_min, chunk_max = reduce_minmax(chunk)
+        minimums.append(chunk_min)
+        maximums.append(chunk_max)
+    return (reduce_minmax(np.array(minimums))[0],
+            reduce_minmax(np.array(maximums))[1])
+
+
+def sampled_minmax(value, sample_size=None):
+    """
+    Estimate the min and max of a numeric array from a random sample of
+    *sample_size* elements (`SAMPLE_SIZE` by default).
+
+    The sample is always the same for arrays of the same shape, so the
+    estimate doesn't change while the array doesn't.
+    """
+    if sample_size is None:
+        sample_size = SAMPLE_SIZE
+    if value.size <= sample_size:
+        return chunked_minmax(value)
+
+    rng = np.random.default_rng(0)
+    indexes = rng.integers(0, value.size, sample_size)
+    sample = value[np.unravel_index(indexes, value.shape)]
+    return reduce_minmax(sample)
+
+
+def as_real_array(value):
+    """
+    Return the values of an array, a Pandas series or index or a Polars
+    series as a Numpy array of real numbers, without copying them if
+    possible. Missing values are converted to NaNs.
+    """
+    if isinstance(value, (pd.Series, pd.Index)):
+        if value.dtype.kind not in REAL_KINDS:
+            pass
+        elif isinstance(value.dtype, np.dtype):
+            value = value.to_numpy()
+        else:
+            # Nullable dtypes
+            value = value.to_numpy(dtype=float, na_value=np.nan)
+    elif not isinstance(value, np.ndarray):
+        value = np.asarray(value.to_numpy())
+
+    if value.dtype.kind not in REAL_KINDS:
+        raise TypeError(
+            "Statistics can't be computed for {}".format(value.dtype))
+    return value
+
+
+def combine_moments(a, b):
+    """
+    Combine the (count, mean, sum of squared deviations) of two groups of
+    values.
+    """
+    count_a, mean_a, m2_a = a
+    count_b, mean_b, m2_b = b
+    count = count_a + count_b
+    if count == 0:
+        return a
+    delta = mean_b - mean_a
+    mean = mean_a + delta * count_b / count
+    m2 = m2_a + m2_b + delta ** 2 * count_a * count_b / count
+    return count, mean, m2
+
+
+def chunked_stats(value, bins=10, nan_policy='omit', chunk_size=CHUNK_SIZE):
+    """
+    Compute describe-like statistics and a histogram of *bins* bins of a
+    real array, in two chunked passes.
+
+    *nan_policy* is 'omit' to ignore NaNs, 'propagate' to give no
+    statistics (and no histogram) if there are NaNs, or 'raise' to raise a
+    ValueError. Infinities are always left out and counted on their own.
+    Quantiles are estimated from a sample for arrays with more than
+    `EXACT_MINMAX_THRESHOLD` elements.
+
+    Statistics that can't be computed (e.g. the std of a single value) are
+    None, because NaN is not valid JSON.
+    """
+    if nan_policy not in NAN_POLICIES:
+        raise ValueError("Unknown NaN policy: {}".format(nan_policy))
+    bins = min(max(int(bins), 1), MAX_BINS)
+
+    nans = infs = 0
+    moments = (0, 0., 0.)
+    minimums = []
+    maximums = []
+    for chunk in iter_chunks(value, chunk_size):
+        chunk = chunk.astype(float, copy=False).ravel()
+        if value.dtype.kind == 'f':
+            isfinite = np.isfinite(chunk)
+            if not isfinite.all():
+                chunk_nans = int(np.isnan(chunk).sum())
+                nans += chunk_nans
+                infs += chunk.size - int(isfinite.sum()) - chunk_nans
+                chunk = chunk[isfinite]
+        if chunk.size == 0:
+            continue
+        chunk_mean = chunk.mean()
+        moments = combine_moments(
+            moments,
+            (chunk.size, chunk_mean, ((chunk - chunk_mean) ** 2).sum())
+        )
+        minimums.append(chunk.min())
+        maximums.append(chunk.max())
+
+    if nans and nan_policy == 'raise':
+        raise ValueError("The array contains NaNs")
+
+    count, mean, m2 = moments
+    stats = {
+        'count': count,
+        'nans': nans,
+        'infs': infs,
+        'mean': float(mean) if count else None,
+        'std': float(np.sqrt(m2 / (count - 1))) if count > 1 else None,
+        'min': float(min(minimums)) if count else None,
+        '25%': None,
+        '50%': None,
+        '75%': None,
+        'max': float(max(maximums)) if count else None,
+        'exact': True,
+        'histogram': None,
+    }
+    if nans and nan_policy == 'propagate':
+        for key in ['mean', 'std', 'min', 'max']:
+            stats[key] = None
+        return stats
+    if count == 0:
+        return stats
+
+    # Quantiles
+    if value.size <= EXACT_MINMAX_THRESHOLD:
+        sample = value
+    else:
+        rng = np.random.default_rng(0)
+        indexes = rng.integers(0, value.size, SAMPLE_SIZE)
+        sample = value[np.unravel_index(indexes, value.shape)]
+        stats['exact'] = False
+    if sample.dtype.kind == 'b':
+        sample = sample.view(np.uint8)
+    elif sample.dtype.kind == 'f':
+        sample = sample[np.isfinite(sample)]
+    if sample.size:
+        quantiles = np.quantile(sample, [0.25, 0.5, 0.75])
+        for key, quantile in zip(['25%', '50%', '75%'], quantiles):
+            stats[key] = float(quantile)
+
+    # Histogram
+    value_range = (stats['min'], stats['max'])
+    if not np.isfinite(value_range).all():
+        return stats
+    counts = np.zeros(bins, dtype=np.int64)
+    edges = np.histogram_bin_edges([], bins=bins, range=value_range)
+    for chunk in iter_chunks(value, chunk_size):
+        if chunk.dtype.kind == 'b':
+            chunk = chunk.view(np.uint8)
+        counts += np.histogram(chunk, bins=edges)[0]
+    stats['histogram'] = {
+        'counts': counts.tolist(),
+        'edges': edges.tolist(),
+    }
+    return stats
+
+
+class ArrayStats:
+    """
+    Statistics of arrays that are cached until code is executed.
+
+    Numpy doesn't keep track of writes to arrays, so results are kept for a
+    generation, which must be increased with `new_generation` whenever the
+    arrays could have been modified (e.g. after executing code).
+
+    The exact results of big arrays are computed in a background thread, and
+    `on_update` is called when they are ready.
+    """
+
+    def __init__(self, maxsize=100):
+        self.maxsize = maxsize
+        self.generation = 0
+
+        # Function called (from a background thread) when exact results that
+        # were previously estimated are ready.
+        self.on_update = None
+
+        self._lock = threading.Lock()
+        self._results = OrderedDict()
+        self._pending = {}
+        self._executor = None
+
+    def new_generation(self):
+        """Discard all results, because arrays could have changed."""
+        with self._lock:
+            self.generation += 1
+            self._results.clear()
+
+    def get_minmax(self, value):
+        """
+        Return the min and max of an array, ignoring NaNs, and whether they
+        are exact or estimated from a sample.
+        """
+        if value.dtype.kind not in NUMERIC_KINDS:
+            return value.min(), value.max(), True
+
+        key = self._key(value)
+        with self._lock:
+            generation = self.generation
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+                return result
+
+        if value.size <= EXACT_MINMAX_THRESHOLD:
+            result = chunked_minmax(value) + (True,)
+            self._store(key, generation, result)
+        else:
+            # The estimate is stored first so it doesn't replace the exact
+            # result if that's ready too soon.
+            result = sampled_minmax(value) + (False,)
+            self._store(key, generation, result)
+            self._compute_later(key, value, generation)
+
+        return result
+
+    def get_stats(self, value, bins=10, nan_policy='omit'):
+        """
+        Return the statistics and histogram of an array or a Pandas or
+        Polars series or index, computed with `chunked_stats` on its values
+        (see `as_real_array`).
+
+        They are cached by the memory of the values rather than the object,
+        so that different views of the same data reuse them. Values that
+        had to be copied (e.g. those of nullable series) are not cached,
+        because the memory of the copy can be reused by another one.
+        """
+        array = as_real_array(value)
+        if array is not value and array.base is None:
+            return chunked_stats(array, bins=bins, nan_policy=nan_policy)
+
+        key = ('stats', bins, nan_policy) + self._key(array)[1:]
+        with self._lock:
+            generation = self.generation
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+                return result
+
+        result = chunked_stats(array, bins=bins, nan_policy=nan_policy)
+        self._store(key, generation, result)
+        return result
+
+    def wait(self, timeout=None):
+        """Wait until all results computed in the background are ready."""
+        with self._lock:
+            futures = list(self._pending.values())
+        wait(futures, timeout=timeout)
+
+    def _key(self, value):
+        """Key of the results of an array."""
+        return (
+            id(value),
+            value.__array_interface__['data'][0],
+            value.shape,
+            value.strides,
+            value.dtype.str
+        )
+
+    def _store(self, key, generation, result):
+        """Store a result if it's still valid. Return True if it was."""
+        with self._lock:
+            if generation != self.generation:
+                return False
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+        return True
+
+    def _compute_later(self, key, value, generation):
+        """Compute the exact min and max of an array in the background."""
+        with self._lock:
+            if (key, generation) in self._pending:
+                return
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix='SpyderArrayStats')
+            self._pending[(key, generation)] = self._executor.submit(
+                self._compute_exact, key, value, generation)
+
+    def _compute_exact(self, key, value, generation):
+        """Compute the exact min and max of an array."""
+        try:
+            result = chunked_minmax(value) + (True,)
+            stored = self._store(key, generation, result)
+        except Exception:
+            stored = False
+        finally:
+            with self._lock:
+                self._pending.pop((key, generation), None)
+
+        if stored and self.on_update is not None:
+            self.on_update()
+
+
+# Statistics shown in the namespace view
+array_stats = ArrayStats()
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright (c) 2009- Spyder Kernels Contributors
+#
+# Licensed under the terms of the MIT License
+# (see spyder_kernels/__init__.py for details)
+# -----------------------------------------------------------------------------
+
+"""
+Windows of the data of arrays and dataframes.
+
+They are used to show big objects in editors by only sending the rows and
+columns that are visible, optionally sorted and filtered in the kernel.
+"""
+
+from collections import OrderedDict
+from functools import partial
+import sys
+import weakref
+
+from spyder_kernels.comms.commbase import BufferedValue
+from spyder_kernels.utils.lazymodules import numpy as np, pandas as pd
+from spyder_kernels.utils.transfer import decode_value, encode_value
+
+
+def get_polars():
+    """Return the Polars module if it was imported, or None."""
+    return sys.modules.get('polars')
+
+
+def is_pandas_frame(value):
+    """Return True if *value* is a Pandas dataframe."""
+    return isinstance(value, pd.DataFrame)
+
+
+def is_polars_frame(value):
+    """Return True if *value* is a Polars dataframe."""
+    polars = get_polars()
+    return polars is not None and isinstance(value, polars.DataFrame)
+
+
+def is_windowable(value):
+    """Return True if windows of *value* can be taken."""
+    polars = get_polars()
+    return (
+        isinstance(value, (np.ndarray, pd.DataFrame, pd.Series, pd.Index))
+        and getattr(value, 'ndim', 1) > 0
+        or polars is not None
+        and isinstance(value, (polars.DataFrame, polars.Series))
+    )
+
+
+def get_num_rows(value):
+    """Return the number of rows of *value*."""
+    if isinstance(value, np.ndarray):
+        return value.shape[0]
+    return len(value)
+
+
+def get_filter_mask(value, filter_expr):
+    """
+    Evaluate a boolean filter expression on the rows of *value*.
+
+    The columns of dataframes can be used by name in the expression. For
+    other objects, the expression can use `x` for the object and `np` for
+    Numpy.
+    """
+    if is_pandas_frame(value):
+        mask = value.eval(filter_expr)
+    elif is_polars_frame(value):
+        polars = get_polars()
+        mask = value.select(polars.sql_expr(filter_expr)).to_series()
+        mask = mask.fill_null(False)
+    else:
+        mask = eval(filter_expr, {'np': np}, {'x': value})
+
+    mask = np.asarray(mask)
+    if mask.dtype != bool or mask.shape != (get_num_rows(value),):
+        raise ValueError(
+            "The filter expression must give a boolean value per row")
+    return mask
+
+
+def get_sort_column(value, sort_key):
+    """
+    Return the column of *value* to sort its rows by *sort_key*.
+
+    That is a column label for dataframes, a column index for arrays with
+    two or more dimensions and 0 for one-dimensional objects.
+    """
+    if is_pandas_frame(value) or is_polars_frame(value):
+        return value[sort_key]
+    if isinstance(value, np.ndarray) and value.ndim > 1:
+        return value[:, int(sort_key)]
+    return value
+
+
+def take_rows(value, positions):
+    """Return the rows of *value* at *positions*."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.iloc[positions]
+    return value[positions]
+
+
+def argsort(column, ascending=True):
+    """
+    Return the positions that sort a column, keeping the order of equal
+    values and putting missing ones last.
+    """
+    polars = get_polars()
+    if polars is not None and isinstance(column, polars.Series):
+        return column.arg_sort(
+            descending=not ascending, nulls_last=True).to_numpy()
+
+    if isinstance(column, np.ndarray):
+        column = pd.Series(column)
+    elif isinstance(column, pd.Index):
+        column = column.to_series()
+    column = column.reset_index(drop=True)
+    return column.sort_values(
+        ascending=ascending, kind='stable', na_position='last'
+    ).index.to_numpy()
+
+
+def get_row_order(value, sort_key=None, ascending=True, filter_expr=None):
+    """
+    Return the positions of the rows of *value* that pass *filter_expr*,
+    sorted by *sort_key*, or None if all rows are shown in their order.
+    """
+    positions = None
+    if filter_expr:
+        positions = np.flatnonzero(get_filter_mask(value, filter_expr))
+    if sort_key is not None:
+        column = get_sort_column(value, sort_key)
+        if positions is not None:
+            column = take_rows(column, positions)
+        order = argsort(column, ascending=ascending)
+        positions = order if positions is None else positions[order]
+    return positions
+
+
+def clip_range(index_range, length):
+    """Clip a [start, stop) range, or all if it's None, to a length."""
+    if index_range is None:
+        return 0, length
+    start, stop = index_range
+    start = min(max(start, 0), length)
+    return start, min(max(stop, start), length)
+
+
+def get_dtypes(value):
+    """Return the dtypes of the columns of *value* as strings."""
+    if is_pandas_frame(value) or is_polars_frame(value):
+        return [str(dtype) for dtype in value.dtypes]
+    return [str(value.dtype)]
+
+
+class RowOrderCache:
+    """
+    Least recently used cache of the row orders of objects shown in windows
+    (see `get_row_order`).
+
+    This allows to scroll through sorted or filtered objects without
+    computing their order again. Orders are reused while their object is
+    alive and in the same *generation*, which must change whenever objects
+    could have been modified (e.g. `ArrayStats.generation`).
+    """
+
+    def __init__(self, maxsize=8):
+        self.maxsize = maxsize
+        self._orders = OrderedDict()
+
+    def __len__(self):
+        return len(self._orders)
+
+    def get_order(self, value, sort_key=None, ascending=True,
+                  filter_expr=None, generation=None):
+        """Get the row order of *value*, computing it only if necessary."""
+        if sort_key is None and not filter_expr:
+            return None
+
+        key = (id(value), sort_key, ascending, filter_expr)
+        cached = self._orders.get(key)
+        if (
+            cached is not None
+            and cached[0]() is value
+            and cached[1] == generation
+        ):
+            self._orders.move_to_end(key)
+            return cached[2]
+
+        order = get_row_order(value, sort_key=sort_key, ascending=ascending,
+                              filter_expr=filter_expr)
+        try:
+            ref = weakref.ref(value, partial(self._remove, key))
+        except TypeError:
+            return order
+
+        self._orders[key] = (ref, generation, order)
+        self._orders.move_to_end(key)
+        while len(self._orders) > self.maxsize:
+            self._orders.popitem(last=False)
+        return order
+
+    def _remove(self, key, ref):
+        """Remove the order of an object that was garbage collected."""
+        cached = self._orders.get(key)
+        if cached is not None and cached[0] is ref:
+            del self._orders[key]
+
+
+def get_window(value, rows=None, columns=None, sort_key=None,
+               ascending=True, filter_expr=None, cache=None,
+               generation=None):
+    """
+    Get a window of an array, Pandas dataframe, series or index, or Polars
+    dataframe or series.
+
+    The window has the [start, stop) ranges of *rows* and *columns* (all of
+    them if None), after filtering its rows with *filter_expr* (see
+    `get_filter_mask`) and sorting them by *sort_key* (see
+    `get_sort_column`). If *cache* is a RowOrderCache, the order of the
+    rows is taken from it for *generation*.
+
+    Return the window and a dictionary with the shape of *value* under
+    `shape`, the number of rows that passed the filter under `rows`, the
+    ranges of the window under `row_range` and `column_range`, and the
+    dtypes of its columns under `dtypes`.
+    """
+    if not is_windowable(value):
+        raise TypeError(
+            "Can't get a window of {}".format(type(value).__name__))
+
+    if cache is None:
+        order = get_row_order(value, sort_key=sort_key, ascending=ascending,
+                              filter_expr=filter_expr)
+    else:
+        order = cache.get_order(value, sort_key=sort_key,
+                                ascending=ascending, filter_expr=filter_expr,
+                                generation=generation)
+
+    num_rows = get_num_rows(value) if order is None else len(order)
+    row_start, row_stop = clip_range(rows, num_rows)
+    if order is None:
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            window = value.iloc[row_start:row_stop]
+        else:
+            window = value[row_start:row_stop]
+    else:
+        window = take_rows(value, order[row_start:row_stop])
+
+    column_range = None
+    if len(value.shape) > 1:
+        column_range = clip_range(columns, value.shape[1])
+        column_slice = slice(*column_range)
+        if is_pandas_frame(window):
+            window = window.iloc[:, column_slice]
+        else:
+            window = window[:, column_slice]
+        column_range = list(column_range)
+
+    info = {
+        'shape': list(value.shape),
+        'rows': num_rows,
+        'row_range': [row_start, row_stop],
+        'column_range': column_range,
+        'dtypes': get_dtypes(window),
+    }
+    return window, info
+
+
+def encode_window(window, info):
+    """Encode a window and its info, to send them through a comm."""
+    encoded = encode_value(window)
+    return BufferedValue(dict(info, encoding=encoded.value), encoded.buffers)
+
+
+def decode_window(buffered_value):
+    """Decode a window encoded with `encode_window` and return its info."""
+    info = dict(buffered_value.value)
+    encoding = info.pop('encoding')
+    window = decode_value(BufferedValue(encoding, buffered_value.buffers))
+    return window, info
@@ -24,7 +24,14 @@ class FakeObject:
 
 
 class LazyModule:
-    """Lazy module loader class."""
+    """
+    Lazy module loader class.
+
+    The module is imported the first time one of its attributes is
+    accessed, or replaced by FakeObject if it's not installed. Attributes
+    are bound to the instance once they are looked up, so that accessing
+    them again doesn't need to go through `__getattr__`.
+    """
 
     def __init__(self, modname, second_level_attrs=None):
         """
@@ -40,6 +47,7 @@ class LazyModule:
         """
         self.__spy_modname__ = modname
         self.__spy_mod__ = FakeObject
+        self.__spy_resolved__ = False
 
         # Set required second level attributes
         if second_level_attrs is not None:
@@ -47,12 +55,23 @@ class LazyModule:
                 setattr(self.__spy_mod__, attr, FakeObject)
 
     def __getattr__(self, name):
-        if is_module_installed(self.__spy_modname__):
-            self.__spy_mod__ = __import__(self.__spy_modname__)
+        # This is only called for attributes that are not bound yet
+        if name.startswith('__spy_'):
+            # Avoid infinite recursions when the instance is not initialized
+            # (e.g. when it's copied)
+            raise AttributeError(name)
+
+        if not self.__spy_resolved__:
+            if is_module_installed(self.__spy_modname__):
+                self.__spy_mod__ = __import__(self.__spy_modname__)
+            self.__spy_resolved__ = True
+
+        if self.__spy_mod__ is FakeObject:
+            value = FakeObject
         else:
-            return self.__spy_mod__
-
-        return getattr(self.__spy_mod__, name)
+            value = getattr(self.__spy_mod__, name)
+        setattr(self, name, value)
+        return value
 
 
 # =============================================================================
@@ -9,18 +9,31 @@
 """
 Utilities to build a namespace view.
 """
-from itertools import islice
+from collections import OrderedDict
+from contextlib import contextmanager
+import copy
+import fnmatch
+from functools import cached_property, partial
+from itertools import chain, islice
 import inspect
 import pathlib
 import re
+import sys
+import time
+import weakref
 
+from spyder_kernels.utils.arraystats import array_stats
 from spyder_kernels.utils.lazymodules import (
-    bs4, FakeObject, numpy as np, pandas as pd, PIL)
+    FakeObject, numpy as np, pandas as pd, PIL)
 
 
 #==============================================================================
 # Numpy support
 #==============================================================================
+# Max number of elements of Numpy arrays shown in their display
+ARRAY_DISPLAY_THRESHOLD = 10
+
+
 def get_numeric_numpy_types():
     return (np.int64, np.int32, np.int16, np.int8, np.uint64, np.uint32,
             np.uint16, np.uint8, np.float64, np.float32, np.float16,
@@ -87,6 +100,14 @@ def try_to_eval(value):
 
 def get_size(item):
     """Return shape/size/len of an item of arbitrary type"""
+    size_func = get_type_handler(type(item)).size
+    if size_func is not None:
+        try:
+            return size_func(item)
+        except Exception:
+            # There is one item
+            return 1
+
     try:
         if (
             hasattr(item, 'size') and hasattr(item.size, 'compute') or
@@ -195,43 +216,40 @@ def str_to_timedelta(value):
 #==============================================================================
 # Supported types
 #==============================================================================
+# Type strings (see `get_type_string`) of the objects that can be edited
+EDITABLE_TYPE_STRINGS = [
+    'bool',
+    'int',
+    'long',
+    'float',
+    'complex',
+    'list',
+    'set',
+    'frozenset',
+    'dict',
+    'tuple',
+    'str',
+    'unicode',
+    'NDArray',
+    'MaskedArray',
+    'Matrix',
+    'DataFrame',
+    'Series',
+    'PIL.Image.Image',
+    'datetime.date',
+    'datetime.timedelta',
+]
+
+
 def is_editable_type(value):
     """
     Return True if data type is editable with a standard GUI-based editor,
     like CollectionsEditor, ArrayEditor, QDateEdit or a simple QLineEdit.
     """
-    if not is_known_type(value):
-        return False
-    else:
-        supported_types = [
-            'bool',
-            'int',
-            'long',
-            'float',
-            'complex',
-            'list',
-            'set',
-            'frozenset',
-            'dict',
-            'tuple',
-            'str',
-            'unicode',
-            'NDArray',
-            'MaskedArray',
-            'Matrix',
-            'DataFrame',
-            'Series',
-            'PIL.Image.Image',
-            'datetime.date',
-            'datetime.timedelta',
-        ]
-
-        if (get_type_string(value) not in supported_types and
-                not isinstance(value, pd.Index)):
-            np_dtype = get_numpy_dtype(value)
-            if np_dtype is None or not hasattr(value, 'size'):
-                return False
-        return True
+    editable = get_type_handler(type(value)).editable
+    if editable is None:
+        editable = get_type_string(value) in EDITABLE_TYPE_STRINGS
+    return editable
 
 
 #==============================================================================
@@ -255,6 +273,19 @@ def sort_against(list1, list2, reverse=False, sort_key=None):
         return list1
 
 
+def size_sort_key(size):
+    """Return the number of elements of a size computed with get_size."""
+    if isinstance(size, tuple):
+        key = 1
+        for dim in size:
+            key *= max(dim, 0) if isinstance(dim, int) else 0
+        return key
+    try:
+        return int(size)
+    except Exception:
+        return 0
+
+
 def unsorted_unique(lista):
     """Removes duplicates from lista neglecting its initial ordering"""
     return list(set(lista))
@@ -336,111 +367,159 @@ def collections_display(value, level):
     return display
 
 
-def value_to_display(value, minmax=False, level=0):
-    """Convert value for display purpose"""
-    # To save current Numpy printoptions
-    np_printoptions = FakeObject
+def object_display(value, level=0, minmax=False):
+    """Display for objects without a specific one."""
+    if level == 0:
+        return default_display(value)
+    return default_display(value, with_module=False)
+
+
+def builtin_collection_display(value, level=0, minmax=False):
+    """Display for lists, sets, frozensets, tuples and dicts."""
+    # Subclasses are displayed as any other object
+    if type(value) in [list, set, frozenset, tuple, dict]:
+        return collections_display(value, level+1)
+    return object_display(value, level)
+
+
+def recarray_display(value, level=0, minmax=False):
+    """Display for Numpy record arrays."""
+    if level == 0:
+        fields = value.names
+        return 'Field names: ' + ', '.join(fields)
+    return 'Recarray'
+
+
+def masked_array_display(value, level=0, minmax=False):
+    """Display for Numpy masked arrays."""
+    return 'Masked array'
+
+
+def array_display(value, level=0, minmax=False):
+    """Display for Numpy arrays."""
+    if level > 0:
+        return 'Numpy array'
+
     printable_numpy_types = get_numeric_numpy_types() + (np.str_,)
+    if minmax:
+        try:
+            minimum, maximum, exact = array_stats.get_minmax(value)
+            if exact:
+                return 'Min: %r\nMax: %r' % (minimum, maximum)
+            return 'Min (sampled): %r\nMax (sampled): %r' % (
+                minimum, maximum)
+        except (TypeError, ValueError):
+            pass
+    if value.dtype.type in printable_numpy_types:
+        return array_to_str(value)
+    return default_display(value)
+
+
+def array_to_str(value):
+    """
+    Convert an array to a string as str does, but summarizing it when it has
+    more than `ARRAY_DISPLAY_THRESHOLD` elements.
 
-    try:
-        if np.ndarray is not FakeObject:
-            # Save printoptions
-            np_printoptions = np.get_printoptions()
-            # Set max number of elements to show for Numpy arrays
-            # in our display
-            np.set_printoptions(threshold=10)
-        if isinstance(value, np.recarray):
-            if level == 0:
-                fields = value.names
-                display = 'Field names: ' + ', '.join(fields)
-            else:
-                display = 'Recarray'
-        elif isinstance(value, np.ma.MaskedArray):
-            display = 'Masked array'
-        elif isinstance(value, np.ndarray):
-            if level == 0:
-                if minmax:
-                    try:
-                        display = 'Min: %r\nMax: %r' % (value.min(), value.max())
-                    except (TypeError, ValueError):
-                        if value.dtype.type in printable_numpy_types:
-                            display = str(value)
-                        else:
-                            display = default_display(value)
-                elif value.dtype.type in printable_numpy_types:
-                    display = str(value)
-                else:
-                    display = default_display(value)
-            else:
-                display = 'Numpy array'
-        elif type(value) in [list, set, frozenset, tuple, dict]:
-            display = collections_display(value, level+1)
-        elif isinstance(value, PIL.Image.Image):
-            if level == 0:
-                display = '%s  Mode: %s' % (address(value), value.mode)
-            else:
-                display = 'Image'
-        elif (
-            isinstance(value, pd.DataFrame)
-            or str(type(value)) == "<class 'polars.dataframe.frame.DataFrame'>"
-        ):
-            if level == 0:
-                cols = value.columns
-                cols = [str(c) for c in cols]
-                display = 'Column names: ' + ', '.join(list(cols))
-            else:
-                display = 'Dataframe'
-        elif isinstance(value, bs4.element.NavigableString):
-            # Fixes Issue 2448
-            display = str(value)
+    The threshold is passed to np.array2string instead of setting it in the
+    global print options, which are only read.
+    """
+    if type(value).__str__ is not np.ndarray.__str__:
+        # Subclasses with their own conversion can only use print options
+        with np.printoptions(threshold=ARRAY_DISPLAY_THRESHOLD):
+            return str(value)
+    if value.ndim == 0:
+        # Not summarized
+        return str(value)
+    return np.array2string(
+        value, threshold=ARRAY_DISPLAY_THRESHOLD, separator=' ')
+
+
+def numpy_scalar_display(value, level=0, minmax=False):
+    """Display for Numpy scalars."""
+    if isinstance(value, get_numeric_numpy_types() + (np.str_,)):
+        return repr(value)
+    return object_display(value, level)
+
+
+def image_display(value, level=0, minmax=False):
+    """Display for PIL images."""
+    if level == 0:
+        return '%s  Mode: %s' % (address(value), value.mode)
+    return 'Image'
+
+
+def dataframe_display(value, level=0, minmax=False):
+    """Display for Pandas and Polars dataframes."""
+    if level == 0:
+        cols = value.columns
+        cols = [str(c) for c in cols]
+        return 'Column names: ' + ', '.join(list(cols))
+    return 'Dataframe'
+
+
+def navigable_string_display(value, level=0, minmax=False):
+    """Display for BeautifulSoup strings."""
+    # Fixes Issue 2448
+    display = str(value)
+    if level > 0:
+        display = "'" + display + "'"
+    return display
+
+
+def index_display(value, level=0, minmax=False):
+    """Display for Pandas indexes."""
+    if level == 0:
+        try:
+            return value._summary()
+        except AttributeError:
+            return value.summary()
+    return 'Index'
+
+
+def bytes_display(value, level=0, minmax=False):
+    """Display for bytes."""
+    # We don't apply this to classes that extend string types
+    # See issue 5636
+    if type(value) in [str, bytes]:
+        try:
+            display = str(value, 'utf8')
             if level > 0:
                 display = "'" + display + "'"
-        elif isinstance(value, pd.Index):
-            if level == 0:
-                try:
-                    display = value._summary()
-                except AttributeError:
-                    display = value.summary()
-            else:
-                display = 'Index'
-        elif isinstance(value, bytes):
-            # We don't apply this to classes that extend string types
-            # See issue 5636
-            if type(value) in [str, bytes]:
-                try:
-                    display = str(value, 'utf8')
-                    if level > 0:
-                        display = "'" + display + "'"
-                except:
-                    display = value
-                    if level > 0:
-                        display = b"'" + display + b"'"
-            else:
-                display = default_display(value)
-        elif isinstance(value, str):
-            # We don't apply this to classes that extend string types
-            # See issue 5636
-            if type(value) in [str, bytes]:
-                display = value
-                if level > 0:
-                    display = "'" + display + "'"
-            else:
-                display = default_display(value)
-        elif isinstance(value, pathlib.PurePath):
-            display = str(value)
-        elif isinstance(value, (datetime.date, datetime.timedelta)):
-            display = str(value)
-        elif (
-            isinstance(value, (int, float, complex, bool))
-            or isinstance(value, printable_numpy_types)
-            or value is None
-        ):
-            display = repr(value)
-        else:
-            if level == 0:
-                display = default_display(value)
-            else:
-                display = default_display(value, with_module=False)
+        except:
+            display = value
+            if level > 0:
+                display = b"'" + display + b"'"
+        return display
+    return default_display(value)
+
+
+def text_display(value, level=0, minmax=False):
+    """Display for strings."""
+    # We don't apply this to classes that extend string types
+    # See issue 5636
+    if type(value) in [str, bytes]:
+        display = value
+        if level > 0:
+            display = "'" + display + "'"
+        return display
+    return default_display(value)
+
+
+def str_display(value, level=0, minmax=False):
+    """Display for objects shown with their string representation."""
+    return str(value)
+
+
+def repr_display(value, level=0, minmax=False):
+    """Display for objects shown with their repr."""
+    return repr(value)
+
+
+def value_to_display(value, minmax=False, level=0):
+    """Convert value for display purpose"""
+    try:
+        display_func = get_type_handler(type(value)).display
+        display = display_func(value, level=level, minmax=minmax)
     except Exception:
         display = default_display(value)
 
@@ -453,10 +532,6 @@ def value_to_display(value, minmax=False, level=0):
             ellipses = ' ...'
         display = display[:70].rstrip() + ellipses
 
-    # Restore Numpy printoptions
-    if np_printoptions is not FakeObject:
-        np.set_printoptions(**np_printoptions)
-
     return display
 
 
@@ -514,28 +589,18 @@ def display_to_value(value, default_value, ignore_errors=True):
 # =============================================================================
 def get_type_string(item):
     """Return type string of an object."""
-    # The try/except is necessary to fix spyder-ide/spyder#19516.
-    try:
-        # Numpy objects (don't change the order!)
-        if isinstance(item, np.ma.MaskedArray):
-            return "MaskedArray"
-        if isinstance(item, np.matrix):
-            return "Matrix"
-        if isinstance(item, np.ndarray):
-            return "NDArray"
-
-        # Pandas objects
-        if isinstance(item, pd.DataFrame):
-            return "DataFrame"
-        if isinstance(item, pd.Index):
-            return type(item).__name__
-        if isinstance(item, pd.Series):
-            return "Series"
-    except Exception:
-        pass
+    type_string = get_type_handler(type(item)).type_string
+    if callable(type_string):
+        try:
+            return type_string(item)
+        except Exception:
+            return 'Unknown'
+    return type_string
+
 
-    found = re.findall(r"<(?:type|class) '(\S*)'>",
-                       str(type(item)))
+def get_generic_type_string(item_type):
+    """Return the type string of the instances of a type without handler."""
+    found = re.findall(r"<(?:type|class) '(\S*)'>", str(item_type))
     if found:
         if found[0] == 'type':
             return 'class'
@@ -553,30 +618,37 @@ def is_known_type(item):
 
 def get_human_readable_type(item):
     """Return human-readable type string of an item"""
-    # The try/except is necessary to fix spyder-ide/spyder#19516.
-    try:
-        if isinstance(item, (np.ndarray, np.ma.MaskedArray)):
-            return u'Array of ' + item.dtype.name
-        elif isinstance(item, PIL.Image.Image):
-            return "Image"
-        else:
-            text = get_type_string(item)
-            if text == 'polars.dataframe.frame.DataFrame':
-                return 'Polars DataFrame'
-            elif text == 'polars.series.series.Series':
-                return 'Polars Series'
-            else:
-                return text[text.find('.') + 1:]
-    except Exception:
-        return 'Unknown'
+    readable_type = get_type_handler(type(item)).readable_type
+    if readable_type is None:
+        text = get_type_string(item)
+        return text[text.find('.') + 1:]
+    elif callable(readable_type):
+        # The try/except is necessary to fix spyder-ide/spyder#19516.
+        try:
+            return readable_type(item)
+        except Exception:
+            return 'Unknown'
+    return readable_type
 
 
 #==============================================================================
 # Globals filter: filter namespace dictionaries (to be edited in
 # CollectionsEditor)
 #==============================================================================
+# Max number of elements of a container that are checked when checking all
+# of them, and max number of verdicts of big containers that are cached
+SUPPORT_SAMPLE_SIZE = 100
+MAX_SUPPORT_CACHE = 1000
+SUPPORT_CACHE = OrderedDict()
+
+
 def is_supported(value, check_all=False, filters=None, iterate=False):
-    """Return True if value is supported, False otherwise."""
+    """
+    Return True if value is supported, False otherwise.
+
+    If *iterate* is True, the elements of lists, tuples, sets and dicts are
+    checked too (see `are_elements_supported`).
+    """
     assert filters is not None
     if value is None:
         return True
@@ -586,26 +658,68 @@ def is_supported(value, check_all=False, filters=None, iterate=False):
         return False
     elif not isinstance(value, filters):
         return False
-    elif iterate:
-        if isinstance(value, (list, tuple, set, frozenset)):
-            valid_count = 0
-            for val in value:
-                if is_supported(val, filters=filters, iterate=check_all):
-                    valid_count += 1
-                if not check_all:
-                    break
-            return valid_count > 0
-        elif isinstance(value, dict):
-            for key, val in list(value.items()):
-                if not is_supported(key, filters=filters, iterate=check_all) \
-                   or not is_supported(val, filters=filters,
-                                       iterate=check_all):
-                    return False
-                if not check_all:
-                    break
+    elif iterate and isinstance(value, CONTAINER_TYPES):
+        return are_elements_supported(value, check_all=check_all,
+                                      filters=filters)
     return True
 
 
+def sample_elements(value, sample_size):
+    """
+    Return at most *sample_size* elements of a list, tuple or set, or items
+    of a dict. Lists and tuples are sampled with a stride to cover them
+    evenly.
+    """
+    if isinstance(value, dict):
+        return list(islice(value.items(), sample_size))
+    if isinstance(value, (list, tuple)) and len(value) > sample_size:
+        return value[::-(-len(value) // sample_size)]
+    return list(islice(value, sample_size))
+
+
+def are_elements_supported(value, check_all=False, filters=None):
+    """
+    Return True if the elements of a list, tuple, set or dict are supported.
+
+    Sequences and sets need a supported element and dicts need all their
+    keys and values to be supported. Only the first element is checked,
+    unless *check_all* is True. Then a sample of `SUPPORT_SAMPLE_SIZE`
+    elements is checked (and the first element of nested containers), and
+    the verdicts of bigger containers are cached by identity and length, so
+    they're only checked again when either changes.
+    """
+    key = None
+    if check_all and len(value) > SUPPORT_SAMPLE_SIZE:
+        key = (id(value), type(value), len(value), filters)
+        try:
+            verdict = SUPPORT_CACHE.get(key)
+        except TypeError:
+            key = verdict = None
+        if verdict is not None:
+            SUPPORT_CACHE.move_to_end(key)
+            return verdict
+
+    sample_size = SUPPORT_SAMPLE_SIZE if check_all else 1
+    elements = sample_elements(value, sample_size)
+    if isinstance(value, dict):
+        verdict = all(
+            is_supported(k, filters=filters, iterate=check_all)
+            and is_supported(v, filters=filters, iterate=check_all)
+            for k, v in elements
+        )
+    else:
+        verdict = any(
+            is_supported(element, filters=filters, iterate=check_all)
+            for element in elements
+        )
+
+    if key is not None:
+        SUPPORT_CACHE[key] = verdict
+        while len(SUPPORT_CACHE) > MAX_SUPPORT_CACHE:
+            SUPPORT_CACHE.popitem(last=False)
+    return verdict
+
+
 def is_callable_or_module(value):
     """Return True if value is a callable or module, False otherwise."""
     try:
@@ -641,6 +755,837 @@ def globalsfilter(input_dict, check_all=False, filters=None,
     return output_dict
 
 
+#==============================================================================
+# Display cache
+#==============================================================================
+# Max number of array elements checked to compute a fingerprint
+MAX_FINGERPRINT_CORNERS = 4096
+
+
+def register_fingerprint(cls, func):
+    """
+    Register a function to compute the fingerprint of instances of *cls*.
+
+    *func* is called with the object and must return a hashable value that
+    changes whenever its display could change (e.g. a version number that
+    is increased after each modification). That allows DisplayCache to
+    reuse its row in the namespace view while it remains the same.
+    """
+    if isinstance(cls, str):
+        handler = NAMED_TYPE_HANDLERS.get(cls)
+    else:
+        handler = TYPE_HANDLERS.get(cls)
+    handler = copy.copy(handler) if handler is not None else TypeHandler()
+    handler.fingerprint = func
+    register_type_handler(cls, handler)
+
+
+def get_display_context(minmax=False, memory=False):
+    """
+    Return the options that, besides the objects themselves, determine the
+    rows of a namespace view.
+    """
+    if np.ndarray is FakeObject:
+        return (minmax, memory, None)
+    return (minmax, memory, np.get_printoptions())
+
+
+def get_array_corners(value, edgeitems):
+    """
+    Return the elements of a Numpy array that are shown in its display when
+    it's summarized, i.e. the first and last *edgeitems* of each dimension.
+    """
+    index = np.ix_(*[
+        np.r_[0:edgeitems, n - edgeitems:n]
+        if n > 2 * edgeitems else np.arange(n)
+        for n in value.shape
+    ])
+    return value[index]
+
+
+def array_fingerprint(value):
+    """Fingerprint of Numpy arrays."""
+    # Small arrays are quick to display
+    if type(value) is not np.ndarray or value.size <= ARRAY_DISPLAY_THRESHOLD:
+        return None
+
+    # Only the array corners are displayed when it's summarized, so they are
+    # the only elements that need to be checked.
+    edgeitems = np.get_printoptions()['edgeitems']
+    corners_size = 1
+    for n in value.shape:
+        corners_size *= min(n, 2 * edgeitems)
+    if corners_size > MAX_FINGERPRINT_CORNERS:
+        return None
+    return (
+        value.__array_interface__['data'][0],
+        value.shape,
+        value.strides,
+        value.dtype,
+        get_array_corners(value, edgeitems).tobytes()
+    )
+
+
+def dataframe_fingerprint(value):
+    """Fingerprint of Pandas and Polars dataframes."""
+    # Only the first columns fit in the display
+    columns = tuple(str(c) for c in value.columns[:36])
+    return (value.shape, columns)
+
+
+def shape_fingerprint(value):
+    """Fingerprint of objects that only display their type and shape."""
+    return (value.shape,)
+
+
+def index_fingerprint(value):
+    """Fingerprint of Pandas indexes."""
+    # Indexes are immutable
+    return (len(value),)
+
+
+def image_fingerprint(value):
+    """Fingerprint of PIL images."""
+    return (value.mode, value.size)
+
+
+def get_fingerprint(value, minmax=False):
+    """
+    Return a cheap fingerprint of *value*.
+
+    The fingerprint changes whenever the row of *value* in the namespace view
+    could change. None is returned for objects whose row can't be reused
+    safely or is cheap to compute.
+    """
+    # The min and max of arrays depend on all their elements
+    if minmax and type(value) is np.ndarray:
+        return None
+
+    fingerprint_func = get_type_handler(type(value)).fingerprint
+    if fingerprint_func is None:
+        return None
+
+    try:
+        return fingerprint_func(value)
+    except Exception:
+        return None
+
+
+class DisplayCache:
+    """
+    Least recently used cache of the entries of a namespace view, i.e.
+    the rows and properties of its variables (see `make_view_entry`).
+
+    Entries are saved by object identity together with the object
+    fingerprint (see `get_fingerprint`), so they are reused while objects
+    don't change. Objects that can't be weakly referenced are not cached
+    and the entries of the other ones are removed when they are garbage
+    collected. The memory usage of objects (see `get_memory_usage`) is
+    cached in the same way, regardless of the display options.
+    """
+
+    def __init__(self, maxsize=1000):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._memory = OrderedDict()
+        self._context = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        """Remove all entries and memory usages."""
+        self._entries.clear()
+        self._memory.clear()
+
+    def discard(self, value):
+        """Remove the entry of *value*, e.g. because it was modified."""
+        key = id(value)
+        for cache in (self._entries, self._memory):
+            cached = cache.get(key)
+            if cached is not None and cached[0]() is value:
+                del cache[key]
+
+    def set_context(self, context):
+        """
+        Set the options in which entries are computed (see
+        `get_display_context`). Entries computed with other options are
+        removed.
+        """
+        if context != self._context:
+            self._entries.clear()
+            self._context = context
+
+    def lookup(self, value, minmax=False, fingerprint=None):
+        """Get the cached entry of *value*, or None if it's not up to date."""
+        if fingerprint is None:
+            fingerprint = get_fingerprint(value, minmax=minmax)
+            if fingerprint is None:
+                return None
+
+        key = id(value)
+        cached = self._entries.get(key)
+        if (
+            cached is not None
+            and cached[0]() is value
+            and cached[1] == fingerprint
+        ):
+            self._entries.move_to_end(key)
+            row, properties = cached[2]
+            return row.copy(), properties.copy()
+
+        return None
+
+    def get_entry(self, value, minmax=False, memory=False):
+        """Get the entry of *value*, computing it only if necessary."""
+        fingerprint = get_fingerprint(value, minmax=minmax)
+        if fingerprint is None:
+            return make_view_entry(value, minmax=minmax, memory=memory)
+
+        entry = self.lookup(value, minmax=minmax, fingerprint=fingerprint)
+        if entry is not None:
+            return entry
+
+        row, properties = make_view_entry(value, minmax=minmax)
+        if memory:
+            row['memory'] = self.get_memory_usage(value)
+        self._store(self._entries, value, fingerprint,
+                    (row.copy(), properties.copy()))
+        return row, properties
+
+    def lookup_memory_usage(self, value):
+        """
+        Get the cached memory usage of *value*, or None if it's not up to
+        date.
+        """
+        fingerprint = get_fingerprint(value)
+        if fingerprint is None:
+            return None
+        cached = self._lookup_memory(value, fingerprint)
+        return None if cached is None else cached[2]
+
+    def get_memory_usage(self, value):
+        """
+        Get the memory usage of *value* (see `get_memory_usage`), computing
+        it only if necessary.
+        """
+        fingerprint = get_fingerprint(value)
+        if fingerprint is None:
+            return get_memory_usage(value)
+
+        cached = self._lookup_memory(value, fingerprint)
+        if cached is not None:
+            return cached[2]
+
+        usage = get_memory_usage(value)
+        self._store(self._memory, value, fingerprint, usage)
+        return usage
+
+    def _lookup_memory(self, value, fingerprint):
+        """Get the cached (ref, fingerprint, usage) of *value*, if valid."""
+        key = id(value)
+        cached = self._memory.get(key)
+        if (
+            cached is not None
+            and cached[0]() is value
+            and cached[1] == fingerprint
+        ):
+            self._memory.move_to_end(key)
+            return cached
+        return None
+
+    def _store(self, cache, value, fingerprint, result):
+        """Save the *result* computed for *value* in *cache*."""
+        key = id(value)
+        try:
+            ref = weakref.ref(value, partial(self._remove, cache, key))
+        except TypeError:
+            return
+
+        cache[key] = (ref, fingerprint, result)
+        cache.move_to_end(key)
+        while len(cache) > self.maxsize:
+            cache.popitem(last=False)
+
+    def _remove(self, cache, key, ref):
+        """Remove the result of an object that was garbage collected."""
+        cached = cache.get(key)
+        if cached is not None and cached[0] is ref:
+            del cache[key]
+
+
+#==============================================================================
+# Type handlers
+#==============================================================================
+class TypeHandler:
+    """
+    Functions to show the objects of a type in the namespace view.
+
+    Parameters
+    ----------
+    display: callable, optional
+        Called with an object and the `level` and `minmax` keyword arguments
+        to get its display (see `value_to_display`).
+    size: callable, optional
+        Called with an object to get its size (see `get_size`).
+    type_string: str or callable, optional
+        Type string of the objects (see `get_type_string`) or function to
+        get it from an object.
+    readable_type: str or callable, optional
+        Human-readable type of the objects (see `get_human_readable_type`)
+        or function to get it from an object.
+    editable: bool, optional
+        Whether the objects can be edited (see `is_editable_type`).
+    fingerprint: callable, optional
+        Called with an object to get its fingerprint (see `get_fingerprint`).
+    memory: callable, optional
+        Called with an object to get the bytes of memory it uses (see
+        `get_memory_usage`).
+    cost: float, optional
+        Hint of the time it takes to display an object, relative to a
+        Python scalar (which costs 1).
+
+    The options that are not given are taken from the handlers of the base
+    classes or, if they don't have them either, computed generically.
+    """
+
+    OPTIONS = ('display', 'size', 'type_string', 'readable_type', 'editable',
+               'fingerprint', 'memory', 'cost')
+
+    def __init__(self, display=None, size=None, type_string=None,
+                 readable_type=None, editable=None, fingerprint=None,
+                 memory=None, cost=None):
+        self.display = display
+        self.size = size
+        self.type_string = type_string
+        self.readable_type = readable_type
+        self.editable = editable
+        self.fingerprint = fingerprint
+        self.memory = memory
+        self.cost = cost
+
+
+# Handlers registered for types and for the full names of types whose module
+# could be not imported yet
+TYPE_HANDLERS = {}
+NAMED_TYPE_HANDLERS = {}
+
+# Handlers resolved for the types seen so far
+RESOLVED_TYPE_HANDLERS = {}
+MAX_RESOLVED_TYPE_HANDLERS = 1000
+
+
+def register_type_handler(cls, handler):
+    """
+    Register the TypeHandler of *cls* and its subclasses.
+
+    *cls* can also be the full name of a class (e.g. 'polars.DataFrame'), to
+    not import its module. The handler is used once the module is imported.
+    """
+    if isinstance(cls, str):
+        NAMED_TYPE_HANDLERS[cls] = handler
+    else:
+        TYPE_HANDLERS[cls] = handler
+    RESOLVED_TYPE_HANDLERS.clear()
+
+
+def unregister_type_handler(cls):
+    """Remove the TypeHandler registered for *cls*."""
+    if isinstance(cls, str):
+        NAMED_TYPE_HANDLERS.pop(cls, None)
+    else:
+        TYPE_HANDLERS.pop(cls, None)
+    RESOLVED_TYPE_HANDLERS.clear()
+
+
+def resolve_named_type_handlers():
+    """Register the handlers of named classes whose module was imported."""
+    for name in list(NAMED_TYPE_HANDLERS):
+        module_name, __, attr = name.rpartition('.')
+        module = sys.modules.get(module_name)
+        if module is None:
+            continue
+
+        try:
+            cls = getattr(module, attr, None)
+        except Exception:
+            cls = None
+        if isinstance(cls, type):
+            handler = NAMED_TYPE_HANDLERS.pop(name)
+            TYPE_HANDLERS.setdefault(cls, handler)
+            RESOLVED_TYPE_HANDLERS.clear()
+
+
+def get_type_handler(value_type):
+    """
+    Return the TypeHandler of *value_type*, with all its options resolved
+    from the handlers of its base classes (in method resolution order) and
+    the generic functions.
+    """
+    try:
+        return RESOLVED_TYPE_HANDLERS[value_type]
+    except (KeyError, TypeError):
+        pass
+
+    if NAMED_TYPE_HANDLERS:
+        resolve_named_type_handlers()
+
+    options = {}
+    for cls in getattr(value_type, '__mro__', (value_type,)):
+        try:
+            handler = TYPE_HANDLERS.get(cls)
+        except TypeError:
+            handler = None
+        if handler is None:
+            continue
+        for option in TypeHandler.OPTIONS:
+            if options.get(option) is None:
+                options[option] = getattr(handler, option)
+
+    resolved = TypeHandler(**options)
+    if resolved.display is None:
+        resolved.display = object_display
+    if resolved.type_string is None:
+        resolved.type_string = get_generic_type_string(value_type)
+    if isinstance(resolved.type_string, str):
+        text = resolved.type_string
+        if resolved.readable_type is None:
+            resolved.readable_type = text[text.find('.') + 1:]
+        if resolved.editable is None:
+            resolved.editable = text in EDITABLE_TYPE_STRINGS
+    if resolved.cost is None:
+        resolved.cost = 1
+
+    try:
+        if len(RESOLVED_TYPE_HANDLERS) >= MAX_RESOLVED_TYPE_HANDLERS:
+            RESOLVED_TYPE_HANDLERS.clear()
+        RESOLVED_TYPE_HANDLERS[value_type] = resolved
+    except TypeError:
+        pass
+
+    return resolved
+
+
+def shape_size(value):
+    """Size of objects with a shape."""
+    if value.shape:
+        # This is needed since values could return as `shape` an instance of
+        # a `tuple` subclass. See spyder-ide/spyder#16348
+        return tuple(value.shape)
+    # Scalar value
+    return 1
+
+
+def scalar_size(value):
+    """Size of scalars."""
+    return 1
+
+
+def array_readable_type(value):
+    """Human-readable type of Numpy arrays."""
+    return 'Array of ' + value.dtype.name
+
+
+def index_type_string(value):
+    """Type string of Pandas indexes."""
+    return type(value).__name__
+
+
+def pandas_memory(value):
+    """Memory usage of Pandas objects."""
+    usage = value.memory_usage(deep=True)
+    # Dataframes return the usage of each column
+    if isinstance(usage, pd.Series):
+        usage = usage.sum()
+    return int(usage)
+
+
+def polars_memory(value):
+    """Memory usage of Polars objects."""
+    return int(value.estimated_size())
+
+
+for _type in [type(None), bool, int, float, complex]:
+    register_type_handler(
+        _type, TypeHandler(display=repr_display, size=scalar_size))
+for _type in [list, set, frozenset, tuple, dict]:
+    register_type_handler(
+        _type, TypeHandler(display=builtin_collection_display, size=len))
+for _type in [pathlib.PurePath, datetime.date, datetime.timedelta]:
+    register_type_handler(_type, TypeHandler(display=str_display))
+register_type_handler(str, TypeHandler(display=text_display, size=len))
+register_type_handler(bytes, TypeHandler(display=bytes_display, size=len))
+
+# Numpy
+register_type_handler('numpy.ndarray', TypeHandler(
+    display=array_display,
+    size=shape_size,
+    type_string='NDArray',
+    readable_type=array_readable_type,
+    editable=True,
+    fingerprint=array_fingerprint
+))
+register_type_handler('numpy.matrix', TypeHandler(type_string='Matrix'))
+register_type_handler('numpy.ma.MaskedArray', TypeHandler(
+    display=masked_array_display, type_string='MaskedArray'))
+register_type_handler('numpy.recarray', TypeHandler(display=recarray_display))
+register_type_handler('numpy.generic', TypeHandler(
+    display=numpy_scalar_display, size=shape_size, editable=True))
+for _name in ['numpy.str_', 'numpy.bytes_']:
+    # Their str and bytes base classes come before np.generic
+    register_type_handler(_name, TypeHandler(size=shape_size))
+
+# Pandas
+register_type_handler('pandas.DataFrame', TypeHandler(
+    display=dataframe_display,
+    size=shape_size,
+    type_string='DataFrame',
+    fingerprint=dataframe_fingerprint,
+    memory=pandas_memory
+))
+register_type_handler('pandas.Series', TypeHandler(
+    size=shape_size,
+    type_string='Series',
+    fingerprint=shape_fingerprint,
+    memory=pandas_memory
+))
+register_type_handler('pandas.Index', TypeHandler(
+    display=index_display,
+    size=shape_size,
+    type_string=index_type_string,
+    editable=True,
+    fingerprint=index_fingerprint,
+    memory=pandas_memory
+))
+
+# Polars
+register_type_handler('polars.DataFrame', TypeHandler(
+    display=dataframe_display,
+    size=shape_size,
+    readable_type='Polars DataFrame',
+    fingerprint=dataframe_fingerprint,
+    memory=polars_memory
+))
+register_type_handler('polars.Series', TypeHandler(
+    size=shape_size,
+    readable_type='Polars Series',
+    fingerprint=shape_fingerprint,
+    memory=polars_memory
+))
+
+# Others
+register_type_handler('PIL.Image.Image', TypeHandler(
+    display=image_display,
+    readable_type='Image',
+    fingerprint=image_fingerprint
+))
+register_type_handler('bs4.element.NavigableString', TypeHandler(
+    display=navigable_string_display))
+
+
+#==============================================================================
+# Memory usage
+#==============================================================================
+# Max number of objects that are visited to compute the memory usage of a
+# variable, and max depth of nested containers. The usage of the elements
+# that are not visited is extrapolated from the visited ones.
+MAX_MEMORY_OBJECTS = 2000
+MAX_MEMORY_DEPTH = 100
+
+CONTAINER_TYPES = (list, tuple, set, frozenset, dict)
+
+# Types whose instances don't reference other objects
+ATOMIC_TYPES = frozenset([type(None), bool, int, float, complex, str, bytes])
+
+
+def get_array_buffer(value):
+    """
+    Return the object that owns the memory of a Numpy array and its size in
+    bytes.
+    """
+    root = value
+    while isinstance(root.base, np.ndarray):
+        root = root.base
+    if root.base is None:
+        return root, root.nbytes
+
+    # Arrays created from other buffers (e.g. bytes or memory maps)
+    try:
+        return root.base, memoryview(root.base).nbytes
+    except TypeError:
+        return root.base, root.nbytes
+
+
+def get_deep_size(value, seen, buffers, budget, depth=0):
+    """
+    Return the size in bytes of *value* and the objects it references,
+    without counting the ones in the *seen* set of ids again.
+
+    The memory of Numpy arrays is counted once per buffer and recorded in
+    *buffers* ({id: size} of the objects that own it). *budget* is a
+    one-element list with the number of objects that can still be visited.
+    """
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    budget[0] -= 1
+
+    if type(value) in ATOMIC_TYPES:
+        return sys.getsizeof(value)
+
+    if isinstance(value, np.ndarray):
+        size = sys.getsizeof(value)
+        if value.flags.owndata:
+            # The size of arrays that own their data includes it
+            size -= value.nbytes
+        owner, nbytes = get_array_buffer(value)
+        if id(owner) not in buffers:
+            buffers[id(owner)] = nbytes
+            size += nbytes
+        return size
+
+    memory_func = get_type_handler(type(value)).memory
+    if memory_func is not None:
+        return memory_func(value)
+
+    size = sys.getsizeof(value, 0)
+    if not isinstance(value, CONTAINER_TYPES) or depth >= MAX_MEMORY_DEPTH:
+        return size
+
+    if isinstance(value, dict):
+        elements, count = chain.from_iterable(value.items()), 2 * len(value)
+    else:
+        elements, count = value, len(value)
+    elements_size = visited = 0
+    for element in elements:
+        if budget[0] <= 0:
+            break
+        elements_size += get_deep_size(
+            element, seen, buffers, budget, depth + 1)
+        visited += 1
+    if 0 < visited < count:
+        elements_size = elements_size * count // visited
+    return size + elements_size
+
+
+def get_memory_usage(value):
+    """
+    Return the memory used by *value* and the objects it references.
+
+    This is a tuple with its size in bytes and the buffers of the Numpy
+    arrays included in it (see `get_deep_size`), or None if it can't be
+    computed. Containers are walked up to `MAX_MEMORY_OBJECTS` objects.
+    """
+    buffers = {}
+    try:
+        size = get_deep_size(value, set(), buffers, [MAX_MEMORY_OBJECTS])
+    except Exception:
+        return None
+    return size, buffers
+
+
+def set_memory_sizes(rows):
+    """
+    Replace the memory usage of the rows of a view by their size in bytes.
+
+    Buffers shared by several variables are only counted in the first one.
+    """
+    counted = set()
+    for row in rows.values():
+        usage = row.get('memory')
+        if usage is None:
+            row['memory'] = None
+            continue
+
+        size, buffers = usage
+        for key, nbytes in buffers.items():
+            if key in counted:
+                size -= nbytes
+            else:
+                counted.add(key)
+        row['memory'] = size
+
+
+def memory_sort_key(usage):
+    """Return the key to sort variables by their memory *usage*."""
+    return -1 if usage is None else usage[0]
+
+
+def make_memory_getter(cache=None, budget=None):
+    """
+    Make a function that returns the memory usage of a variable from its
+    name and value (see `get_memory_usage`), to sort and filter variables
+    by it.
+
+    If *cache* is a DisplayCache, the usage of objects that didn't change is
+    taken from it. If *budget* is a ViewBudget, the time it takes counts
+    against it, and variables whose usage is over budget are not walked, so
+    it's None unless it's cached.
+    """
+    def get_memory(name, value):
+        if (
+            budget is not None
+            and budget.check(name, value, part='memory') is not None
+        ):
+            if cache is None:
+                return None
+            return cache.lookup_memory_usage(value)
+
+        start = time.monotonic()
+        if cache is None:
+            usage = get_memory_usage(value)
+        else:
+            usage = cache.get_memory_usage(value)
+        if budget is not None:
+            budget.measure(
+                name, value, time.monotonic() - start, part='memory')
+        return usage
+
+    if budget is not None:
+        budget.start()
+    return get_memory
+
+
+#==============================================================================
+# Time budget
+#==============================================================================
+# Default time (in seconds) that can be spent on displaying a variable and
+# on the whole view. They can be changed with the `var_time_budget` and
+# `view_time_budget` namespace view settings (None to disable them).
+VAR_TIME_BUDGET = 0.5
+VIEW_TIME_BUDGET = 2.
+
+# Times a variable can exceed its budget before it's no longer displayed
+MAX_TIME_OVERRUNS = 3
+
+# Status of variables that are not displayed
+DEFERRED = 'deferred'
+SKIPPED = 'skipped'
+
+PLACEHOLDER_VIEWS = {
+    DEFERRED: 'Computing...',
+    SKIPPED: 'Not shown (too slow to display)',
+}
+
+
+class ViewBudget:
+    """
+    Time budget to display the variables of a namespace view.
+
+    Code that runs while displaying a variable (e.g. its `__repr__`) can't
+    be interrupted, so the time spent on each one is measured instead.
+    Variables are deferred when the whole view is over budget or when they
+    exceeded their own budget before, and they're skipped after exceeding
+    it `MAX_TIME_OVERRUNS` times. Deferred variables are only displayed in
+    complete passes (see `complete_pass`).
+
+    Overruns are remembered by name and object, so a variable is displayed
+    again when it's assigned a new value.
+    """
+
+    def __init__(self, var_budget=VAR_TIME_BUDGET,
+                 view_budget=VIEW_TIME_BUDGET, maxsize=1000):
+        self.var_budget = var_budget
+        self.view_budget = view_budget
+        self.maxsize = maxsize
+
+        # Whether variables are deferred in this pass
+        self.complete = False
+
+        # Whether variables were deferred since the last complete pass
+        self.deferred = False
+
+        self._overruns = OrderedDict()
+        self._start = 0
+
+    def set_limits(self, var_budget, view_budget):
+        """Set the time budgets of each variable and of the whole view."""
+        self.var_budget = var_budget
+        self.view_budget = view_budget
+
+    @contextmanager
+    def complete_pass(self):
+        """Context in which no variable is deferred."""
+        complete = self.complete
+        self.complete = True
+        try:
+            yield
+        finally:
+            self.complete = complete
+
+    def start(self):
+        """Start a pass over the variables of a view."""
+        self._start = time.monotonic()
+
+    def check(self, name, value, part=None):
+        """
+        Return the status of a variable: DEFERRED or SKIPPED if it shouldn't
+        be displayed now, or None otherwise.
+
+        *part* is the name of a part of the work on a variable with its own
+        overruns (e.g. 'memory' to get its memory usage), or None for
+        displaying it.
+        """
+        overruns = self._overruns.get(self._key(name, value, part), 0)
+        if overruns >= MAX_TIME_OVERRUNS:
+            return SKIPPED
+        if self.complete:
+            return None
+        if overruns or (
+            self.view_budget is not None
+            and time.monotonic() - self._start > self.view_budget
+        ):
+            self.deferred = True
+            return DEFERRED
+        return None
+
+    def measure(self, name, value, elapsed, part=None):
+        """
+        Record the time it took to display a variable (or to do a *part* of
+        the work on it, see `check`).
+        """
+        key = self._key(name, value, part)
+        if self.var_budget is not None and elapsed > self.var_budget:
+            self._overruns[key] = self._overruns.get(key, 0) + 1
+            self._overruns.move_to_end(key)
+            while len(self._overruns) > self.maxsize:
+                self._overruns.popitem(last=False)
+        else:
+            self._overruns.pop(key, None)
+
+    def _key(self, name, value, part=None):
+        """Key to remember the overruns of a variable."""
+        return (name, id(value), type(value), part)
+
+
+def make_placeholder_entry(value, status):
+    """Make the row and properties of a variable that is not displayed."""
+    # Only the type name is used because anything else could run slow code
+    type_name = type(value).__name__
+    row = {
+        'type': type_name,
+        'size': 1,
+        'view': PLACEHOLDER_VIEWS[status],
+        'python_type': type_name,
+        'numpy_type': 'Unknown',
+        status: True,
+    }
+    properties = {
+        'is_list': False,
+        'is_dict': False,
+        'is_set': False,
+        'len': None,
+        'is_array': False,
+        'is_image': False,
+        'is_data_frame': False,
+        'is_series': False,
+        'array_shape': None,
+        'array_ndim': None,
+        status: True,
+    }
+    return row, properties
+
+
 #==============================================================================
 # Create view to be displayed by NamespaceBrowser
 #==============================================================================
@@ -718,22 +1663,491 @@ def get_remote_data(data, settings, mode, more_excluded_names=None):
         excluded_names=excluded_names, filter_on=settings['filter_on'])
 
 
-def make_remote_view(data, settings, more_excluded_names=None):
+def make_view_entry(value, minmax=False, memory=False):
+    """
+    Make the row that represents *value* in a remote view and its
+    properties.
+
+    If *memory* is True, the row also has its memory usage (see
+    `get_memory_usage`), which `set_memory_sizes` turns into bytes.
+    """
+    # The try/excepts are necessary to fix spyder-ide/spyder#19516.
+    is_list = is_dict = is_set = False
+    is_array = is_image = is_data_frame = is_series = False
+    try:
+        is_list = isinstance(value, (tuple, list))
+        is_dict = isinstance(value, dict)
+        is_set = isinstance(value, set)
+        is_array = isinstance(value, np.ndarray)
+        is_image = isinstance(value, PIL.Image.Image)
+        is_data_frame = isinstance(value, pd.DataFrame)
+        is_series = isinstance(value, pd.Series)
+    except Exception:
+        pass
+
+    try:
+        array_shape = value.shape if is_array else None
+        array_ndim = value.ndim if is_array else None
+    except Exception:
+        array_shape = array_ndim = None
+
+    size = get_size(value)
+    row = {
+        'type':  get_human_readable_type(value),
+        'size':  size,
+        'view':  value_to_display(value, minmax=minmax),
+        'python_type': get_type_string(value),
+        'numpy_type': get_numpy_type_string(value)
+    }
+    if memory:
+        row['memory'] = get_memory_usage(value)
+    properties = {
+        'is_list': is_list,
+        'is_dict': is_dict,
+        'is_set': is_set,
+        'len': size,
+        'is_array': is_array,
+        'is_image': is_image,
+        'is_data_frame': is_data_frame,
+        'is_series': is_series,
+        'array_shape': array_shape,
+        'array_ndim': array_ndim
+    }
+    return row, properties
+
+
+def make_view_row(value, minmax=False):
+    """Make the row that represents *value* in a remote view."""
+    return make_view_entry(value, minmax=minmax)[0]
+
+
+def make_view_entries(items, minmax=False, cache=None, budget=None,
+                      memory=False):
+    """
+    Make the rows and properties of a remote view for a list of
+    (name, value) *items*.
+
+    If *cache* is a DisplayCache, the entries of objects that didn't change
+    since it was last used are taken from it. If *budget* is a ViewBudget,
+    variables that are over budget get a placeholder entry. If *memory* is
+    True, rows have the bytes used by their variables under `memory`.
+    """
+    if cache is not None:
+        cache.set_context(get_display_context(minmax, memory))
+    order = [name for name, __ in items]
+    if budget is not None:
+        # Display cheap variables first, so that expensive ones are deferred
+        # when the view is over budget.
+        items = sorted(
+            items, key=lambda item: get_type_handler(type(item[1])).cost)
+        budget.start()
+
+    rows = {}
+    properties = {}
+    for name, value in items:
+        status = None if budget is None else budget.check(name, value)
+        if status is not None:
+            entry = None
+            if status == DEFERRED and cache is not None:
+                entry = cache.lookup(value, minmax=minmax)
+            if entry is None:
+                entry = make_placeholder_entry(value, status)
+            rows[name], properties[name] = entry
+            continue
+
+        start = time.monotonic()
+        if cache is None:
+            entry = make_view_entry(value, minmax=minmax, memory=memory)
+        else:
+            entry = cache.get_entry(value, minmax=minmax, memory=memory)
+        rows[name], properties[name] = entry
+        if budget is not None:
+            budget.measure(name, value, time.monotonic() - start)
+
+    if budget is not None:
+        rows = {name: rows[name] for name in order}
+        properties = {name: properties[name] for name in order}
+    if memory:
+        set_memory_sizes(rows)
+    return rows, properties
+
+
+# Keys of the queries that filter remote views (see `make_query_filter`)
+QUERY_KEYS = ('name_regex', 'name_glob', 'types', 'min_size', 'max_size',
+              'min_memory', 'max_memory')
+
+
+def make_query_filter(query, get_memory=None):
+    """
+    Make a function that returns True if the name and value of a variable
+    match *query*, which is a dictionary that can have:
+
+    * `name_regex`: a regular expression that is searched in names.
+    * `name_glob`: a case-insensitive glob pattern that matches names.
+    * `types`: a list of human-readable types (see
+      `get_human_readable_type`), compared case-insensitively.
+    * `min_size` and `max_size`: bounds of the number of elements (see
+      `size_sort_key`).
+    * `min_memory` and `max_memory`: bounds of the bytes of memory used
+      (see `get_memory_usage`). Variables whose memory usage can't be
+      computed don't match them.
+
+    The conditions are checked from the cheapest to the most expensive and
+    none of them displays variables. Memory usages are got with
+    *get_memory* if given (see `make_memory_getter`).
+    """
+    unknown = set(query) - set(QUERY_KEYS)
+    if unknown:
+        raise ValueError(
+            "Unknown query keys: {}".format(', '.join(sorted(unknown))))
+
+    name_matchers = []
+    if query.get('name_regex'):
+        name_matchers.append(re.compile(query['name_regex']).search)
+    if query.get('name_glob'):
+        name_matchers.append(re.compile(
+            fnmatch.translate(query['name_glob']), re.IGNORECASE).match)
+
+    types = query.get('types')
+    if types is not None:
+        types = {type_name.lower() for type_name in types}
+
+    def in_range(number, low_key, high_key):
+        low = query.get(low_key)
+        high = query.get(high_key)
+        return (
+            (low is None or number >= low)
+            and (high is None or number <= high)
+        )
+
+    check_size = (
+        query.get('min_size') is not None
+        or query.get('max_size') is not None
+    )
+    check_memory = (
+        query.get('min_memory') is not None
+        or query.get('max_memory') is not None
+    )
+
+    if get_memory is None:
+        get_memory = make_memory_getter()
+
+    def query_filter(name, value):
+        if not all(matcher(name) for matcher in name_matchers):
+            return False
+        if (
+            types is not None
+            and get_human_readable_type(value).lower() not in types
+        ):
+            return False
+        if check_size and not in_range(
+            size_sort_key(get_size(value)), 'min_size', 'max_size'
+        ):
+            return False
+        if check_memory:
+            usage = get_memory(name, value)
+            if usage is None or not in_range(
+                usage[0], 'min_memory', 'max_memory'
+            ):
+                return False
+        return True
+
+    return query_filter
+
+
+def filter_items(items, query=None, get_memory=None):
+    """
+    Return the (name, value) *items* that match *query*, if given (see
+    `make_query_filter` for *get_memory*).
+    """
+    if not query:
+        return items
+    query_filter = make_query_filter(query, get_memory=get_memory)
+    return [(name, value) for name, value in items
+            if query_filter(name, value)]
+
+
+def make_remote_snapshot(data, settings, more_excluded_names=None,
+                         cache=None, budget=None, query=None):
+    """
+    Make a remote view of dictionary *data* and the properties of its
+    variables in a single pass.
+
+    Only the variables that match *query* are displayed, if it's given (see
+    `make_query_filter`). See `make_view_entries` for *cache* and *budget*.
+    The memory usage of variables is shown if the `show_memory` setting is
+    True.
+    """
+    data = get_remote_data(data, settings, mode='editable',
+                           more_excluded_names=more_excluded_names)
+    items = filter_items(
+        list(data.items()), query,
+        get_memory=make_memory_getter(cache=cache, budget=budget)
+    )
+    return make_view_entries(
+        items, minmax=settings['minmax'], cache=cache, budget=budget,
+        memory=settings.get('show_memory', False)
+    )
+
+
+def make_remote_view(data, settings, more_excluded_names=None, cache=None,
+                     budget=None, query=None):
     """
     Make a remote view of dictionary *data*
     -> globals explorer
+
+    See `make_view_entries` for *cache* and *budget*, and
+    `make_query_filter` for *query*.
+    """
+    return make_remote_snapshot(
+        data, settings, more_excluded_names=more_excluded_names,
+        cache=cache, budget=budget, query=query
+    )[0]
+
+
+# Functions of the name and value of variables and a memory getter (see
+# `make_memory_getter`) that return the keys to sort them by
+VIEW_SORT_KEYS = {
+    'name': lambda name, value, get_memory: name.lower(),
+    'type': lambda name, value, get_memory: (
+        get_human_readable_type(value).lower()),
+    'size': lambda name, value, get_memory: size_sort_key(get_size(value)),
+    'memory': lambda name, value, get_memory: memory_sort_key(
+        get_memory(name, value)),
+}
+
+
+def make_remote_view_page(data, settings, offset=0, limit=None,
+                          sort_key='name', reverse=False, name_filter=None,
+                          type_filter=None, more_excluded_names=None,
+                          cache=None, budget=None, query=None):
+    """
+    Make a remote view of a window of dictionary *data*
+
+    Variables are filtered by *settings* and, if given, by *name_filter* and
+    *type_filter*, which are case-insensitive substrings of their names and
+    human-readable types, and by *query* (see `make_query_filter`). They
+    are then sorted by *sort_key* ('name', 'type', 'size' or 'memory') and
+    only the *limit* variables starting at *offset* are displayed.
+
+    Return a dictionary with the number of variables that passed the
+    filters under `total`, the offset of the window under `offset` and
+    its remote view, in sorted order, under `view`. See
+    `make_view_entries` for *cache* and *budget*.
     """
+    if sort_key not in VIEW_SORT_KEYS:
+        raise ValueError("Unknown sort key: {}".format(sort_key))
+
     data = get_remote_data(data, settings, mode='editable',
                            more_excluded_names=more_excluded_names)
-    remote = {}
-    for key, value in list(data.items()):
-        view = value_to_display(value, minmax=settings['minmax'])
-        remote[key] = {
-            'type':  get_human_readable_type(value),
-            'size':  get_size(value),
-            'view':  view,
-            'python_type': get_type_string(value),
-            'numpy_type': get_numpy_type_string(value)
-        }
-
-    return remote
+    items = list(data.items())
+    if name_filter:
+        name_filter = name_filter.lower()
+        items = [(name, value) for name, value in items
+                 if name_filter in name.lower()]
+    if type_filter:
+        type_filter = type_filter.lower()
+        items = [(name, value) for name, value in items
+                 if type_filter in get_human_readable_type(value).lower()]
+    get_memory = make_memory_getter(cache=cache, budget=budget)
+    items = filter_items(items, query, get_memory=get_memory)
+
+    key_func = VIEW_SORT_KEYS[sort_key]
+    keys = [(key_func(name, value, get_memory), name)
+            for name, value in items]
+    items = sort_against(items, keys, reverse=reverse)
+
+    offset = max(offset, 0)
+    if limit is None:
+        window = items[offset:]
+    else:
+        window = items[offset:offset + max(limit, 0)]
+
+    view = make_view_entries(window, minmax=settings['minmax'],
+                             cache=cache, budget=budget,
+                             memory=settings.get('show_memory', False))[0]
+    return {'total': len(items), 'offset': offset, 'view': view}
+
+
+def get_remote_view_diff(old_view, new_view):
+    """
+    Compare two remote views (or variable properties) of a namespace.
+
+    Return a dictionary with the entries of *new_view* that were added or
+    changed with respect to *old_view* under `changed`, and the names that
+    are no longer present in it under `removed`.
+    """
+    changed = {
+        name: entry for name, entry in new_view.items()
+        if name not in old_view or old_view[name] != entry
+    }
+    removed = [name for name in old_view if name not in new_view]
+    return {'changed': changed, 'removed': removed}
+
+
+#==============================================================================
+# Object attributes
+#==============================================================================
+# Kinds of attributes. Getting properties, other descriptors and dynamic
+# attributes (i.e. those computed by `__getattr__`) runs arbitrary code, so
+# only plain attributes and methods are evaluated when listing them.
+ATTRIBUTE = 'attribute'
+METHOD = 'method'
+PROPERTY = 'property'
+DESCRIPTOR = 'descriptor'
+DYNAMIC = 'dynamic'
+IMPLICIT_ATTR_KINDS = (ATTRIBUTE, METHOD)
+
+
+def get_attr_kind(obj, name):
+    """Return the kind of the attribute *name* of *obj*, without getting it."""
+    try:
+        attr = inspect.getattr_static(obj, name)
+    except AttributeError:
+        return DYNAMIC
+
+    if isinstance(attr, (property, cached_property)):
+        return PROPERTY
+    if inspect.isroutine(attr) or isinstance(attr,
+                                             (staticmethod, classmethod)):
+        return METHOD
+    if inspect.ismemberdescriptor(attr):
+        # Attributes stored in __slots__
+        return ATTRIBUTE
+    if hasattr(type(attr), '__get__'):
+        return DESCRIPTOR
+    return ATTRIBUTE
+
+
+def get_static_attr(obj, name):
+    """
+    Get an attribute of *obj* of one of the `IMPLICIT_ATTR_KINDS` without
+    running `__getattribute__` or descriptors.
+    """
+    attr = inspect.getattr_static(obj, name)
+    if inspect.ismemberdescriptor(attr):
+        return attr.__get__(obj, type(obj))
+    return attr
+
+
+def make_attr_row(obj, name, kind, get_value, budget=None):
+    """
+    Make the row of an attribute of *obj* in a remote view, getting its
+    value with *get_value*.
+
+    If *budget* is a ViewBudget, the time spent on it is measured and a
+    placeholder row is made when it's over budget.
+    """
+    status = None if budget is None else budget.check(name, obj)
+    if status is not None:
+        return {'kind': kind, 'view': PLACEHOLDER_VIEWS[status], status: True}
+
+    start = time.monotonic()
+    try:
+        row = make_view_row(get_value())
+    except Exception as error:
+        row = {'error': '{}: {}'.format(type(error).__name__, error)}
+    finally:
+        if budget is not None:
+            budget.measure(name, obj, time.monotonic() - start)
+    row['kind'] = kind
+    return row
+
+
+def make_attrs_page(obj, offset=0, limit=None, budget=None):
+    """
+    Return a window of the attributes of *obj* given by `get_object_attrs`.
+
+    Plain attributes and methods are displayed (see `make_attr_row`), but
+    other kinds of attributes only have their kind, to be evaluated on
+    demand with `make_attr_entry`.
+
+    The returned dictionary has the number of attributes under `total`, the
+    position of the first one in the window under `offset`, and the rows of
+    the attributes in the window, by name, under `attrs`.
+    """
+    names = get_object_attrs(obj)
+    offset = max(offset, 0)
+    if limit is None:
+        window = names[offset:]
+    else:
+        window = names[offset:offset + max(limit, 0)]
+
+    if budget is not None:
+        budget.start()
+
+    attrs = {}
+    for name in window:
+        kind = get_attr_kind(obj, name)
+        if kind in IMPLICIT_ATTR_KINDS:
+            attrs[name] = make_attr_row(
+                obj, name, kind, partial(get_static_attr, obj, name),
+                budget=budget)
+        else:
+            attrs[name] = {'kind': kind}
+    return {'total': len(names), 'offset': offset, 'attrs': attrs}
+
+
+def make_attr_entry(obj, name, budget=None):
+    """
+    Evaluate the attribute *name* of *obj*, of any kind, and make its row.
+
+    Attributes that were over budget `MAX_TIME_OVERRUNS` times are not
+    evaluated again (see `ViewBudget`).
+    """
+    kind = get_attr_kind(obj, name)
+    if budget is None:
+        return make_attr_row(obj, name, kind, partial(getattr, obj, name))
+    with budget.complete_pass():
+        return make_attr_row(obj, name, kind, partial(getattr, obj, name),
+                             budget=budget)
+
+
+#==============================================================================
+# Partial updates
+#==============================================================================
+def to_index_key(key):
+    """
+    Convert a key of an index path received as JSON to a Python key, i.e.
+    lists to tuples.
+    """
+    if isinstance(key, list):
+        return tuple(to_index_key(k) for k in key)
+    return key
+
+
+def set_item_at_path(value, path, item, positional=False):
+    """
+    Set *item* in place at the end of an index *path* of *value*.
+
+    *path* is a list of keys that are applied one after the other, e.g. the
+    keys of nested dicts or the indexes of nested lists. The last one can
+    also be a [row, column] pair to set an element of an array or a
+    dataframe. Pandas objects are indexed by label, or by integer position
+    if *positional* is True.
+
+    Return the objects that contain the modified element, from *value* to
+    the innermost one.
+    """
+    if not path:
+        raise ValueError("The index path can't be empty")
+
+    keys = [to_index_key(key) for key in path]
+    containers = [value]
+    for key in keys[:-1]:
+        # Pandas objects are not indexed here because, with Copy-on-Write,
+        # modifying their parts doesn't modify them.
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            raise TypeError(
+                "Only the last key of an index path can index a Pandas "
+                "object")
+        value = value[key]
+        containers.append(value)
+
+    key = keys[-1]
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        indexer = value.iloc if positional else value.loc
+        indexer[key] = item
+    else:
+        value[key] = item
+    return containers
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright (c) 2009- Spyder Kernels Contributors
+#
+# Licensed under the terms of the MIT License
+# (see spyder_kernels/__init__.py for details)
+# -----------------------------------------------------------------------------
+
+"""
+Tests for arraystats.py
+"""
+
+import json
+import threading
+import warnings
+
+import numpy as np
+import pandas as pd
+import polars as pl
+import pytest
+
+from spyder_kernels.utils import arraystats, nsview
+from spyder_kernels.utils.arraystats import (
+    ArrayStats,
+    as_real_array,
+    chunked_minmax,
+    chunked_stats,
+    iter_chunks,
+    sampled_minmax,
+)
+from spyder_kernels.utils.nsview import value_to_display
+
+
+ARRAY = np.arange(2 * 30 * 40, dtype=float).reshape(2, 30, 40) - 100
+
+
+@pytest.mark.parametrize("value", [
+    ARRAY,
+    np.asfortranarray(ARRAY),
+    ARRAY[:, ::3, 1:],
+    ARRAY[::-1, :, ::7],
+    ARRAY.astype(int),
+    ARRAY > 50,
+    ARRAY + 1j,
+    np.array(5.),
+])
+def test_chunked_minmax(value):
+    """Test that min and max are exact for any memory layout."""
+    minimum, maximum = chunked_minmax(value, chunk_size=64)
+    assert minimum == value.min()
+    assert maximum == value.max()
+
+    # Chunks cover all elements without copying them
+    chunks = list(iter_chunks(value, chunk_size=64))
+    assert sum(chunk.size for chunk in chunks) == value.size
+    assert all(chunk.size <= 64 for chunk in chunks)
+    assert all(np.shares_memory(chunk, value) for chunk in chunks)
+
+
+def test_chunked_minmax_nan():
+    """Test that NaNs are ignored unless all elements are NaN."""
+    value = ARRAY.copy()
+    value[0, 0, 0] = np.nan
+    value[1, 29, 39] = np.nan
+    assert chunked_minmax(value, chunk_size=64) == (-99., 2298.)
+    assert np.isnan(chunked_minmax(np.full(10, np.nan))).all()
+
+    with pytest.raises(ValueError):
+        chunked_minmax(np.array([]))
+
+
+def test_sampled_minmax():
+    """Test that sampled estimates are within the exact range."""
+    value = np.random.default_rng(1).normal(size=10_000)
+    minimum, maximum = sampled_minmax(value, sample_size=100)
+    assert value.min() <= minimum <= maximum <= value.max()
+    assert sampled_minmax(value, sample_size=100) == (minimum, maximum)
+
+
+def test_array_stats(monkeypatch):
+    """Test that estimated results are completed in the background."""
+    monkeypatch.setattr(arraystats, 'EXACT_MINMAX_THRESHOLD', 1000)
+    monkeypatch.setattr(arraystats, 'SAMPLE_SIZE', 10)
+
+    updated = threading.Event()
+    stats = ArrayStats()
+    stats.on_update = updated.set
+
+    # Small arrays are exact
+    small = np.arange(1000.)
+    assert stats.get_minmax(small) == (0, 999, True)
+
+    # Big ones are estimated first
+    big = np.arange(10_000.)
+    minimum, maximum, exact = stats.get_minmax(big)
+    assert not exact
+    stats.wait()
+    assert updated.wait(10)
+    assert stats.get_minmax(big) == (0, 9999, True)
+
+    # Results are discarded in new generations
+    big[0] = -1
+    assert stats.get_minmax(big) == (0, 9999, True)
+    stats.new_generation()
+    assert not stats.get_minmax(big)[2]
+    stats.wait()
+    assert stats.get_minmax(big) == (-1, 9999, True)
+
+
+def test_array_stats_display(monkeypatch):
+    """Test the display of arrays with min and max."""
+    monkeypatch.setattr(arraystats, 'EXACT_MINMAX_THRESHOLD', 1000)
+    monkeypatch.setattr(arraystats, 'SAMPLE_SIZE', 10)
+    monkeypatch.setattr(nsview, 'array_stats', ArrayStats())
+
+    value = np.arange(10_000.)
+    value[5] = np.nan
+    assert value_to_display(value[:1000], minmax=True) == (
+        'Min: %r\nMax: %r' % (value[0], value[999]))
+    assert value_to_display(value, minmax=True).startswith('Min (sampled)')
+
+
+@pytest.mark.parametrize("value", [
+    ARRAY,
+    ARRAY[:, ::3, 1:].astype(np.int32),
+    ARRAY > 50,
+    np.array([5.]),
+])
+def test_chunked_stats(value):
+    """Test that statistics match Pandas and Numpy."""
+    stats = chunked_stats(value, bins=7, chunk_size=64)
+    expected = pd.Series(value.ravel().astype(float)).describe()
+    for key in ['count', 'min', '25%', '50%', '75%', 'max']:
+        assert stats[key] == pytest.approx(expected[key])
+    assert stats['mean'] == pytest.approx(expected['mean'])
+    if value.size > 1:
+        assert stats['std'] == pytest.approx(expected['std'])
+    assert stats['exact']
+
+    counts, edges = np.histogram(value.astype(float), bins=7)
+    assert stats['histogram']['counts'] == counts.tolist()
+    assert stats['histogram']['edges'] == pytest.approx(edges.tolist())
+
+
+def test_chunked_stats_nan():
+    """Test the NaN policies of statistics."""
+    value = ARRAY.copy()
+    value[0, 0, :] = np.nan
+    stats = chunked_stats(value, chunk_size=64)
+    assert stats['nans'] == 40
+    assert stats['count'] == value.size - 40
+    assert stats['mean'] == pytest.approx(np.nanmean(value))
+    assert sum(stats['histogram']['counts']) == value.size - 40
+
+    stats = chunked_stats(value, nan_policy='propagate')
+    assert stats['mean'] is None
+    assert stats['histogram'] is None
+
+    with pytest.raises(ValueError):
+        chunked_stats(value, nan_policy='raise')
+
+    stats = chunked_stats(np.full(3, np.nan))
+    assert stats['count'] == 0
+    assert stats['min'] is None
+    assert stats['histogram'] is None
+
+    # Missing statistics are None, so they can be sent as JSON
+    assert chunked_stats(np.array([1.]))['std'] is None
+
+
+@pytest.mark.parametrize("value", [
+    np.array([1., np.inf]),
+    np.array([1., 2., -np.inf, np.inf, np.nan]),
+    np.array([np.inf, -np.inf]),
+])
+def test_chunked_stats_inf(value):
+    """Test that infinities are left out of statistics and counted."""
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        stats = chunked_stats(value, bins=2)
+    finite = value[np.isfinite(value)]
+    assert stats['infs'] == np.isinf(value).sum()
+    assert stats['count'] == finite.size
+    if finite.size:
+        assert stats['mean'] == pytest.approx(finite.mean())
+        assert stats['50%'] == pytest.approx(np.median(finite))
+        assert sum(stats['histogram']['counts']) == finite.size
+    else:
+        assert stats['mean'] is None
+    assert json.loads(json.dumps(stats, allow_nan=False)) == stats
+
+
+def test_array_stats_get_stats():
+    """Test that statistics are cached by the memory of arrays."""
+    series = pd.Series(np.arange(100.))
+    stats = ArrayStats()
+    result = stats.get_stats(series)
+    assert stats.get_stats(series) is result
+    assert stats.get_stats(series.to_numpy()) is result
+    stats.new_generation()
+    assert stats.get_stats(series) is not result
+
+    # Other types
+    nullable = pd.Series([1, None, 3], dtype='Int64')
+    assert stats.get_stats(nullable)['nans'] == 1
+    assert stats.get_stats(pl.Series([1, 2]))['max'] == 2
+
+    # Copies are not cached, because other ones can reuse their memory
+    for __ in range(10):
+        first = pd.Series(np.arange(100), dtype='Int64')
+        second = pd.Series(np.arange(100) + 1, dtype='Int64')
+        assert stats.get_stats(first)['max'] == 99
+        assert stats.get_stats(second)['max'] == 100
+    with pytest.raises(TypeError):
+        as_real_array(pd.Series(['a']))
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright (c) 2009- Spyder Kernels Contributors
+#
+# Licensed under the terms of the MIT License
+# (see spyder_kernels/__init__.py for details)
+# -----------------------------------------------------------------------------
+
+"""
+Tests for datawindow.py
+"""
+
+import numpy as np
+import pandas as pd
+import polars as pl
+import pytest
+
+from spyder_kernels.utils import datawindow
+from spyder_kernels.utils.datawindow import (
+    RowOrderCache,
+    decode_window,
+    encode_window,
+    get_window,
+)
+
+
+DF = pd.DataFrame({
+    'a': [3, 1, 2, np.nan, 5],
+    'b': list('vwxyz'),
+    'c': np.arange(5) * 10,
+}, index=list('ABCDE'))
+
+
+def test_pandas_window():
+    """Test windows of Pandas objects."""
+    window, info = get_window(DF, rows=[1, 3], columns=[0, 2])
+    pd.testing.assert_frame_equal(window, DF.iloc[1:3, :2])
+    assert info == {
+        'shape': [5, 3],
+        'rows': 5,
+        'row_range': [1, 3],
+        'column_range': [0, 2],
+        'dtypes': ['float64', str(DF['b'].dtype)],
+    }
+
+    # Sorted and filtered
+    window, info = get_window(DF, rows=[0, 10], sort_key='a',
+                              ascending=False, filter_expr='c > 0')
+    assert list(window.index) == ['E', 'C', 'B', 'D']
+    assert info['rows'] == 4
+    assert info['row_range'] == [0, 4]
+
+    # Series and indexes
+    window, __ = get_window(DF['a'], rows=[0, 2], sort_key=0)
+    assert list(window.index) == ['B', 'C']
+    window, __ = get_window(DF.index, filter_expr="x > 'B'")
+    assert list(window) == ['C', 'D', 'E']
+
+
+def test_array_window():
+    """Test windows of Numpy arrays."""
+    value = np.arange(20).reshape(5, 4)[::-1]
+    window, info = get_window(value, rows=[1, 3], columns=[1, 10])
+    np.testing.assert_array_equal(window, value[1:3, 1:])
+    assert info['column_range'] == [1, 4]
+    assert info['dtypes'] == [str(value.dtype)]
+
+    window, info = get_window(value, sort_key=2, filter_expr='x[:, 0] < 12')
+    np.testing.assert_array_equal(window, value[[4, 3, 2]])
+
+    with pytest.raises(ValueError):
+        get_window(value, filter_expr='x')
+    with pytest.raises(TypeError):
+        get_window(np.array(1))
+
+
+def test_polars_window():
+    """Test windows of Polars objects."""
+    df = pl.from_pandas(DF)
+    window, info = get_window(df, rows=[0, 2], columns=[0, 2], sort_key='c',
+                              ascending=False, filter_expr='a < 4')
+    assert window.to_dict(as_series=False) == {
+        'a': [2.0, 1.0], 'b': ['x', 'w']}
+    assert info['rows'] == 3
+    assert info['dtypes'] == ['Float64', 'String']
+
+    window, __ = get_window(df['a'], sort_key=0)
+    assert window.to_list()[:2] == [1.0, 2.0]
+
+
+def test_row_order_cache(monkeypatch):
+    """Test that row orders are cached per generation."""
+    calls = []
+    get_row_order = datawindow.get_row_order
+    monkeypatch.setattr(datawindow, 'get_row_order',
+                        lambda *args, **kwargs: calls.append(args) or
+                        get_row_order(*args, **kwargs))
+
+    cache = RowOrderCache()
+    value = DF.copy()
+    for start in range(3):
+        get_window(value, rows=[start, start + 1], sort_key='a',
+                   cache=cache, generation=0)
+    assert len(calls) == 1
+
+    get_window(value, sort_key='a', cache=cache, generation=1)
+    assert len(calls) == 2
+
+    calls.clear()
+    del value
+    assert len(cache) == 0
+
+
+def test_encode_window():
+    """Test that windows are encoded with their info."""
+    window, info = get_window(DF, rows=[0, 2])
+    decoded, decoded_info = decode_window(encode_window(window, info))
+    pd.testing.assert_frame_equal(decoded, window)
+    assert decoded_info == info
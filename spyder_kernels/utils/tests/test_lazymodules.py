@@ -8,6 +8,7 @@
 
 import pytest
 
+from spyder_kernels.utils import lazymodules
 from spyder_kernels.utils.lazymodules import LazyModule, FakeObject
 
 
@@ -38,3 +39,28 @@ def test_existing_modules():
     # The lazy module should have these extra attributes
     assert np.__spy_mod__
     assert np.__spy_modname__
+
+
+def test_resolved_once(monkeypatch):
+    """Test that modules and attributes are only looked up once."""
+    calls = []
+
+    def is_module_installed(module_name):
+        calls.append(module_name)
+        return module_name == 'numpy'
+
+    monkeypatch.setattr(lazymodules, 'is_module_installed',
+                        is_module_installed)
+    np = LazyModule('numpy')
+    missing = LazyModule('no_module')
+    import numpy
+
+    for __ in range(3):
+        assert np.ndarray is numpy.ndarray
+        assert np.float64 is numpy.float64
+        assert missing.foo is FakeObject
+    assert calls == ['numpy', 'no_module']
+
+    # Attributes are bound to the lazy module
+    assert vars(np)['ndarray'] is numpy.ndarray
+    assert vars(missing)['foo'] is FakeObject
@@ -13,8 +13,10 @@ Tests for utils.py
 # Standard library imports
 from collections import defaultdict
 import datetime
+import gc
 import pathlib
 import sys
+import time
 
 # Third party imports
 import numpy as np
@@ -24,15 +26,31 @@ import xarray as xr
 import PIL.Image
 
 # Local imports
+from spyder_kernels.utils import nsview
 from spyder_kernels.utils.nsview import (
+    DisplayCache,
+    REMOTE_SETTINGS,
+    TypeHandler,
+    ViewBudget,
     get_human_readable_type,
+    get_memory_usage,
+    get_object_attrs,
     get_numpy_type_string,
+    get_remote_view_diff,
     get_size,
     get_supported_types,
     get_type_string,
     is_editable_type,
     is_supported,
+    make_attr_entry,
+    make_attrs_page,
+    make_remote_view,
+    make_remote_view_page,
+    register_fingerprint,
+    register_type_handler,
+    set_item_at_path,
     sort_against,
+    unregister_type_handler,
     value_to_display,
 )
 
@@ -49,6 +67,8 @@ def generate_complex_object():
 COMPLEX_OBJECT = generate_complex_object()
 DF = pd.DataFrame([1,2,3])
 DATASET = xr.Dataset({0: pd.DataFrame([1,2]), 1:pd.DataFrame([3,4])})
+SETTINGS = {key: False for key in REMOTE_SETTINGS}
+SETTINGS['excluded_names'] = []
 
 
 # --- Tests
@@ -147,6 +167,27 @@ def test_default_display():
             'Dataset object of xarray.core.dataset module')
 
 
+def test_array_display_printoptions():
+    """Test that arrays are displayed without changing the print options."""
+    value = np.arange(100) / 3
+    with np.printoptions(precision=2, edgeitems=2):
+        printoptions = np.get_printoptions()
+        display = value_to_display(value)
+        assert np.get_printoptions() == printoptions
+
+    # Arrays are summarized with the user's options
+    assert display == '[ 0.    0.33 ... 32.67 33.  ]'
+
+    # Also subclasses that have their own conversion to string
+    class MyArray(np.ndarray):
+        def __str__(self):
+            return 'My ' + super().__str__()
+
+    assert value_to_display(np.arange(20).view(MyArray)) == (
+        'My [ 0  1  2 ... 17 18 19]')
+    assert value_to_display(np.array(3.5)) == '3.5'
+
+
 @pytest.mark.skipif(
     sys.platform == 'darwin' and sys.version_info[:2] == (3, 8),
     reason="Fails on Mac with Python 3.8")
@@ -237,6 +278,36 @@ def test_dict_display():
     assert is_supported(di, filters=supported_types)
 
 
+def test_is_supported_check_all(monkeypatch):
+    """Test that all elements are checked on a cached sample."""
+    monkeypatch.setattr(nsview, 'SUPPORT_CACHE', nsview.OrderedDict())
+    supported_types = tuple(get_supported_types()['editable'])
+
+    li = [object()] * 1000
+    li[500] = 1
+    assert is_supported(li, check_all=True, filters=supported_types,
+                        iterate=True)
+
+    # Verdicts are reused until the length changes
+    li[500] = object()
+    assert is_supported(li, check_all=True, filters=supported_types,
+                        iterate=True)
+    li.append(object())
+    assert not is_supported(li, check_all=True, filters=supported_types,
+                            iterate=True)
+
+    # The cost doesn't depend on the size of containers
+    checked = []
+    is_editable = nsview.is_editable_type
+    monkeypatch.setattr(nsview, 'is_editable_type',
+                        lambda value: checked.append(value) or
+                        is_editable(value))
+    di = dict.fromkeys(range(100_000), 1.)
+    assert is_supported(di, check_all=True, filters=supported_types,
+                        iterate=True)
+    assert len(checked) <= 2 * nsview.SUPPORT_SAMPLE_SIZE + 1
+
+
 def test_set_display():
     """Tests for display of sets."""
     long_set = {i for i in range(100)}
@@ -500,5 +571,431 @@ def test_polars_series():
     assert get_human_readable_type(s) == 'Polars Series'
 
 
+def test_get_remote_view_diff():
+    """Test the diff between two remote views."""
+    old_view = {'a': {'view': '1'}, 'b': {'view': '2'}, 'c': {'view': '3'}}
+    new_view = {'a': {'view': '1'}, 'c': {'view': '4'}, 'd': {'view': '5'}}
+    diff = get_remote_view_diff(old_view, new_view)
+    assert diff == {
+        'changed': {'c': {'view': '4'}, 'd': {'view': '5'}},
+        'removed': ['b'],
+    }
+
+    # Identical views have no diff
+    assert get_remote_view_diff(new_view, new_view) == {
+        'changed': {}, 'removed': []
+    }
+
+
+def test_make_remote_view_page():
+    """Test that only the requested window of a view is displayed."""
+    displayed = []
+
+    class Item:
+        def __init__(self, size):
+            self.size_ = size
+
+        def __len__(self):
+            displayed.append(self)
+            return self.size_
+
+    data = {'var{:02}'.format(i): Item(i) for i in range(30)}
+    page = make_remote_view_page(data, SETTINGS, offset=10, limit=5)
+    assert page['total'] == 30
+    assert page['offset'] == 10
+    assert list(page['view']) == ['var{}'.format(i) for i in range(10, 15)]
+    assert len(displayed) == 5
+
+    page = make_remote_view_page(data, SETTINGS, limit=3, sort_key='size',
+                                 reverse=True)
+    assert list(page['view']) == ['var29', 'var28', 'var27']
+
+    page = make_remote_view_page(data, SETTINGS, name_filter='VAR1')
+    assert page['total'] == 10
+
+    page = make_remote_view_page(data, SETTINGS, type_filter='int')
+    assert page['total'] == 0
+    assert page['view'] == {}
+
+    with pytest.raises(ValueError):
+        make_remote_view_page(data, SETTINGS, sort_key='value')
+
+
+def test_remote_view_query(monkeypatch):
+    """Test that only the variables that match a query are displayed."""
+    displayed = []
+    monkeypatch.setattr(
+        nsview, 'value_to_display',
+        lambda value, minmax=False: displayed.append(value) or '')
+
+    data = {
+        'small_list': [1, 2],
+        'big_list': list(range(100)),
+        'Big_Array': np.zeros(1000),
+        'text': 'a' * 10,
+    }
+    view = make_remote_view(data, SETTINGS, query={'name_glob': 'big_*'})
+    assert sorted(view) == ['Big_Array', 'big_list']
+    assert len(displayed) == 2
+
+    view = make_remote_view(
+        data, SETTINGS, query={'name_regex': '^[a-z]+_', 'types': ['List']})
+    assert sorted(view) == ['big_list', 'small_list']
+
+    view = make_remote_view(data, SETTINGS, query={'min_size': 10,
+                                                   'max_size': 100})
+    assert sorted(view) == ['big_list', 'text']
+
+    view = make_remote_view(data, SETTINGS, query={'min_memory': 8000})
+    assert list(view) == ['Big_Array']
+
+    page = make_remote_view_page(data, SETTINGS, query={'types': ['str']})
+    assert page['total'] == 1
+
+    with pytest.raises(ValueError):
+        make_remote_view(data, SETTINGS, query={'size': 1})
+
+
+def test_view_budget():
+    """Test that variables over the time budget get placeholder rows."""
+    class Slow:
+        def __len__(self):
+            time.sleep(0.02)
+            return 1
+
+    # The whole view is over budget after displaying a slow variable
+    budget = ViewBudget(var_budget=None, view_budget=0.01)
+    view = make_remote_view({'a': Slow(), 'b': 2}, SETTINGS, budget=budget)
+    assert view['a']['size'] == 1
+    assert view['b']['deferred']
+    assert budget.deferred
+
+    with budget.complete_pass():
+        view = make_remote_view({'a': Slow(), 'b': 2}, SETTINGS,
+                                budget=budget)
+    assert view['b']['view'] == '2'
+
+    # Variables are skipped after exceeding their own budget too many times
+    budget = ViewBudget(var_budget=0.01, view_budget=None)
+    data = {'a': Slow()}
+    with budget.complete_pass():
+        for __ in range(3):
+            view = make_remote_view(data, SETTINGS, budget=budget)
+            assert view['a']['size'] == 1
+        view = make_remote_view(data, SETTINGS, budget=budget)
+    assert view['a']['skipped']
+    assert not budget.deferred
+
+    # But they're displayed again when they get a new value
+    data['a'] = Slow()
+    view = make_remote_view(data, SETTINGS, budget=budget)
+    assert view['a']['size'] == 1
+
+
+class NamedThing:
+    """Class whose handler is registered by name."""
+
+
+def test_type_handlers():
+    """Test registering handlers for custom types."""
+    class Base:
+        def __len__(self):
+            return 3
+
+    class Child(Base):
+        pass
+
+    register_type_handler(Base, TypeHandler(
+        display=lambda value, level=0, minmax=False: 'Base display',
+        type_string='mod.Base',
+        editable=True,
+    ))
+    register_type_handler(Child, TypeHandler(size=lambda value: (1, 2)))
+    register_type_handler(__name__ + '.NamedThing', TypeHandler(
+        readable_type='Named thing'))
+    try:
+        # Options are taken from the handlers of the base classes
+        child = Child()
+        assert value_to_display(child) == 'Base display'
+        assert get_size(child) == (1, 2)
+        assert get_type_string(child) == 'mod.Base'
+        assert get_human_readable_type(child) == 'Base'
+        assert is_editable_type(child)
+        assert get_size(Base()) == 3
+
+        # Classes can be registered by name
+        assert get_human_readable_type(NamedThing()) == 'Named thing'
+    finally:
+        for cls in [Base, Child, NamedThing]:
+            unregister_type_handler(cls)
+
+    assert value_to_display(Child()) == 'Child object of {} module'.format(
+        __name__)
+    assert get_human_readable_type(NamedThing()) != 'Named thing'
+
+
+def test_type_handlers_cost():
+    """Test that expensive variables are deferred first."""
+    class Expensive:
+        pass
+
+    class Slow:
+        def __len__(self):
+            time.sleep(0.02)
+            return 1
+
+    register_type_handler(Expensive, TypeHandler(cost=100))
+    try:
+        budget = ViewBudget(var_budget=None, view_budget=0.01)
+        view = make_remote_view(
+            {'a': Expensive(), 'b': Slow()}, SETTINGS, budget=budget)
+    finally:
+        unregister_type_handler(Expensive)
+
+    # The view keeps the namespace order
+    assert list(view) == ['a', 'b']
+    assert view['a']['deferred']
+    assert 'deferred' not in view['b']
+
+
+def test_display_cache():
+    """Test that the display cache reuses the rows of unchanged objects."""
+    cache = DisplayCache()
+    arr = np.arange(1000.)
+    view = make_remote_view({'arr': arr, 'x': 1}, SETTINGS, cache=cache)
+    assert view == make_remote_view({'arr': arr, 'x': 1}, SETTINGS)
+
+    # Only arrays are cached
+    assert len(cache) == 1
+
+    # Changing an element that's not displayed doesn't change the view
+    arr[500] = -1
+    assert make_remote_view({'arr': arr}, SETTINGS, cache=cache) == {
+        'arr': view['arr']
+    }
+
+    # But changing a displayed element does
+    arr[0] = -1
+    new_view = make_remote_view({'arr': arr}, SETTINGS, cache=cache)
+    assert new_view['arr']['view'].startswith('[ -1.')
+
+    # Rows are removed when their objects are garbage collected
+    del arr
+    gc.collect()
+    assert len(cache) == 0
+
+
+def test_display_cache_fingerprint():
+    """Test that registered fingerprints are used by the display cache."""
+    class Versioned:
+        def __init__(self):
+            self.version = 0
+            self.displays = 0
+
+        def __len__(self):
+            self.displays += 1
+            return self.version
+
+    register_fingerprint(Versioned, lambda value: value.version)
+    try:
+        cache = DisplayCache()
+        obj = Versioned()
+        for __ in range(3):
+            view = make_remote_view({'obj': obj}, SETTINGS, cache=cache)
+        assert obj.displays == 1
+        assert view['obj']['size'] == 0
+
+        obj.version = 1
+        view = make_remote_view({'obj': obj}, SETTINGS, cache=cache)
+        assert obj.displays == 2
+        assert view['obj']['size'] == 1
+    finally:
+        unregister_type_handler(Versioned)
+
+
+def test_memory_usage(monkeypatch):
+    """Test the memory usage of variables."""
+    # Arrays count their buffer once
+    value = np.zeros(1000)
+    size, buffers = get_memory_usage(value)
+    assert size >= value.nbytes
+    assert buffers == {id(value): value.nbytes}
+    assert get_memory_usage(value[::2])[1] == buffers
+    assert get_memory_usage([value, value[1:], value.T])[0] < 2 * value.nbytes
+
+    # Containers are walked
+    strings = [str(i) * 1000 for i in range(10)]
+    assert get_memory_usage(strings)[0] > 10 * 1000
+    assert get_memory_usage({'a': strings})[0] > 10 * 1000
+
+    # Pandas objects include their elements
+    df = pd.DataFrame({'a': strings})
+    assert get_memory_usage(df)[0] > 10 * 1000
+
+    # Big containers are extrapolated
+    monkeypatch.setattr(nsview, 'MAX_MEMORY_OBJECTS', 11)
+    assert get_memory_usage(strings * 10)[0] > 100 * 1000
+
+
+def test_remote_view_memory():
+    """Test the memory column of remote views."""
+    settings = dict(SETTINGS, show_memory=True)
+    big = np.zeros(100_000)
+    data = {'a': big, 'b': big[::2], 'c': [1, 2], 'd': 'x' * 10_000}
+
+    # Shared buffers are counted once
+    cache = DisplayCache()
+    for __ in range(2):
+        view = make_remote_view(data, settings, cache=cache)
+        assert view['a']['memory'] >= big.nbytes
+        assert view['b']['memory'] < 1000
+        assert view['d']['memory'] > 10_000
+
+    # The view can be sorted by memory, which is computed for each variable
+    page = make_remote_view_page(data, settings, sort_key='memory',
+                                 reverse=True)
+    assert list(page['view'])[2:] == ['d', 'c']
+
+    # The column is optional
+    assert 'memory' not in make_remote_view(data, SETTINGS)['a']
+
+
+def test_remote_view_memory_cache(monkeypatch):
+    """
+    Test that the memory usages to sort and filter views are cached and
+    count against their time budget.
+    """
+    calls = []
+
+    def get_memory_usage(value):
+        calls.append(value)
+        return nsview_get_memory_usage(value)
+
+    nsview_get_memory_usage = nsview.get_memory_usage
+    monkeypatch.setattr(nsview, 'get_memory_usage', get_memory_usage)
+
+    settings = dict(SETTINGS, show_memory=True)
+    df = pd.DataFrame({'a': ['x' * 100] * 100})
+    data = {'df': df, 'b': 1}
+    cache = DisplayCache()
+    for __ in range(2):
+        page = make_remote_view_page(
+            data, settings, sort_key='memory', reverse=True, cache=cache,
+            query={'min_memory': 1000})
+        assert list(page['view']) == ['df']
+        assert page['view']['df']['memory'] > 10_000
+    assert len([value for value in calls if value is df]) == 1
+
+    # Variables whose memory usage takes too long stop being walked
+    class Slow:
+        pass
+
+    def slow_memory(value):
+        time.sleep(0.02)
+        return 10_000
+
+    register_type_handler(Slow, TypeHandler(memory=slow_memory))
+    try:
+        budget = ViewBudget(var_budget=0.01, view_budget=None)
+        data = {'slow': Slow(), 'b': 1}
+        with budget.complete_pass():
+            for __ in range(3):
+                page = make_remote_view_page(
+                    data, SETTINGS, sort_key='memory', reverse=True,
+                    budget=budget)
+                assert list(page['view']) == ['slow', 'b']
+            page = make_remote_view_page(
+                data, SETTINGS, sort_key='memory', reverse=True,
+                budget=budget)
+        assert list(page['view']) == ['b', 'slow']
+        assert 'skipped' not in page['view']['slow']
+        page = make_remote_view_page(
+            data, settings, sort_key='memory', budget=budget,
+            query={'min_memory': 1000})
+        assert page['total'] == 0
+    finally:
+        unregister_type_handler(Slow)
+
+
+def test_attrs_page():
+    """Test that only plain attributes and methods are listed with values."""
+    calls = []
+
+    class Slotted:
+        __slots__ = ['slot']
+
+    class Inspected(Slotted):
+        __slots__ = ['__dict__']
+        plain = 1
+
+        @property
+        def prop(self):
+            calls.append('prop')
+            return 2
+
+        def method(self):
+            pass
+
+        def __getattr__(self, name):
+            calls.append(name)
+            if name == 'dynamic':
+                return 3
+            raise AttributeError(name)
+
+        def __dir__(self):
+            return list(super().__dir__()) + ['dynamic']
+
+    obj = Inspected()
+    obj.slot = [1, 2]
+    obj.instance = 'text'
+    page = make_attrs_page(obj)
+    attrs = page['attrs']
+    assert page['total'] == len(attrs)
+    assert attrs['plain']['kind'] == 'attribute'
+    assert attrs['plain']['view'] == '1'
+    assert attrs['slot']['size'] == 2
+    assert attrs['instance']['type'] == 'str'
+    assert attrs['method']['kind'] == 'method'
+    assert attrs['prop'] == {'kind': 'property'}
+    assert attrs['dynamic'] == {'kind': 'dynamic'}
+    assert calls == []
+
+    page = make_attrs_page(obj, offset=1, limit=2)
+    assert list(page['attrs']) == get_object_attrs(obj)[1:3]
+
+    # Attributes of any kind are evaluated on demand
+    assert make_attr_entry(obj, 'prop')['view'] == '2'
+    assert make_attr_entry(obj, 'dynamic')['view'] == '3'
+    assert calls == ['prop', 'dynamic']
+    assert 'AttributeError' in make_attr_entry(obj, 'missing')['error']
+
+
+def test_attrs_budget():
+    """Test that slow attributes are skipped after exceeding their budget."""
+    budget = ViewBudget(var_budget=0)
+    obj = datetime.date(2024, 1, 1)
+    for __ in range(nsview.MAX_TIME_OVERRUNS):
+        assert 'view' in make_attr_entry(obj, 'year', budget=budget)
+    assert make_attr_entry(obj, 'year', budget=budget)['skipped']
+    assert make_attr_entry(obj, 'month', budget=budget)['view'] == '1'
+
+
+def test_set_item_at_path():
+    """Test setting elements in place at the end of index paths."""
+    value = {'a': [0, np.zeros((2, 3))], ('b', 1): pd.Series([1, 2])}
+    containers = set_item_at_path(value, ['a', 1, [1, 2]], 4)
+    assert value['a'][1][1, 2] == 4
+    assert [id(c) for c in containers] == [
+        id(value), id(value['a']), id(value['a'][1])]
+
+    set_item_at_path(value, [['b', 1], 1], 5, positional=True)
+    assert value[('b', 1)].tolist() == [1, 5]
+
+    with pytest.raises(TypeError):
+        set_item_at_path(value, [['b', 1], 0, 0], 1)
+    with pytest.raises(ValueError):
+        set_item_at_path(value, [], 1)
+
+
 if __name__ == "__main__":
     pytest.main()
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright (c) 2009- Spyder Kernels Contributors
+#
+# Licensed under the terms of the MIT License
+# (see spyder_kernels/__init__.py for details)
+# -----------------------------------------------------------------------------
+
+"""
+Tests for transfer.py
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from spyder_kernels.comms.commbase import BufferedValue
+from spyder_kernels.utils import transfer
+from spyder_kernels.utils.transfer import decode_value, encode_value
+
+
+ARRAY = np.arange(2 * 3 * 4, dtype=float).reshape(2, 3, 4)
+
+
+@pytest.mark.parametrize("value", [
+    ARRAY,
+    np.asfortranarray(ARRAY),
+    ARRAY[:, ::2, 1:],
+    ARRAY.astype('>i2'),
+    ARRAY > 5,
+    np.array(['2020-01-01', '2021-06-30'], dtype='datetime64[D]'),
+    np.array(['a', 'bcd']),
+    np.array(5.),
+    np.zeros((0, 3)),
+])
+def test_array_roundtrip(value):
+    """Test that arrays are sent with their raw buffer."""
+    encoded = encode_value(value)
+    assert encoded.value['format'] == 'ndarray'
+    assert len(encoded.buffers) == 1
+
+    # Contiguous arrays are not copied
+    data = np.frombuffer(encoded.buffers[0], dtype=np.uint8)
+    contiguous = value.flags.c_contiguous or value.flags.f_contiguous
+    if contiguous and value.size:
+        assert np.shares_memory(data, value)
+
+    # Received buffers are bytes
+    received = BufferedValue(
+        encoded.value, [bytes(buf) for buf in encoded.buffers])
+    decoded = decode_value(received)
+    assert decoded.dtype == value.dtype
+    assert decoded.shape == value.shape
+    assert decoded.flags.writeable
+    np.testing.assert_array_equal(decoded, value)
+
+
+@pytest.mark.parametrize("value", [
+    np.array([1, 'a'], dtype=object),
+    np.ma.masked_array([1, 2], mask=[0, 1]),
+    {'a': ARRAY},
+    [1, 2],
+])
+def test_pickle_roundtrip(value):
+    """Test that other values are pickled."""
+    encoded = encode_value(value)
+    assert encoded.value['format'] == 'pickle'
+    decoded = decode_value(encoded)
+    assert type(decoded) is type(value)
+
+
+def test_pickle_out_of_band():
+    """Test that buffers inside objects are sent out-of-band."""
+    arrays = [np.arange(1000.), np.ones((10, 10))]
+    value = {'arrays': arrays, 'df': pd.DataFrame({'a': np.arange(100)})}
+    encoded = encode_value(value)
+    assert len(encoded.buffers) > 2
+    assert all(
+        any(np.shares_memory(np.frombuffer(buf, dtype=np.uint8), array)
+            for buf in encoded.buffers[1:])
+        for array in arrays
+    )
+
+    # Received buffers are bytes
+    received = BufferedValue(
+        encoded.value, [bytes(buf) for buf in encoded.buffers])
+    decoded = decode_value(received)
+    for array, decoded_array in zip(arrays, decoded['arrays']):
+        np.testing.assert_array_equal(decoded_array, array)
+        assert decoded_array.flags.writeable
+    pd.testing.assert_frame_equal(decoded['df'], value['df'])
+
+
+@pytest.mark.parametrize("kind", [
+    'pandas.DataFrame', 'pandas.Series', 'polars.DataFrame', 'polars.Series'
+])
+def test_arrow_roundtrip(monkeypatch, kind):
+    """Test that dataframes and series are sent in record batches."""
+    import polars as pl
+    monkeypatch.setattr(transfer, 'ARROW_BATCH_ROWS', 40)
+
+    df = pd.DataFrame({
+        'a': np.arange(100.),
+        'b': [str(i) for i in range(100)],
+    }, index=np.arange(100) * 2)
+    value = {
+        'pandas.DataFrame': df,
+        'pandas.Series': df['a'],
+        'polars.DataFrame': pl.from_pandas(df),
+        'polars.Series': pl.from_pandas(df)['b'],
+    }[kind]
+
+    encoded = encode_value(value)
+    assert encoded.value['format'] == 'arrow'
+    assert encoded.value['kind'] == kind
+    # Schema and three batches
+    assert len(encoded.buffers) == 4
+
+    received = BufferedValue(
+        encoded.value, [bytes(memoryview(buf)) for buf in encoded.buffers])
+    decoded = decode_value(received)
+    if kind == 'pandas.DataFrame':
+        pd.testing.assert_frame_equal(decoded, value)
+    elif kind == 'pandas.Series':
+        pd.testing.assert_series_equal(decoded, value)
+    else:
+        assert decoded.equals(value)
+
+
+@pytest.mark.parametrize("kind", [
+    'pandas.DataFrame', 'pandas.Series', 'polars.DataFrame', 'polars.Series'
+])
+def test_arrow_categorical(monkeypatch, kind):
+    """Test that the dictionaries of categorical columns are sent."""
+    import polars as pl
+    monkeypatch.setattr(transfer, 'ARROW_BATCH_ROWS', 40)
+
+    df = pd.DataFrame({
+        'a': pd.Categorical(['x', 'y', 'z', 'x'] * 25),
+        'b': np.arange(100),
+    })
+    value = {
+        'pandas.DataFrame': df,
+        'pandas.Series': df['a'],
+        'polars.DataFrame': pl.DataFrame({
+            'a': pl.Series(['x', 'y', 'z', 'x'] * 25, dtype=pl.Categorical),
+            'b': pl.Series(['u', 'v'] * 50, dtype=pl.Enum(['u', 'v'])),
+        }),
+        'polars.Series': pl.Series(
+            'a', ['x', 'y', 'z', 'x'] * 25, dtype=pl.Categorical),
+    }[kind]
+
+    encoded = encode_value(value)
+    assert encoded.value['format'] == 'arrow'
+    # Schema, dictionaries and three batches
+    assert len(encoded.buffers) >= 5
+    received = BufferedValue(
+        encoded.value, [bytes(memoryview(buf)) for buf in encoded.buffers])
+    decoded = decode_value(received)
+    if kind == 'pandas.DataFrame':
+        pd.testing.assert_frame_equal(decoded, value)
+    elif kind == 'pandas.Series':
+        pd.testing.assert_series_equal(decoded, value)
+    else:
+        assert decoded.equals(value)
+
+
+def test_arrow_fallback():
+    """Test that dataframes that Arrow can't send are pickled."""
+    df = pd.DataFrame({'a': [object(), object()]})
+    assert encode_value(df).value['format'] == 'pickle'
+
+
+@pytest.mark.parametrize("value", [
+    pd.DataFrame({'a': [[1, 2], (3,)], 'b': ['x', 'y']}),
+    pd.DataFrame({'a': [{'x': 1}, {'y': 2.5}]}),
+    pd.DataFrame({'a': [1, 2.5]}, dtype=object),
+    pd.DataFrame({'a': [1, 2]}, index=pd.Index([1, 'x'], dtype=object)),
+    pd.Series([1, 'x'], dtype=object),
+    pd.Series([1., 2.], name=np.nan),
+])
+def test_arrow_objects(value):
+    """Test that objects that Arrow would convert are pickled."""
+    encoded = encode_value(value)
+    assert encoded.value['format'] == 'pickle'
+    decoded = decode_value(encoded)
+    if isinstance(value, pd.DataFrame):
+        pd.testing.assert_frame_equal(decoded, value)
+        assert type(decoded['a'].iloc[0]) is type(value['a'].iloc[0])
+    else:
+        pd.testing.assert_series_equal(decoded, value)
+
+    # Strings are still sent with Arrow
+    value = pd.DataFrame({'a': ['x', None]}, dtype=object)
+    assert encode_value(value).value['format'] == 'arrow'
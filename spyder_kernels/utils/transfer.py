@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright (c) 2009- Spyder Kernels Contributors
+#
+# Licensed under the terms of the MIT License
+# (see spyder_kernels/__init__.py for details)
+# -----------------------------------------------------------------------------
+
+"""
+Transfer of values through comms.
+
+Values are encoded as a BufferedValue, i.e. a JSON-able header and a list
+of buffers that are sent as comm buffers. The buffers of Numpy arrays, on
+their own or inside other objects, are sent as they are, without copying
+them. Dataframes are sent in the Arrow IPC format if pyarrow is installed.
+"""
+
+import math
+import pickle
+import sys
+
+import cloudpickle
+
+from spyder_kernels.comms.commbase import BufferedValue
+from spyder_kernels.utils.lazymodules import numpy as np, pandas as pd
+
+
+# Max number of rows of each Arrow record batch
+ARROW_BATCH_ROWS = 2 ** 16
+
+
+def is_raw_array(value):
+    """Return True if *value* is an array that can be sent as raw bytes."""
+    return (
+        type(value) is np.ndarray
+        and value.dtype.fields is None
+        and not value.dtype.hasobject
+    )
+
+
+def encode_array(value):
+    """
+    Encode a Numpy array with its raw buffer.
+
+    Contiguous arrays are not copied. Other ones are copied once into a
+    contiguous buffer.
+    """
+    if value.flags.c_contiguous:
+        order = 'C'
+    elif value.flags.f_contiguous:
+        order = 'F'
+    else:
+        value = np.ascontiguousarray(value)
+        order = 'C'
+
+    header = {
+        'format': 'ndarray',
+        'dtype': value.dtype.str,
+        'shape': list(value.shape),
+        'order': order,
+    }
+    # Ravelling in memory order returns a view, and viewing it as bytes
+    # gives a buffer for any dtype (e.g. datetimes).
+    data = value.ravel(order=order).view(np.uint8)
+    return BufferedValue(header, [memoryview(data)])
+
+
+def decode_array(header, buffers):
+    """Rebuild a Numpy array encoded with `encode_array`."""
+    value = np.frombuffer(buffers[0], dtype=np.dtype(header['dtype']))
+    value = value.reshape(header['shape'], order=header['order'])
+    if not value.flags.writeable:
+        # Received buffers can be read-only
+        value = value.copy(order='K')
+    return value
+
+
+def encode_pickle(value):
+    """
+    Encode an object with pickle protocol 5.
+
+    The contiguous buffers it contains (e.g. those of Numpy arrays or Pandas
+    dataframes) are sent out-of-band after the pickle, without copying
+    them.
+    """
+    buffers = []
+    data = cloudpickle.dumps(
+        value, protocol=5,
+        buffer_callback=lambda buffer: buffers.append(buffer.raw())
+    )
+    return BufferedValue({'format': 'pickle'}, [data] + buffers)
+
+
+def decode_pickle(header, buffers):
+    """Rebuild an object encoded with `encode_pickle`."""
+    # Objects rebuilt from read-only buffers would be read-only too
+    out_of_band = [
+        buffer if not memoryview(buffer).readonly else bytearray(buffer)
+        for buffer in buffers[1:]
+    ]
+    return pickle.loads(buffers[0], buffers=out_of_band)
+
+
+def get_pyarrow():
+    """Return the pyarrow module, or None if it's not installed."""
+    try:
+        import pyarrow
+    except ImportError:
+        return None
+    return pyarrow
+
+
+def is_arrow_compatible(values):
+    """
+    Return True if Arrow keeps the values of a Pandas column or index as
+    they are.
+
+    Arrow converts objects other than strings (e.g. lists, dicts or mixed
+    numbers) to other types, so columns of them must be pickled.
+    """
+    if isinstance(values, pd.MultiIndex):
+        return all(is_arrow_compatible(level) for level in values.levels)
+
+    dtype = values.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        values = dtype.categories
+        dtype = values.dtype
+    if dtype != object:
+        return True
+    return pd.api.types.infer_dtype(values, skipna=True) in (
+        'string', 'empty')
+
+
+def is_json_name(name):
+    """Return True if a series *name* can be sent in a JSON header."""
+    if isinstance(name, float):
+        # NaN and infinities are not valid JSON
+        return math.isfinite(name)
+    return name is None or isinstance(name, (str, int))
+
+
+def get_arrow_kind(value):
+    """
+    Return the kind of dataframe or series of *value* that can be sent in
+    the Arrow format, or None.
+    """
+    polars = sys.modules.get('polars')
+    if polars is not None:
+        if isinstance(value, polars.DataFrame):
+            return 'polars.DataFrame'
+        if isinstance(value, polars.Series):
+            return 'polars.Series'
+
+    if type(value) is pd.DataFrame:
+        if is_arrow_compatible(value.index) and all(
+            is_arrow_compatible(column)
+            for __, column in value.items()
+        ):
+            return 'pandas.DataFrame'
+    elif type(value) is pd.Series:
+        if (
+            is_json_name(value.name)
+            and is_arrow_compatible(value.index)
+            and is_arrow_compatible(value)
+        ):
+            return 'pandas.Series'
+    return None
+
+
+def encode_arrow(value, kind):
+    """
+    Encode a dataframe or series of a *kind* given by `get_arrow_kind` in
+    the Arrow IPC stream format.
+
+    The stream has the schema, the dictionaries of categorical columns and
+    record batches of at most `ARROW_BATCH_ROWS` rows. Each of these
+    messages is sent in its own buffer, so big dataframes don't need a
+    single big one. Polars objects are sent without converting them to
+    Pandas.
+    """
+    pyarrow = get_pyarrow()
+    header = {'format': 'arrow', 'kind': kind}
+    if kind == 'polars.DataFrame':
+        table = value.to_arrow()
+    elif kind == 'polars.Series':
+        table = value.to_frame().to_arrow()
+    elif kind == 'pandas.DataFrame':
+        table = pyarrow.Table.from_pandas(value)
+    else:
+        table = pyarrow.Table.from_pandas(value.to_frame())
+        header['name'] = value.name
+
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+        for batch in table.to_batches(max_chunksize=ARROW_BATCH_ROWS):
+            writer.write_batch(batch)
+    return BufferedValue(header, split_arrow_stream(sink.getvalue()))
+
+
+def split_arrow_stream(stream):
+    """
+    Split an Arrow IPC *stream* in a list of buffers with one message each,
+    without copying it. The end-of-stream marker is left out.
+    """
+    pyarrow = get_pyarrow()
+    source = pyarrow.BufferReader(stream)
+    reader = pyarrow.ipc.MessageReader.open_stream(source)
+    buffers = []
+    start = 0
+    while True:
+        try:
+            reader.read_next_message()
+        except StopIteration:
+            break
+        end = source.tell()
+        buffers.append(stream.slice(start, end - start))
+        start = end
+    return buffers
+
+
+def decode_arrow(header, buffers):
+    """Rebuild a dataframe or series encoded with `encode_arrow`."""
+    pyarrow = get_pyarrow()
+    stream = pyarrow.py_buffer(b''.join(buffers))
+    with pyarrow.ipc.open_stream(stream) as reader:
+        table = reader.read_all()
+
+    kind = header['kind']
+    if kind.startswith('polars'):
+        import polars
+        value = polars.from_arrow(table)
+        return value.to_series() if kind == 'polars.Series' else value
+
+    value = table.to_pandas()
+    if kind == 'pandas.Series':
+        value = value.iloc[:, 0].rename(header['name'])
+    return value
+
+
+def encode_value(value):
+    """
+    Encode *value* to send it through a comm.
+
+    Numpy arrays are sent with their raw buffer (see `encode_array`),
+    dataframes and series in the Arrow format if possible (see
+    `encode_arrow`), and other objects are pickled (see `encode_pickle`).
+    """
+    if is_raw_array(value):
+        return encode_array(value)
+
+    kind = get_arrow_kind(value)
+    if kind is not None and get_pyarrow() is not None:
+        try:
+            return encode_arrow(value, kind)
+        except Exception:
+            # E.g. columns of objects that Arrow doesn't support
+            pass
+
+    return encode_pickle(value)
+
+
+def decode_value(buffered_value):
+    """Decode a value encoded with `encode_value`."""
+    header = buffered_value.value
+    buffers = buffered_value.buffers
+    if header['format'] == 'ndarray':
+        return decode_array(header, buffers)
+    elif header['format'] == 'pickle':
+        return decode_pickle(header, buffers)
+    elif header['format'] == 'arrow':
+        return decode_arrow(header, buffers)
+    raise ValueError("Unknown format: {}".format(header['format']))